@@ -11,6 +11,15 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = "sqlite:///./outbound_agent.db"
+    ASYNC_DATABASE_URL: Optional[str] = None  # Defaults to DATABASE_URL with aiosqlite or asyncpg
+    DB_POOL_SIZE: int = 10  # Connections kept open
+    DB_MAX_OVERFLOW: int = 20  # Extra connections opened under load, closed when returned
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # Wait for a free connection before failing
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Reopen server connections older than this
+    DB_POOL_PRE_PING: bool = True  # Check server connections are alive before use
+    SQLITE_JOURNAL_MODE: Optional[str] = "WAL"  # Readers don't block on writers
+    SQLITE_BUSY_TIMEOUT_MS: int = 15000  # Wait for a write lock instead of "database is locked"
+    SQLITE_SYNCHRONOUS: Optional[str] = "NORMAL"  # Safe with WAL; fsyncs at checkpoints only
 
     # JWT
     JWT_SECRET_KEY: str = "jwt-secret-key-change-in-production"
@@ -19,7 +28,32 @@ class Settings(BaseSettings):
 
     # Claude AI
     ANTHROPIC_API_KEY: Optional[str] = None
+    ANTHROPIC_BASE_URL: str = "https://api.anthropic.com"  # Point at a local fake for testing
     CLAUDE_MODEL: str = "claude-sonnet-4-20250514"
+    CLAUDE_TIMEOUT_SECONDS: float = 60.0  # Per-call timeout
+    CLAUDE_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    CLAUDE_MAX_RETRIES: int = 2
+    CLAUDE_MAX_REPAIRS: int = 1  # Follow-up calls asking Claude to fix an invalid JSON reply
+    CLAUDE_MAX_CONNECTIONS: int = 20  # Shared connection pool size
+    CLAUDE_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    MESSAGE_GENERATION_CONCURRENCY: int = 4  # Max parallel generations per request
+    MESSAGE_GENERATION_SINGLE_CALL: bool = True  # One call for all of a prospect's messages, unless streaming
+    JOB_WORKER_CONCURRENCY: int = 8  # Prospects processed in parallel across all bulk jobs
+    CLAUDE_TOKENS_PER_MINUTE: int = 80000  # Token budget shared by bulk jobs
+    BATCH_POLL_INTERVAL_SECONDS: float = 60.0  # How often batch-mode jobs poll the provider
+    BATCH_MAX_REQUESTS: int = 10000  # Requests per provider batch submission
+    RESEARCH_CACHE_TTL_HOURS: int = 24 * 7  # How long prospect research is reused
+    COMPANY_ENRICHMENT_MAX_AGE_DAYS: int = 30  # Re-enrich companies older than this
+
+    # Imports
+    IMPORT_CHUNK_SIZE: int = 1000  # CSV rows inserted and committed together
+    IMPORT_UPLOAD_DIR: str = "uploads/imports"  # Where uploads wait for their background import
+
+    # Scoring
+    RESCORE_BATCH_SIZE: int = 5000  # Prospects rescored and committed together after an ICP change
+
+    # Dashboard
+    WORKFLOW_STATS_TTL_SECONDS: float = 10.0  # Longest a workflow stats snapshot is reused
 
     # Prospect.io
     PROSPECT_IO_API_KEY: Optional[str] = None
@@ -1,18 +1,184 @@
-from sqlalchemy import create_engine
+from typing import AsyncIterator, Dict, Optional
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+import threading
+import time
 from config import settings
 
-# Handle SQLite vs PostgreSQL
-if settings.DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        settings.DATABASE_URL,
-        connect_args={"check_same_thread": False}
-    )
-else:
-    engine = create_engine(settings.DATABASE_URL)
+
+class PoolMetrics:
+    """Running connection pool counters: checkouts, time spent waiting for them, and overflow"""
+
+    FIELDS = ("checkouts", "timeouts", "connections_opened", "invalidated")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def record_checkout(self, wait_seconds: float, checked_out: int, overflow: int):
+        with self._lock:
+            self._counters["checkouts"] += 1
+            self._wait_total += wait_seconds
+            self._wait_max = max(self._wait_max, wait_seconds)
+            self._peak_checked_out = max(self._peak_checked_out, checked_out)
+            self._peak_overflow = max(self._peak_overflow, overflow)
+
+    def record(self, field: str):
+        with self._lock:
+            self._counters[field] += 1
+
+    def snapshot(self, pools: Optional[Dict[str, object]] = None) -> dict:
+        with self._lock:
+            checkouts = self._counters["checkouts"]
+            result = {
+                **self._counters,
+                # Time to hand out a connection: waiting for one to be returned,
+                # opening a new one, and the pre-ping
+                "wait_seconds_total": round(self._wait_total, 4),
+                "wait_seconds_avg": round(self._wait_total / checkouts, 6) if checkouts else 0.0,
+                "wait_seconds_max": round(self._wait_max, 4),
+                "peak_checked_out": self._peak_checked_out,
+                "peak_overflow": self._peak_overflow,
+            }
+        result["pools"] = {}
+        for name, pool in (pools or {}).items():
+            if isinstance(pool, QueuePool):
+                result["pools"][name] = {
+                    "size": pool.size(),
+                    "checked_out": pool.checkedout(),
+                    "idle": pool.checkedin(),
+                    "overflow": max(pool.overflow(), 0),
+                    "max_overflow": pool._max_overflow,
+                }
+            else:
+                result["pools"][name] = {"class": type(pool).__name__}
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._counters = dict.fromkeys(self.FIELDS, 0)
+            self._wait_total = 0.0
+            self._wait_max = 0.0
+            self._peak_checked_out = 0
+            self._peak_overflow = 0
+
+
+pool_metrics = PoolMetrics()
+
+
+class _InstrumentedPool:
+    """Records checkout wait times, timeouts and overflow of a QueuePool in pool_metrics"""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_metrics.record("timeouts")
+            raise
+        pool_metrics.record_checkout(time.perf_counter() - started, self.checkedout(), max(self.overflow(), 0))
+        return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+# Async drivers for the async engine, by database backend
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_database_url(database_url: str) -> str:
+    """DATABASE_URL with its driver swapped for the backend's async driver"""
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    return url.set(drivername=driver).render_as_string(hide_password=False) if driver else database_url
+
+
+def engine_options(database_url: str, poolclass=InstrumentedQueuePool) -> dict:
+    """create_engine() arguments for the configured engine profile"""
+    url = make_url(database_url)
+    pool_options = {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+    }
+    if url.get_backend_name() == "sqlite":
+        options = {
+            "connect_args": {
+                "check_same_thread": False,
+                # The driver's own wait for a lock, in seconds; the pragma below sets the same
+                "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+            }
+        }
+        if url.database in (None, "", ":memory:"):
+            # Every connection would be a separate empty database
+            return options
+        return {**options, **pool_options}
+
+    return {
+        **pool_options,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+
+# For async request handlers; shares the pool settings, pragmas and metrics
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **engine_options(ASYNC_DATABASE_URL, poolclass=InstrumentedAsyncQueuePool)
+)
+
+
+@event.listens_for(engine, "connect")
+@event.listens_for(async_engine.sync_engine, "connect")
+def _configure_connection(dbapi_connection, connection_record):
+    pool_metrics.record("connections_opened")
+    if engine.dialect.name != "sqlite":
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL lets readers carry on while an import or review writes, and a
+        # busy timeout makes writers queue instead of failing with "database is locked"
+        if settings.SQLITE_JOURNAL_MODE:
+            cursor.execute(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        if settings.SQLITE_SYNCHRONOUS:
+            cursor.execute(f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}")
+    finally:
+        cursor.close()
+
+
+@event.listens_for(engine, "invalidate")
+@event.listens_for(async_engine.sync_engine, "invalidate")
+def _count_invalidation(dbapi_connection, connection_record, exception):
+    pool_metrics.record("invalidated")
+
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Async sessions run the same session class, so the session event hooks
+# registered on SessionLocal (rescoring, stats invalidation) apply to both
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+    sync_session_class=SessionLocal.class_
+)
 Base = declarative_base()
 
 
@@ -22,3 +188,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    Session for async handlers, whose queries don't block the event loop.
+    Relationships must be eagerly loaded: lazy loads raise on an AsyncSession.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
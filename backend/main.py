@@ -1,18 +1,35 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 from contextlib import asynccontextmanager
 
-from database import engine, Base
-from routers import auth, prospects, messages, icp, integrations, workflow, sequences, gmail
+from database import async_engine, engine
+from schema import migrate
+from services.llm import close_client
+from services.job_runner import job_runner
+from services.import_runner import import_runner
+import services.icp_rescorer  # noqa: F401  Registers the rescoring session hooks
+from services.search import search_index
+from routers import auth, prospects, messages, icp, integrations, workflow, sequences, gmail, jobs, metrics
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Create tables
-    Base.metadata.create_all(bind=engine)
+    # Startup: Bring the schema up to date (a version check when it already is)
+    migrate(engine)
+    search_index.setup(engine)
     print("Database initialized")
+    # Pick up bulk jobs and imports interrupted by the last shutdown
+    await job_runner.resume()
+    await import_runner.resume()
     yield
     # Shutdown
+    await import_runner.shutdown()
+    await job_runner.shutdown()
+    await close_client()
+    await async_engine.dispose()
     print("Shutting down")
 
 
@@ -41,6 +58,8 @@ app.include_router(integrations.router)
 app.include_router(workflow.router)
 app.include_router(sequences.router)
 app.include_router(gmail.router)
+app.include_router(jobs.router)
+app.include_router(metrics.router)
 
 
 @app.get("/")
@@ -55,4 +74,10 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    # Through the async engine, so a slow database doesn't stall other requests
+    try:
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    except SQLAlchemyError:
+        return JSONResponse(status_code=503, content={"status": "unhealthy", "database": "unavailable"})
+    return {"status": "healthy", "database": "ok"}
@@ -0,0 +1,314 @@
+"""Baseline: the tables create_all() built at startup before migrations existed
+
+Databases from that time already have these tables and keep them as they
+are; later revisions add what they lack.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from schema import create_types, drop_types, has_table
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Created once up front: sequencestatus is shared by two tables
+prospect_status = postgresql.ENUM(
+    "NEW", "RESEARCHING", "READY_FOR_REVIEW", "APPROVED", "IN_SEQUENCE", "CONTACTED", "RESPONDED",
+    "MEETING_BOOKED", "CONVERTED", "NOT_INTERESTED", "BOUNCED",
+    name="prospectstatus", create_type=False
+)
+activity_type = postgresql.ENUM(
+    "PROSPECT_CREATED", "PROSPECT_IMPORTED", "RESEARCH_COMPLETED", "MESSAGE_GENERATED",
+    "MESSAGE_APPROVED", "MESSAGE_REJECTED", "MESSAGE_SENT", "MESSAGE_OPENED", "MESSAGE_REPLIED",
+    "SEQUENCE_STARTED", "SEQUENCE_STEP_COMPLETED", "STATUS_CHANGED", "NOTE_ADDED",
+    name="activitytype", create_type=False
+)
+sequence_status = postgresql.ENUM("DRAFT", "ACTIVE", "PAUSED", "COMPLETED", name="sequencestatus", create_type=False)
+step_type = postgresql.ENUM(
+    "LINKEDIN_CONNECTION", "LINKEDIN_DM", "LINKEDIN_INMAIL", "COLD_EMAIL", "FOLLOW_UP_EMAIL",
+    "COLD_CALL", "VOICEMAIL", "WAIT", "TASK",
+    name="steptype", create_type=False
+)
+message_channel = postgresql.ENUM(
+    "EMAIL", "LINKEDIN", "LINKEDIN_INMAIL", "LINKEDIN_CONNECTION", "PHONE", "SMS",
+    name="messagechannel", create_type=False
+)
+message_status = postgresql.ENUM(
+    "DRAFT", "READY_FOR_REVIEW", "APPROVED", "SENT", "DELIVERED", "OPENED", "CLICKED", "REPLIED",
+    "BOUNCED", "REJECTED",
+    name="messagestatus", create_type=False
+)
+ENUMS = (prospect_status, activity_type, sequence_status, step_type, message_channel, message_status)
+
+# Dropped in reverse on downgrade
+TABLES = (
+    "companies", "users", "icp_configs", "prospects", "activities",
+    "sequences", "prospect_sequences", "sequence_steps", "messages",
+)
+
+
+def upgrade():
+    create_types(*ENUMS)
+
+    if not has_table("companies"):
+        op.create_table(
+            "companies",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("domain", sa.String(), nullable=True),
+            sa.Column("website", sa.String(), nullable=True),
+            sa.Column("industry", sa.String(), nullable=True),
+            sa.Column("employee_count", sa.Integer(), nullable=True),
+            sa.Column("employee_range", sa.String(), nullable=True),
+            sa.Column("revenue", sa.String(), nullable=True),
+            sa.Column("founded_year", sa.Integer(), nullable=True),
+            sa.Column("headquarters", sa.String(), nullable=True),
+            sa.Column("city", sa.String(), nullable=True),
+            sa.Column("state", sa.String(), nullable=True),
+            sa.Column("country", sa.String(), nullable=True),
+            sa.Column("linkedin_url", sa.String(), nullable=True),
+            sa.Column("twitter_url", sa.String(), nullable=True),
+            sa.Column("crunchbase_url", sa.String(), nullable=True),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("tech_stack", sa.JSON(), nullable=True),
+            sa.Column("keywords", sa.JSON(), nullable=True),
+            sa.Column("recent_news", sa.JSON(), nullable=True),
+            sa.Column("funding_info", sa.JSON(), nullable=True),
+            sa.Column("salesforce_id", sa.String(), nullable=True),
+            sa.Column("hubspot_id", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.Column("enriched_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_companies_domain", "companies", ["domain"])
+        op.create_index("ix_companies_id", "companies", ["id"])
+        op.create_index("ix_companies_name", "companies", ["name"])
+        op.create_index("ix_companies_salesforce_id", "companies", ["salesforce_id"])
+
+    if not has_table("users"):
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("full_name", sa.String(), nullable=False),
+            sa.Column("hashed_password", sa.String(), nullable=False),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("is_admin", sa.Boolean(), nullable=True),
+            sa.Column("avatar_url", sa.String(), nullable=True),
+            sa.Column("role", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.Column("last_login", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+        op.create_index("ix_users_id", "users", ["id"])
+
+    if not has_table("icp_configs"):
+        op.create_table(
+            "icp_configs",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("is_default", sa.Boolean(), nullable=True),
+            sa.Column("created_by", sa.Integer(), nullable=True),
+            sa.Column("product_name", sa.String(), nullable=True),
+            sa.Column("company_name", sa.String(), nullable=True),
+            sa.Column("product_description", sa.Text(), nullable=True),
+            sa.Column("target_industries", sa.JSON(), nullable=True),
+            sa.Column("company_size_min", sa.Integer(), nullable=True),
+            sa.Column("company_size_max", sa.Integer(), nullable=True),
+            sa.Column("company_size_labels", sa.JSON(), nullable=True),
+            sa.Column("target_locations", sa.JSON(), nullable=True),
+            sa.Column("revenue_min", sa.Integer(), nullable=True),
+            sa.Column("revenue_max", sa.Integer(), nullable=True),
+            sa.Column("target_titles", sa.JSON(), nullable=True),
+            sa.Column("title_keywords", sa.JSON(), nullable=True),
+            sa.Column("exclude_titles", sa.JSON(), nullable=True),
+            sa.Column("target_seniority", sa.JSON(), nullable=True),
+            sa.Column("positive_signals", sa.JSON(), nullable=True),
+            sa.Column("negative_signals", sa.JSON(), nullable=True),
+            sa.Column("tech_stack_positive", sa.JSON(), nullable=True),
+            sa.Column("tech_stack_negative", sa.JSON(), nullable=True),
+            sa.Column("trigger_events", sa.JSON(), nullable=True),
+            sa.Column("pain_points", sa.JSON(), nullable=True),
+            sa.Column("value_propositions", sa.JSON(), nullable=True),
+            sa.Column("messaging_tone", sa.String(), nullable=True),
+            sa.Column("avoid_phrases", sa.JSON(), nullable=True),
+            sa.Column("custom_instructions", sa.Text(), nullable=True),
+            sa.Column("weight_title_match", sa.Integer(), nullable=True),
+            sa.Column("weight_company_fit", sa.Integer(), nullable=True),
+            sa.Column("weight_signals", sa.Integer(), nullable=True),
+            sa.Column("weight_trigger_events", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["created_by"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_icp_configs_id", "icp_configs", ["id"])
+
+    if not has_table("prospects"):
+        op.create_table(
+            "prospects",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("first_name", sa.String(), nullable=True),
+            sa.Column("last_name", sa.String(), nullable=True),
+            sa.Column("full_name", sa.String(), nullable=False),
+            sa.Column("email", sa.String(), nullable=True),
+            sa.Column("phone", sa.String(), nullable=True),
+            sa.Column("title", sa.String(), nullable=True),
+            sa.Column("seniority", sa.String(), nullable=True),
+            sa.Column("department", sa.String(), nullable=True),
+            sa.Column("company_id", sa.Integer(), nullable=True),
+            sa.Column("company_name", sa.String(), nullable=True),
+            sa.Column("linkedin_url", sa.String(), nullable=True),
+            sa.Column("twitter_url", sa.String(), nullable=True),
+            sa.Column("personal_website", sa.String(), nullable=True),
+            sa.Column("city", sa.String(), nullable=True),
+            sa.Column("state", sa.String(), nullable=True),
+            sa.Column("country", sa.String(), nullable=True),
+            sa.Column("timezone", sa.String(), nullable=True),
+            sa.Column("status", prospect_status, nullable=True),
+            sa.Column("source", sa.String(), nullable=True),
+            sa.Column("icp_score", sa.Integer(), nullable=True),
+            sa.Column("icp_match_reasons", sa.JSON(), nullable=True),
+            sa.Column("icp_concerns", sa.JSON(), nullable=True),
+            sa.Column("research_summary", sa.Text(), nullable=True),
+            sa.Column("research_data", sa.JSON(), nullable=True),
+            sa.Column("linkedin_data", sa.JSON(), nullable=True),
+            sa.Column("twitter_data", sa.JSON(), nullable=True),
+            sa.Column("personalization_hooks", sa.JSON(), nullable=True),
+            sa.Column("pain_points_identified", sa.JSON(), nullable=True),
+            sa.Column("mutual_connections", sa.JSON(), nullable=True),
+            sa.Column("recent_activity", sa.JSON(), nullable=True),
+            sa.Column("salesforce_id", sa.String(), nullable=True),
+            sa.Column("hubspot_id", sa.String(), nullable=True),
+            sa.Column("prospect_io_id", sa.String(), nullable=True),
+            sa.Column("apollo_id", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.Column("researched_at", sa.DateTime(), nullable=True),
+            sa.Column("last_contacted_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["company_id"], ["companies.id"]),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_prospects_email", "prospects", ["email"])
+        op.create_index("ix_prospects_full_name", "prospects", ["full_name"])
+        op.create_index("ix_prospects_id", "prospects", ["id"])
+        op.create_index("ix_prospects_salesforce_id", "prospects", ["salesforce_id"])
+
+    if not has_table("activities"):
+        op.create_table(
+            "activities",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=True),
+            sa.Column("prospect_id", sa.Integer(), nullable=True),
+            sa.Column("activity_type", activity_type, nullable=False),
+            sa.Column("description", sa.String(), nullable=True),
+            sa.Column("activity_activity_activity_metadata", sa.JSON(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["prospect_id"], ["prospects.id"]),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_activities_id", "activities", ["id"])
+
+    if not has_table("sequences"):
+        op.create_table(
+            "sequences",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(length=255), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("status", sequence_status, nullable=True),
+            sa.Column("created_by", sa.Integer(), nullable=True),
+            sa.Column("icp_config_id", sa.Integer(), nullable=True),
+            sa.Column("is_default", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["created_by"], ["users.id"]),
+            sa.ForeignKeyConstraint(["icp_config_id"], ["icp_configs.id"]),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_sequences_id", "sequences", ["id"])
+
+    if not has_table("prospect_sequences"):
+        op.create_table(
+            "prospect_sequences",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("prospect_id", sa.Integer(), nullable=False),
+            sa.Column("sequence_id", sa.Integer(), nullable=False),
+            sa.Column("current_step", sa.Integer(), nullable=True),
+            sa.Column("status", sequence_status, nullable=True),
+            sa.Column("started_at", sa.DateTime(), nullable=True),
+            sa.Column("next_step_at", sa.DateTime(), nullable=True),
+            sa.Column("completed_at", sa.DateTime(), nullable=True),
+            sa.Column("notes", sa.Text(), nullable=True),
+            sa.ForeignKeyConstraint(["prospect_id"], ["prospects.id"]),
+            sa.ForeignKeyConstraint(["sequence_id"], ["sequences.id"]),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_prospect_sequences_id", "prospect_sequences", ["id"])
+
+    if not has_table("sequence_steps"):
+        op.create_table(
+            "sequence_steps",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("sequence_id", sa.Integer(), nullable=False),
+            sa.Column("order", sa.Integer(), nullable=False),
+            sa.Column("step_type", step_type, nullable=False),
+            sa.Column("name", sa.String(length=255), nullable=True),
+            sa.Column("delay_days", sa.Integer(), nullable=True),
+            sa.Column("delay_hours", sa.Integer(), nullable=True),
+            sa.Column("template", sa.Text(), nullable=True),
+            sa.Column("instructions", sa.Text(), nullable=True),
+            sa.Column("is_optional", sa.Boolean(), nullable=True),
+            sa.Column("stop_on_reply", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["sequence_id"], ["sequences.id"]),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_sequence_steps_id", "sequence_steps", ["id"])
+
+    if not has_table("messages"):
+        op.create_table(
+            "messages",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("prospect_id", sa.Integer(), nullable=False),
+            sa.Column("sequence_step_id", sa.Integer(), nullable=True),
+            sa.Column("channel", message_channel, nullable=False),
+            sa.Column("message_type", sa.String(), nullable=True),
+            sa.Column("subject", sa.String(), nullable=True),
+            sa.Column("content", sa.Text(), nullable=False),
+            sa.Column("hook", sa.String(), nullable=True),
+            sa.Column("template_id", sa.String(), nullable=True),
+            sa.Column("status", message_status, nullable=True),
+            sa.Column("sent_at", sa.DateTime(), nullable=True),
+            sa.Column("delivered_at", sa.DateTime(), nullable=True),
+            sa.Column("opened_at", sa.DateTime(), nullable=True),
+            sa.Column("clicked_at", sa.DateTime(), nullable=True),
+            sa.Column("replied_at", sa.DateTime(), nullable=True),
+            sa.Column("generation_context", sa.JSON(), nullable=True),
+            sa.Column("edit_history", sa.JSON(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["prospect_id"], ["prospects.id"]),
+            sa.ForeignKeyConstraint(["sequence_step_id"], ["sequence_steps.id"]),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_messages_id", "messages", ["id"])
+
+
+def downgrade():
+    # Their indexes go with them
+    for table in reversed(TABLES):
+        op.drop_table(table)
+    drop_types(*ENUMS)
@@ -0,0 +1,201 @@
+"""Tables and columns added before migrations existed
+
+create_all() created new tables at startup but never altered a table it had
+already created, so databases from before these were introduced lack some
+or all of them.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import re
+
+from schema import add_column_if_missing, create_index_if_missing, create_types, drop_types, has_table
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+job_status = postgresql.ENUM(
+    "PENDING", "RUNNING", "COMPLETED", "FAILED", "CANCELLED", name="jobstatus", create_type=False
+)
+job_mode = postgresql.ENUM("INTERACTIVE", "BATCH", name="jobmode", create_type=False)
+job_item_status = postgresql.ENUM("PENDING", "COMPLETED", "FAILED", name="jobitemstatus", create_type=False)
+ENUMS = (job_status, job_mode, job_item_status)
+
+# Dropped in reverse on downgrade
+TABLES = ("generation_jobs", "generation_job_items", "research_cache", "import_jobs", "import_job_errors")
+
+companies = sa.table(
+    "companies",
+    sa.column("id", sa.Integer),
+    sa.column("name", sa.String),
+    sa.column("normalized_name", sa.String),
+)
+
+# services.company_enrichment.normalize_company_name as of this revision
+COMPANY_SUFFIXES = {
+    "inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation",
+    "co", "company", "gmbh", "plc", "sa", "ag", "bv", "pty",
+}
+
+
+def normalize_company_name(name):
+    if not name:
+        return None
+    words = re.sub(r"[^a-z0-9]+", " ", name.lower()).split()
+    while len(words) > 1 and words[-1] in COMPANY_SUFFIXES:
+        words.pop()
+    return " ".join(words) or None
+
+
+def upgrade():
+    create_types(*ENUMS)
+
+    # Company deduplication by name variant
+    add_column_if_missing("companies", sa.Column("normalized_name", sa.String(), nullable=True))
+    create_index_if_missing("ix_companies_normalized_name", "companies", ["normalized_name"])
+    # Companies are matched by normalized name, so existing ones need it too
+    bind = op.get_bind()
+    updates = [
+        {"company_id": company_id, "normalized": normalize_company_name(name)}
+        for company_id, name in bind.execute(
+            sa.select(companies.c.id, companies.c.name).where(companies.c.normalized_name.is_(None))
+        )
+        if normalize_company_name(name)
+    ]
+    if updates:
+        bind.execute(
+            companies.update()
+            .where(companies.c.id == sa.bindparam("company_id"))
+            .values(normalized_name=sa.bindparam("normalized")),
+            updates
+        )
+
+    # Incremental rescoring
+    add_column_if_missing("prospects", sa.Column("icp_inputs_hash", sa.String(64), nullable=True))
+    add_column_if_missing("prospects", sa.Column("icp_scored_version", sa.String(64), nullable=True))
+
+    # Bulk generation jobs; Message Batches mode came after the table
+    if has_table("generation_jobs"):
+        add_column_if_missing("generation_jobs", sa.Column("mode", job_mode, nullable=True))
+        add_column_if_missing("generation_jobs", sa.Column("batch_state", sa.JSON(), nullable=True))
+    else:
+        op.create_table(
+            "generation_jobs",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("status", job_status, nullable=True),
+            sa.Column("mode", job_mode, nullable=True),
+            sa.Column("created_by", sa.Integer(), nullable=True),
+            sa.Column("icp_config_id", sa.Integer(), nullable=True),
+            sa.Column("channels", sa.JSON(), nullable=True),
+            sa.Column("message_types", sa.JSON(), nullable=True),
+            sa.Column("filters", sa.JSON(), nullable=True),
+            sa.Column("total", sa.Integer(), nullable=True),
+            sa.Column("completed", sa.Integer(), nullable=True),
+            sa.Column("failed", sa.Integer(), nullable=True),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("batch_state", sa.JSON(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.Column("started_at", sa.DateTime(), nullable=True),
+            sa.Column("finished_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["created_by"], ["users.id"]),
+            sa.ForeignKeyConstraint(["icp_config_id"], ["icp_configs.id"]),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_generation_jobs_id", "generation_jobs", ["id"])
+        op.create_index("ix_generation_jobs_status", "generation_jobs", ["status"])
+
+    if not has_table("generation_job_items"):
+        op.create_table(
+            "generation_job_items",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("job_id", sa.Integer(), nullable=False),
+            sa.Column("prospect_id", sa.Integer(), nullable=False),
+            sa.Column("status", job_item_status, nullable=True),
+            sa.Column("messages_generated", sa.Integer(), nullable=True),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("completed_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["job_id"], ["generation_jobs.id"]),
+            sa.ForeignKeyConstraint(["prospect_id"], ["prospects.id"]),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_generation_job_items_id", "generation_job_items", ["id"])
+        op.create_index("ix_generation_job_items_job_id", "generation_job_items", ["job_id"])
+        op.create_index("ix_generation_job_items_status", "generation_job_items", ["status"])
+
+    # Prospect research reused across runs
+    if not has_table("research_cache"):
+        op.create_table(
+            "research_cache",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("cache_key", sa.String(length=64), nullable=False),
+            sa.Column("prospect_id", sa.Integer(), nullable=True),
+            sa.Column("research_data", sa.JSON(), nullable=True),
+            sa.Column("hit_count", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(["prospect_id"], ["prospects.id"]),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_research_cache_cache_key", "research_cache", ["cache_key"], unique=True)
+        op.create_index("ix_research_cache_expires_at", "research_cache", ["expires_at"])
+        op.create_index("ix_research_cache_id", "research_cache", ["id"])
+        op.create_index("ix_research_cache_prospect_id", "research_cache", ["prospect_id"])
+
+    # Background CSV imports
+    if not has_table("import_jobs"):
+        op.create_table(
+            "import_jobs",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("status", job_status, nullable=True),
+            sa.Column("created_by", sa.Integer(), nullable=True),
+            sa.Column("icp_config_id", sa.Integer(), nullable=True),
+            sa.Column("filename", sa.String(), nullable=False),
+            sa.Column("file_path", sa.String(), nullable=True),
+            sa.Column("rows_parsed", sa.Integer(), nullable=True),
+            sa.Column("rows_inserted", sa.Integer(), nullable=True),
+            sa.Column("rows_skipped", sa.Integer(), nullable=True),
+            sa.Column("rows_duplicate", sa.Integer(), nullable=True),
+            sa.Column("rows_scored", sa.Integer(), nullable=True),
+            sa.Column("rows_failed", sa.Integer(), nullable=True),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.Column("started_at", sa.DateTime(), nullable=True),
+            sa.Column("finished_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["created_by"], ["users.id"]),
+            sa.ForeignKeyConstraint(["icp_config_id"], ["icp_configs.id"]),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_import_jobs_id", "import_jobs", ["id"])
+        op.create_index("ix_import_jobs_status", "import_jobs", ["status"])
+
+    if not has_table("import_job_errors"):
+        op.create_table(
+            "import_job_errors",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("job_id", sa.Integer(), nullable=False),
+            sa.Column("row_number", sa.Integer(), nullable=False),
+            sa.Column("error", sa.Text(), nullable=False),
+            sa.ForeignKeyConstraint(["job_id"], ["import_jobs.id"]),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_import_job_errors_id", "import_job_errors", ["id"])
+        op.create_index("ix_import_job_errors_job_id", "import_job_errors", ["job_id"])
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        op.drop_table(table)
+    drop_types(*ENUMS)
+
+    op.drop_column("prospects", "icp_scored_version")
+    op.drop_column("prospects", "icp_inputs_hash")
+    op.drop_index("ix_companies_normalized_name", table_name="companies")
+    op.drop_column("companies", "normalized_name")
@@ -0,0 +1,56 @@
+"""Composite indexes for the list, queue, job and funnel queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+from schema import create_index_if_missing
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Review queue and prospect list keysets; status alone is served by the first
+    create_index_if_missing("ix_prospects_status_icp_score", "prospects", ["status", "icp_score", "id"])
+    create_index_if_missing("ix_prospects_icp_score", "prospects", ["icp_score", "id"])
+    create_index_if_missing("ix_prospects_created_at", "prospects", ["created_at", "id"])
+    create_index_if_missing("ix_prospects_company_id", "prospects", ["company_id"])
+
+    # Message lists overall, by status and by prospect
+    create_index_if_missing("ix_messages_created_at", "messages", ["created_at", "id"])
+    create_index_if_missing("ix_messages_status_created_at", "messages", ["status", "created_at", "id"])
+    create_index_if_missing("ix_messages_prospect_created_at", "messages", ["prospect_id", "created_at", "id"])
+
+    # Sequence enrollments
+    create_index_if_missing("ix_prospect_sequences_prospect_id", "prospect_sequences", ["prospect_id"])
+    create_index_if_missing(
+        "ix_prospect_sequences_funnel", "prospect_sequences", ["sequence_id", "status", "current_step"]
+    )
+
+    # Job items to resume or report, and import errors in row order
+    create_index_if_missing(
+        "ix_generation_job_items_job_status", "generation_job_items", ["job_id", "status", "id"]
+    )
+    create_index_if_missing("ix_import_job_errors_job_row", "import_job_errors", ["job_id", "row_number"])
+
+
+def downgrade():
+    for table, name in (
+        ("import_job_errors", "ix_import_job_errors_job_row"),
+        ("generation_job_items", "ix_generation_job_items_job_status"),
+        ("prospect_sequences", "ix_prospect_sequences_funnel"),
+        ("prospect_sequences", "ix_prospect_sequences_prospect_id"),
+        ("messages", "ix_messages_prospect_created_at"),
+        ("messages", "ix_messages_status_created_at"),
+        ("messages", "ix_messages_created_at"),
+        ("prospects", "ix_prospects_company_id"),
+        ("prospects", "ix_prospects_created_at"),
+        ("prospects", "ix_prospects_icp_score"),
+        ("prospects", "ix_prospects_status_icp_score"),
+    ):
+        op.drop_index(name, table_name=table)
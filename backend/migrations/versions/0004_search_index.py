@@ -0,0 +1,88 @@
+"""Full-text search index over prospects and messages
+
+On SQLite each table gets an external-content FTS5 table kept in sync by
+triggers; on PostgreSQL a GIN index over the weighted tsvector that
+services.search queries with. Other databases get neither and search falls
+back to substring filters.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+from sqlalchemy.exc import OperationalError
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# Searched columns, in the order services.search weights them
+SEARCH_COLUMNS = {
+    "prospects": ("full_name", "email", "company_name", "title", "research_summary"),
+    "messages": ("subject", "content"),
+}
+
+# Must match SearchIndex._tsvector() exactly for PostgreSQL to use the index
+POSTGRES_WEIGHTS = {
+    "prospects": "ABBCD",
+    "messages": "AB",
+}
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        try:
+            for table, columns in SEARCH_COLUMNS.items():
+                create_fts5(table, columns)
+        except OperationalError:
+            # SQLite built without FTS5: searches fall back to substring filters
+            return
+    elif dialect == "postgresql":
+        for table, columns in SEARCH_COLUMNS.items():
+            vector = " || ".join(
+                f"setweight(to_tsvector('simple', coalesce({column}, '')), '{weight}')"
+                for column, weight in zip(columns, POSTGRES_WEIGHTS[table])
+            )
+            op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_search ON {table} USING gin (({vector}))")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    for table in SEARCH_COLUMNS:
+        if dialect == "sqlite":
+            for trigger in ("insert", "delete", "update"):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{trigger}")
+            op.execute(f"DROP TABLE IF EXISTS {table}_fts")
+        elif dialect == "postgresql":
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_search")
+
+
+def create_fts5(table, columns):
+    fts = f"{table}_fts"
+    names = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+
+    op.execute(
+        f"CREATE VIRTUAL TABLE {fts} USING fts5("
+        f"{names}, content='{table}', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    op.execute(
+        f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END"
+    )
+    # Only fires for the searched columns, so score and status updates skip it
+    op.execute(
+        f"CREATE TRIGGER {fts}_update AFTER UPDATE OF {names} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END"
+    )
+    # Index the rows written before the search table existed
+    op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
@@ -0,0 +1,137 @@
+"""Share research between messages through content-hashed snapshots
+
+Messages used to carry their own copy of the research in generation_context;
+each distinct copy becomes one research_snapshots row they reference.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+import hashlib
+import json
+
+from schema import add_column_if_missing, create_index_if_missing, has_table
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+messages = sa.table(
+    "messages",
+    sa.column("id", sa.Integer),
+    sa.column("generation_context", sa.JSON),
+    sa.column("research_snapshot_id", sa.Integer),
+)
+snapshots = sa.table(
+    "research_snapshots",
+    sa.column("id", sa.Integer),
+    sa.column("content_hash", sa.String),
+    sa.column("research_data", sa.JSON),
+    sa.column("created_at", sa.DateTime),
+)
+
+
+def research_snapshot_hash(research_data):
+    """services.research_snapshots.research_snapshot_hash as of this revision"""
+    payload = json.dumps(research_data or {}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def upgrade():
+    bind = op.get_bind()
+    if not has_table("research_snapshots"):
+        op.create_table(
+            "research_snapshots",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("content_hash", sa.String(length=64), nullable=False),
+            sa.Column("research_data", sa.JSON(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_research_snapshots_content_hash", "research_snapshots", ["content_hash"], unique=True)
+        op.create_index("ix_research_snapshots_id", "research_snapshots", ["id"])
+    add_column_if_missing(
+        "messages",
+        sa.Column("research_snapshot_id", sa.Integer, sa.ForeignKey("research_snapshots.id"), nullable=True)
+    )
+    create_index_if_missing("ix_messages_research_snapshot_id", "messages", ["research_snapshot_id"])
+
+    snapshot_ids = {}
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(messages.c.id, messages.c.generation_context)
+            .where(messages.c.id > last_id)
+            .order_by(messages.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        updates = []
+        for message_id, context in rows:
+            if not isinstance(context, dict) or "research" not in context:
+                continue
+            research = context.pop("research") or {}
+            content_hash = research_snapshot_hash(research)
+            if content_hash not in snapshot_ids:
+                snapshot_ids[content_hash] = bind.execute(
+                    sa.select(snapshots.c.id).where(snapshots.c.content_hash == content_hash)
+                ).scalar() or bind.execute(
+                    snapshots.insert().values(
+                        content_hash=content_hash, research_data=research, created_at=datetime.utcnow()
+                    ).returning(snapshots.c.id)
+                ).scalar_one()
+            updates.append({
+                "message_id": message_id,
+                "snapshot_id": snapshot_ids[content_hash],
+                "context": context,
+            })
+
+        if updates:
+            bind.execute(
+                messages.update()
+                .where(messages.c.id == sa.bindparam("message_id"))
+                .values(
+                    research_snapshot_id=sa.bindparam("snapshot_id"),
+                    generation_context=sa.bindparam("context", type_=sa.JSON)
+                ),
+                updates
+            )
+
+
+def downgrade():
+    bind = op.get_bind()
+    # Give each message its own copy of the research again
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(messages.c.id, messages.c.generation_context, snapshots.c.research_data)
+            .join(snapshots, snapshots.c.id == messages.c.research_snapshot_id)
+            .where(messages.c.id > last_id)
+            .order_by(messages.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        bind.execute(
+            messages.update()
+            .where(messages.c.id == sa.bindparam("message_id"))
+            .values(generation_context=sa.bindparam("context", type_=sa.JSON)),
+            [
+                {"message_id": message_id, "context": {**(context or {}), "research": research}}
+                for message_id, context, research in rows
+            ]
+        )
+
+    op.drop_index("ix_messages_research_snapshot_id", table_name="messages")
+    op.drop_column("messages", "research_snapshot_id")
+    op.drop_table("research_snapshots")
@@ -0,0 +1,22 @@
+"""Index for the prospect list sorted by last change
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+from schema import create_index_if_missing
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_index_if_missing("ix_prospects_updated_at", "prospects", ["updated_at", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_prospects_updated_at", table_name="prospects")
@@ -0,0 +1,41 @@
+"""Keep generation job items when their prospect is deleted
+
+Their prospect_id is set to NULL instead of the delete failing on the
+foreign key.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# Names the unnamed foreign key SQLite reflects, so batch mode can replace it
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def replace_prospect_fk(nullable: bool, ondelete=None):
+    bind = op.get_bind()
+    name = (
+        "generation_job_items_prospect_id_fkey" if bind.dialect.name == "postgresql"
+        else "fk_generation_job_items_prospect_id_prospects"
+    )
+    with op.batch_alter_table("generation_job_items", naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint(name, type_="foreignkey")
+        batch_op.alter_column("prospect_id", existing_type=sa.Integer(), nullable=nullable)
+        batch_op.create_foreign_key(name, "prospects", ["prospect_id"], ["id"], ondelete=ondelete)
+
+
+def upgrade():
+    replace_prospect_fk(nullable=True, ondelete="SET NULL")
+
+
+def downgrade():
+    # Items of deleted prospects have nothing left to point at
+    op.execute("DELETE FROM generation_job_items WHERE prospect_id IS NULL")
+    replace_prospect_fk(nullable=False)
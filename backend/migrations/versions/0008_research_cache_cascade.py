@@ -0,0 +1,36 @@
+"""Delete cached research along with its prospect
+
+Deleting a prospect with cached research used to fail on the foreign key.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+# Names the unnamed foreign key SQLite reflects, so batch mode can replace it
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def replace_prospect_fk(ondelete=None):
+    bind = op.get_bind()
+    name = (
+        "research_cache_prospect_id_fkey" if bind.dialect.name == "postgresql"
+        else "fk_research_cache_prospect_id_prospects"
+    )
+    with op.batch_alter_table("research_cache", naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint(name, type_="foreignkey")
+        batch_op.create_foreign_key(name, "prospects", ["prospect_id"], ["id"], ondelete=ondelete)
+
+
+def upgrade():
+    replace_prospect_fk(ondelete="CASCADE")
+
+
+def downgrade():
+    replace_prospect_fk()
@@ -0,0 +1,62 @@
+"""Make the columns prospects are paginated by NOT NULL
+
+Keyset pagination compares sort values, and a NULL compares as neither
+less nor greater, so rows with a NULL score or timestamp were skipped from
+the prospect list and the review queue. Existing NULLs are backfilled:
+scores with 0, the model default, and timestamps with the creation time or
+the time of the upgrade.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+prospects = sa.table(
+    "prospects",
+    sa.column("icp_score", sa.Integer),
+    sa.column("created_at", sa.DateTime),
+    sa.column("updated_at", sa.DateTime),
+)
+
+COLUMNS = {
+    "icp_score": sa.Integer(),
+    "created_at": sa.DateTime(),
+    "updated_at": sa.DateTime(),
+}
+
+
+def set_nullable(nullable):
+    bind = op.get_bind()
+    # Recreating the table on SQLite drops its triggers, the search index's among them
+    triggers = []
+    if bind.dialect.name == "sqlite":
+        triggers = bind.execute(sa.text(
+            "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'prospects'"
+        )).scalars().all()
+    with op.batch_alter_table("prospects") as batch_op:
+        for column, type_ in COLUMNS.items():
+            batch_op.alter_column(column, existing_type=type_, nullable=nullable)
+    for trigger in triggers:
+        op.execute(trigger)
+
+
+def upgrade():
+    now = datetime.utcnow()
+    op.execute(prospects.update().where(prospects.c.icp_score.is_(None)).values(icp_score=0))
+    op.execute(prospects.update().where(prospects.c.created_at.is_(None)).values(created_at=now))
+    op.execute(
+        prospects.update().where(prospects.c.updated_at.is_(None)).values(updated_at=prospects.c.created_at)
+    )
+    set_nullable(False)
+
+
+def downgrade():
+    set_nullable(True)
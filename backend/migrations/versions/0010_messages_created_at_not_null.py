@@ -0,0 +1,42 @@
+"""Make the column messages are paginated by NOT NULL
+
+As with prospects in 0009, a NULL creation time dropped the message from
+cursor pages. Existing NULLs are set to the time of the upgrade.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+messages = sa.table("messages", sa.column("created_at", sa.DateTime))
+
+
+def set_nullable(nullable):
+    bind = op.get_bind()
+    # Recreating the table on SQLite drops its triggers, the search index's among them
+    triggers = []
+    if bind.dialect.name == "sqlite":
+        triggers = bind.execute(sa.text(
+            "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'messages'"
+        )).scalars().all()
+    with op.batch_alter_table("messages") as batch_op:
+        batch_op.alter_column("created_at", existing_type=sa.DateTime(), nullable=nullable)
+    for trigger in triggers:
+        op.execute(trigger)
+
+
+def upgrade():
+    op.execute(messages.update().where(messages.c.created_at.is_(None)).values(created_at=datetime.utcnow()))
+    set_nullable(False)
+
+
+def downgrade():
+    set_nullable(True)
@@ -5,5 +5,9 @@ from .message import Message
 from .icp import ICPConfig
 from .activity import Activity
 from .sequence import Sequence, SequenceStep, ProspectSequence
+from .job import GenerationJob, GenerationJobItem
+from .research_cache import ResearchCacheEntry
+from .import_job import ImportJob, ImportJobError
+from .research_snapshot import ResearchSnapshot
 
-__all__ = ["User", "Company", "Prospect", "Message", "ICPConfig", "Activity", "Sequence", "SequenceStep", "ProspectSequence"]
+__all__ = ["User", "Company", "Prospect", "Message", "ICPConfig", "Activity", "Sequence", "SequenceStep", "ProspectSequence", "GenerationJob", "GenerationJobItem", "ResearchCacheEntry", "ImportJob", "ImportJobError", "ResearchSnapshot"]
@@ -9,6 +9,7 @@ class Company(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
+    normalized_name = Column(String, nullable=True, index=True)  # For deduping name variants
     domain = Column(String, nullable=True, index=True)
     website = Column(String, nullable=True)
 
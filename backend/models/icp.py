@@ -1,8 +1,19 @@
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Text, Boolean
 from sqlalchemy.orm import relationship
 from datetime import datetime
+import hashlib
+import json
 from database import Base
 
+# Fields that change how prospects are scored (see ICPScorer)
+SCORING_FIELDS = (
+    "target_industries", "company_size_min", "company_size_max", "target_locations",
+    "target_titles", "title_keywords", "exclude_titles", "target_seniority",
+    "positive_signals", "negative_signals", "tech_stack_positive", "tech_stack_negative",
+    "trigger_events", "weight_title_match", "weight_company_fit", "weight_signals",
+    "weight_trigger_events",
+)
+
 
 class ICPConfig(Base):
     """Ideal Customer Profile Configuration"""
@@ -64,6 +75,11 @@ class ICPConfig(Base):
     # Relationships
     created_by_user = relationship("User", back_populates="icp_configs")
 
+    def scoring_version(self) -> str:
+        """Content hash of the scoring fields, stored with each prospect score"""
+        payload = json.dumps({field: getattr(self, field) for field in SCORING_FIELDS}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
     def to_prompt_context(self) -> dict:
         """Convert ICP config to context for AI prompts"""
         return {
@@ -0,0 +1,54 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from database import Base
+from models.job import JobStatus
+
+
+class ImportJob(Base):
+    """Background CSV import, checkpointed after every committed chunk"""
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(Enum(JobStatus), default=JobStatus.PENDING, index=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    icp_config_id = Column(Integer, ForeignKey("icp_configs.id"), nullable=True)
+
+    # Source file, kept on disk until the import finishes
+    filename = Column(String, nullable=False)
+    file_path = Column(String, nullable=True)
+
+    # Progress. rows_parsed is also the resume point: rows up to it are committed.
+    rows_parsed = Column(Integer, default=0)
+    rows_inserted = Column(Integer, default=0)
+    rows_skipped = Column(Integer, default=0)
+    rows_duplicate = Column(Integer, default=0)
+    rows_scored = Column(Integer, default=0)
+    rows_failed = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    row_errors = relationship("ImportJobError", back_populates="job")
+
+
+class ImportJobError(Base):
+    """A CSV row an import job could not use"""
+    __tablename__ = "import_job_errors"
+    __table_args__ = (
+        # A job's errors in row order
+        Index("ix_import_job_errors_job_row", "job_id", "row_number"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("import_jobs.id"), nullable=False, index=True)
+    row_number = Column(Integer, nullable=False)
+    error = Column(Text, nullable=False)
+
+    # Relationships
+    job = relationship("ImportJob", back_populates="row_errors")
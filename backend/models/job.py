@@ -0,0 +1,78 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, JSON, Text, Enum, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import enum
+from database import Base
+
+
+class JobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class JobMode(str, enum.Enum):
+    INTERACTIVE = "interactive"  # Synchronous Messages API calls
+    BATCH = "batch"  # Message Batches API, for large offline runs
+
+
+class JobItemStatus(str, enum.Enum):
+    PENDING = "pending"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class GenerationJob(Base):
+    """Bulk research-and-generate run over a set of prospects"""
+    __tablename__ = "generation_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(Enum(JobStatus), default=JobStatus.PENDING, index=True)
+    mode = Column(Enum(JobMode), default=JobMode.INTERACTIVE)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    icp_config_id = Column(Integer, ForeignKey("icp_configs.id"), nullable=True)
+
+    # What to generate
+    channels = Column(JSON, default=list)
+    message_types = Column(JSON, default=list)
+    filters = Column(JSON, default=dict)  # Filter used to select prospects, if any
+
+    # Progress
+    total = Column(Integer, default=0)
+    completed = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    batch_state = Column(JSON, default=dict)  # Batch mode phase and submitted provider batch ids
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    items = relationship("GenerationJobItem", back_populates="job")
+
+
+class GenerationJobItem(Base):
+    """Per-prospect checkpoint of a generation job"""
+    __tablename__ = "generation_job_items"
+    __table_args__ = (
+        # Pending items to resume and failed items to report, per job
+        Index("ix_generation_job_items_job_status", "job_id", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("generation_jobs.id"), nullable=False, index=True)
+    # Cleared when the prospect is deleted, so the job's history survives it
+    prospect_id = Column(Integer, ForeignKey("prospects.id", ondelete="SET NULL"), nullable=True)
+
+    status = Column(Enum(JobItemStatus), default=JobItemStatus.PENDING, index=True)
+    messages_generated = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    job = relationship("GenerationJob", back_populates="items")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Text, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Text, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -29,6 +29,12 @@ class MessageChannel(str, enum.Enum):
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        # Cursor pagination of message lists, newest first, overall and per status
+        Index("ix_messages_created_at", "created_at", "id"),
+        Index("ix_messages_status_created_at", "status", "created_at", "id"),
+        Index("ix_messages_prospect_created_at", "prospect_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     prospect_id = Column(Integer, ForeignKey("prospects.id"), nullable=False)
@@ -55,12 +61,14 @@ class Message(Base):
     replied_at = Column(DateTime, nullable=True)
 
     # Metadata
-    generation_context = Column(JSON, default=dict)  # What data was used to generate
+    generation_context = Column(JSON, default=dict)  # What data was used to generate, besides the research
+    research_snapshot_id = Column(Integer, ForeignKey("research_snapshots.id"), nullable=True, index=True)
     edit_history = Column(JSON, default=list)  # Track manual edits
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     prospect = relationship("Prospect", back_populates="messages")
+    research_snapshot = relationship("ResearchSnapshot")
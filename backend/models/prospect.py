@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Text, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Text, Enum, Index
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 import enum
 from database import Base
@@ -21,6 +21,16 @@ class ProspectStatus(str, enum.Enum):
 
 class Prospect(Base):
     __tablename__ = "prospects"
+    __table_args__ = (
+        # Serve the review queue (highest score first, per status) by index range scans
+        Index("ix_prospects_status_icp_score", "status", "icp_score", "id"),
+        Index("ix_prospects_icp_score", "icp_score", "id"),
+        # Cursor pagination of the prospect list, by creation and by last change
+        Index("ix_prospects_created_at", "created_at", "id"),
+        Index("ix_prospects_updated_at", "updated_at", "id"),
+        # Prospects of a company, for rescoring after a company edit
+        Index("ix_prospects_company_id", "company_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -56,21 +66,24 @@ class Prospect(Base):
     source = Column(String, nullable=True)  # csv, salesforce, linkedin, manual, prospect_io
 
     # ICP Scoring
-    icp_score = Column(Integer, default=0)  # 0-100
+    icp_score = Column(Integer, default=0, nullable=False)  # 0-100
     icp_match_reasons = Column(JSON, default=list)
     icp_concerns = Column(JSON, default=list)
+    icp_inputs_hash = Column(String(64), nullable=True)  # Fingerprint of the fields the score was computed from
+    icp_scored_version = Column(String(64), nullable=True)  # ICPConfig.scoring_version() it was scored against
 
     # Research data
+    # The JSON blobs are only loaded when accessed, or with undefer_group("details")
     research_summary = Column(Text, nullable=True)
-    research_data = Column(JSON, default=dict)
-    linkedin_data = Column(JSON, default=dict)
-    twitter_data = Column(JSON, default=dict)
+    research_data = deferred(Column(JSON, default=dict), group="details")
+    linkedin_data = deferred(Column(JSON, default=dict), group="details")
+    twitter_data = deferred(Column(JSON, default=dict), group="details")
 
     # Personalization hooks
-    personalization_hooks = Column(JSON, default=list)
-    pain_points_identified = Column(JSON, default=list)
-    mutual_connections = Column(JSON, default=list)
-    recent_activity = Column(JSON, default=list)
+    personalization_hooks = deferred(Column(JSON, default=list), group="details")
+    pain_points_identified = deferred(Column(JSON, default=list), group="details")
+    mutual_connections = deferred(Column(JSON, default=list), group="details")
+    recent_activity = deferred(Column(JSON, default=list), group="details")
 
     # Integration IDs
     salesforce_id = Column(String, nullable=True, index=True)
@@ -79,8 +92,8 @@ class Prospect(Base):
     apollo_id = Column(String, nullable=True)
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     researched_at = Column(DateTime, nullable=True)
     last_contacted_at = Column(DateTime, nullable=True)
 
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from datetime import datetime
+from database import Base
+
+
+class ResearchCacheEntry(Base):
+    """Prospect research result keyed by a hash of its prompt inputs"""
+    __tablename__ = "research_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), nullable=False, unique=True, index=True)
+    # Research about a deleted prospect goes with it
+    prospect_id = Column(Integer, ForeignKey("prospects.id", ondelete="CASCADE"), nullable=True, index=True)
+    research_data = Column(JSON, default=dict)
+    hit_count = Column(Integer, default=0)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from datetime import datetime
+from database import Base
+
+
+class ResearchSnapshot(Base):
+    """Research a message was generated from, stored once per distinct content"""
+    __tablename__ = "research_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), nullable=False, unique=True, index=True)
+    research_data = Column(JSON, default=dict)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey, Boolean, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey, Boolean, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -78,6 +78,12 @@ class SequenceStep(Base):
 
 class ProspectSequence(Base):
     __tablename__ = "prospect_sequences"
+    __table_args__ = (
+        # A prospect's enrollments
+        Index("ix_prospect_sequences_prospect_id", "prospect_id"),
+        # Per-sequence funnel counts, read from the index alone
+        Index("ix_prospect_sequences_funnel", "sequence_id", "status", "current_step"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     prospect_id = Column(Integer, ForeignKey("prospects.id"), nullable=False)
     prospect = relationship("Prospect", back_populates="sequences")
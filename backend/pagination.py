@@ -0,0 +1,145 @@
+from typing import Any, Callable, Optional, Sequence
+from fastapi import HTTPException
+from sqlalchemy import Column, DateTime, Select, Table, func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query
+from datetime import datetime
+import base64
+import binascii
+import json
+
+
+def encode_cursor(scope: str, values: Sequence) -> str:
+    """Opaque cursor for the row with these sort key values"""
+    payload = json.dumps({
+        "s": scope,
+        "k": [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    })
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, scope: str, columns: Sequence) -> list:
+    """Sort key values of a cursor, checked against the listing it was issued for"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        values = payload["k"]
+        if payload["s"] != scope or len(values) != len(columns):
+            raise ValueError("Cursor is for another listing")
+        return [
+            datetime.fromisoformat(value) if value is not None and isinstance(column.type, DateTime) else value
+            for column, value in zip(columns, values)
+        ]
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(
+    query: Query,
+    columns: Sequence,
+    per_page: int,
+    descending: bool = True,
+    cursor: Optional[str] = None,
+    page: Optional[int] = None,
+    with_total: Optional[bool] = None,
+    scope: str = "",
+    key: Optional[Callable[[Any], Sequence]] = None
+) -> dict:
+    """
+    Keyset-paginate a query over non-null sort columns, the last of which
+    must be unique (normally the primary key). A NULL would drop rows from
+    cursor pages, so nullable table columns are rejected with ValueError.
+
+    With a cursor, the page starts right after the row it was issued for,
+    found through an index on the sort columns rather than by skipping rows,
+    so every page costs the same. Without one, the first page, or the given
+    page number for older clients, is returned.
+
+    The total is counted on the first request of a listing (no cursor) and
+    otherwise only when with_total is set, as counting scans every match.
+
+    key returns the sort column values of a result item; by default they are
+    read as attributes named after the columns.
+
+    Returns:
+        dict with items, total (or None), page (or None), pages (or None)
+        and next_cursor (None on the last page)
+    """
+    _check_columns(columns)
+    query = query.order_by(*(column.desc() if descending else column.asc() for column in columns))
+
+    if with_total is None:
+        with_total = cursor is None
+    total = query.order_by(None).count() if with_total else None
+
+    query, page = _position(query, columns, per_page, descending, cursor, page, scope)
+    # One extra row tells whether there is a next page
+    items = query.limit(per_page + 1).all()
+    return _page(items, total, page, per_page, columns, scope, key)
+
+
+async def paginate_async(
+    db: AsyncSession,
+    statement: Select,
+    columns: Sequence,
+    per_page: int,
+    descending: bool = True,
+    cursor: Optional[str] = None,
+    page: Optional[int] = None,
+    with_total: Optional[bool] = None,
+    scope: str = "",
+    key: Optional[Callable[[Any], Sequence]] = None
+) -> dict:
+    """
+    paginate() for a select() run on an AsyncSession. Items are entities
+    when a single entity is selected and rows otherwise, as with Query.
+    """
+    _check_columns(columns)
+    statement = statement.order_by(*(column.desc() if descending else column.asc() for column in columns))
+
+    if with_total is None:
+        with_total = cursor is None
+    total = None
+    if with_total:
+        total = await db.scalar(select(func.count()).select_from(statement.order_by(None).subquery()))
+
+    statement, page = _position(statement, columns, per_page, descending, cursor, page, scope)
+    result = await db.execute(statement.limit(per_page + 1))
+    items = result.scalars().all() if len(statement.column_descriptions) == 1 else result.all()
+    return _page(items, total, page, per_page, columns, scope, key)
+
+
+def _check_columns(columns: Sequence):
+    """Reject nullable table columns; computed ones, like search ranks, are the caller's to keep non-null"""
+    for column in columns:
+        expression = getattr(column, "expression", column)
+        if isinstance(expression, Column) and isinstance(expression.table, Table) and expression.nullable:
+            raise ValueError(f"Cannot paginate over nullable column {expression.table.name}.{expression.name}")
+
+
+def _position(query, columns: Sequence, per_page: int, descending: bool, cursor: Optional[str], page: Optional[int], scope: str):
+    """Start a sorted Query or select() after the cursor row, or at the page number"""
+    if cursor:
+        values = decode_cursor(cursor, scope, columns)
+        position = tuple_(*columns)
+        after = tuple_(*(literal(value, column.type) for column, value in zip(columns, values)))
+        return query.filter(position < after if descending else position > after), None
+    if page:
+        query = query.offset((page - 1) * per_page)
+    return query, page
+
+
+def _page(items: list, total: Optional[int], page: Optional[int], per_page: int, columns: Sequence, scope: str, key) -> dict:
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        last = items[-1]
+        values = key(last) if key else [getattr(last, column.key) for column in columns]
+        next_cursor = encode_cursor(scope, values)
+
+    return {
+        "items": items,
+        "total": total,
+        "page": page,
+        "pages": (total + per_page - 1) // per_page if total is not None else None,
+        "next_cursor": next_cursor,
+    }
@@ -6,3 +6,5 @@ from . import integrations
 from . import workflow
 from . import sequences
 from . import gmail
+from . import jobs
+from . import metrics
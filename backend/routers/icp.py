@@ -212,7 +212,7 @@ async def set_default_icp(icp_id: int, db: Session = Depends(get_db)):
 
     icp.is_default = True
     db.commit()
-    return {"message": "Default ICP updated"}
+    return {"message": "Default ICP updated", "rescoring": True}
 
 
 @router.post("/{icp_id}/duplicate", response_model=ICPResponse)
@@ -0,0 +1,188 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from pydantic import BaseModel
+import asyncio
+import json
+
+from database import get_db, SessionLocal
+from models.job import GenerationJob, GenerationJobItem, JobStatus, JobMode, JobItemStatus
+from models.message import MessageChannel
+from models.prospect import Prospect, ProspectStatus
+from models.icp import ICPConfig
+from services.job_runner import job_runner
+from config import settings
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+TERMINAL_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+def job_to_dict(job: GenerationJob) -> dict:
+    processed = (job.completed or 0) + (job.failed or 0)
+    return {
+        "id": job.id,
+        "status": job.status.value if job.status else "pending",
+        "mode": job.mode.value if job.mode else "interactive",
+        "batch_phase": (job.batch_state or {}).get("phase"),
+        "channels": job.channels or [],
+        "message_types": job.message_types or [],
+        "filters": job.filters or {},
+        "total": job.total or 0,
+        "completed": job.completed or 0,
+        "failed": job.failed or 0,
+        "progress": round(processed / job.total * 100) if job.total else 100,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+# Schemas
+class ProspectFilters(BaseModel):
+    status: Optional[ProspectStatus] = None
+    min_icp_score: Optional[int] = None
+    search: Optional[str] = None
+
+
+class GenerationJobCreate(BaseModel):
+    prospect_ids: Optional[List[int]] = None
+    filters: Optional[ProspectFilters] = None
+    channels: List[MessageChannel] = [MessageChannel.LINKEDIN, MessageChannel.EMAIL]
+    message_types: List[str] = ["initial"]
+    mode: JobMode = JobMode.INTERACTIVE
+
+
+# Routes
+@router.post("/generate")
+async def create_generation_job(data: GenerationJobCreate, db: Session = Depends(get_db)):
+    """Submit a bulk research-and-generate job"""
+    if data.prospect_ids is None and data.filters is None:
+        raise HTTPException(status_code=400, detail="Provide prospect_ids or filters")
+
+    icp_config = db.query(ICPConfig).filter(ICPConfig.is_default == True).first()
+    if not icp_config:
+        raise HTTPException(status_code=400, detail="No ICP configuration found. Please create one first.")
+
+    if not settings.ANTHROPIC_API_KEY:
+        raise HTTPException(status_code=400, detail="Anthropic API key not configured")
+
+    # Resolve the prospect set up front so the job is reproducible on resume
+    query = db.query(Prospect.id)
+    if data.prospect_ids is not None:
+        query = query.filter(Prospect.id.in_(data.prospect_ids))
+    if data.filters:
+        if data.filters.status:
+            query = query.filter(Prospect.status == data.filters.status)
+        if data.filters.min_icp_score is not None:
+            query = query.filter(Prospect.icp_score >= data.filters.min_icp_score)
+        if data.filters.search:
+            search_term = f"%{data.filters.search}%"
+            query = query.filter(
+                (Prospect.full_name.ilike(search_term)) |
+                (Prospect.email.ilike(search_term)) |
+                (Prospect.company_name.ilike(search_term))
+            )
+    prospect_ids = [prospect_id for (prospect_id,) in query.order_by(Prospect.id)]
+
+    if not prospect_ids:
+        raise HTTPException(status_code=400, detail="No prospects match the request")
+
+    job = GenerationJob(
+        icp_config_id=icp_config.id,
+        mode=data.mode,
+        channels=[channel.value for channel in data.channels],
+        message_types=data.message_types,
+        filters=data.filters.dict(exclude_none=True) if data.filters else {},
+        total=len(prospect_ids),
+        status=JobStatus.PENDING
+    )
+    db.add(job)
+    db.flush()
+
+    db.execute(
+        insert(GenerationJobItem),
+        [
+            {"job_id": job.id, "prospect_id": prospect_id, "status": JobItemStatus.PENDING}
+            for prospect_id in prospect_ids
+        ]
+    )
+    db.commit()
+    db.refresh(job)
+
+    job_runner.submit(job.id)
+    return job_to_dict(job)
+
+
+@router.get("")
+async def list_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    jobs = db.query(GenerationJob).order_by(GenerationJob.created_at.desc()).limit(limit).all()
+    return [job_to_dict(job) for job in jobs]
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: int, db: Session = Depends(get_db)):
+    job = db.query(GenerationJob).filter(GenerationJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    failures = db.query(GenerationJobItem).filter(
+        GenerationJobItem.job_id == job_id,
+        GenerationJobItem.status == JobItemStatus.FAILED
+    ).limit(50).all()
+
+    return {
+        **job_to_dict(job),
+        "failures": [{"prospect_id": item.prospect_id, "error": item.error} for item in failures]
+    }
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(job_id: int):
+    """Stream job progress as server-sent events until the job finishes"""
+
+    def load_job() -> Optional[dict]:
+        db = SessionLocal()
+        try:
+            job = db.query(GenerationJob).filter(GenerationJob.id == job_id).first()
+            return job_to_dict(job) if job else None
+        finally:
+            db.close()
+
+    if load_job() is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        last = None
+        while True:
+            job = load_job()
+            if job != last:
+                yield f"event: progress\ndata: {json.dumps(job)}\n\n"
+                last = job
+            if job["status"] in [status.value for status in TERMINAL_STATUSES]:
+                yield f"event: done\ndata: {json.dumps(job)}\n\n"
+                return
+            await asyncio.sleep(1)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@router.post("/{job_id}/cancel")
+async def cancel_job(job_id: int, db: Session = Depends(get_db)):
+    job = db.query(GenerationJob).filter(GenerationJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if job.status in TERMINAL_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Job already {job.status.value}")
+
+    job.status = JobStatus.CANCELLED
+    db.commit()
+    job_runner.cancel(job_id)
+    return {"message": "Job cancelled"}
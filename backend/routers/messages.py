@@ -1,15 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload, load_only
+from typing import List, Optional, Tuple
+from pydantic import BaseModel, Field
 from datetime import datetime
+import asyncio
+import json
 
-from database import get_db
+from database import get_db, SessionLocal
+from pagination import paginate
 from models.message import Message, MessageStatus, MessageChannel
 from models.prospect import Prospect, ProspectStatus
 from models.icp import ICPConfig
-from services.enrichment import EnrichmentService
 from services.message_generator import MessageGenerator
+from services.pipeline import GenerationPipeline
+from services.research_cache import ResearchCache
+from services.search import search_index
 from config import settings
 
 router = APIRouter(prefix="/api/messages", tags=["messages"])
@@ -20,6 +26,8 @@ class GenerateRequest(BaseModel):
     prospect_id: int
     channels: List[MessageChannel] = [MessageChannel.LINKEDIN, MessageChannel.EMAIL]
     message_types: List[str] = ["initial"]
+    max_concurrency: Optional[int] = Field(None, ge=1)  # Capped by MESSAGE_GENERATION_CONCURRENCY
+    refresh_research: bool = False  # Bypass the research cache
 
 
 class MessageUpdate(BaseModel):
@@ -43,17 +51,53 @@ class MessageResponse(BaseModel):
         from_attributes = True
 
 
+# Columns serialized by the list endpoints, loaded without the rest of the row
+MESSAGE_LIST_COLUMNS = (
+    Message.id,
+    Message.prospect_id,
+    Message.channel,
+    Message.message_type,
+    Message.subject,
+    Message.content,
+    Message.hook,
+    Message.status,
+    Message.created_at,
+)
+MESSAGE_PROSPECT_COLUMNS = (
+    Prospect.id,
+    Prospect.full_name,
+    Prospect.first_name,
+    Prospect.last_name,
+    Prospect.title,
+    Prospect.company_name,
+    Prospect.email,
+    Prospect.linkedin_url,
+)
+
+
 # Routes
 @router.get("/", response_model=dict)
 async def list_messages(
     status: Optional[MessageStatus] = None,
     prospect_id: Optional[int] = None,
     channel: Optional[MessageChannel] = None,
+    search: Optional[str] = None,
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    with_total: Optional[bool] = None,
     db: Session = Depends(get_db)
 ):
-    query = db.query(Message)
+    """
+    List messages, newest first, or best match first when searching the
+    subject and content. Follow next_cursor for the next page; the total is
+    only counted for the first page unless with_total is set.
+    """
+    # Prospects are joined into the same statement instead of loaded per row
+    query = db.query(Message).options(
+        load_only(*MESSAGE_LIST_COLUMNS),
+        joinedload(Message.prospect).load_only(*MESSAGE_PROSPECT_COLUMNS)
+    )
 
     if status:
         query = query.filter(Message.status == status)
@@ -62,8 +106,33 @@ async def list_messages(
     if channel:
         query = query.filter(Message.channel == channel)
 
-    total = query.count()
-    messages = query.order_by(Message.created_at.desc()).offset((page - 1) * per_page).limit(per_page).all()
+    hits = search_index.message_hits(search) if search else None
+    if hits is not None:
+        page_result = paginate(
+            query.join(hits, hits.c.id == Message.id).add_columns(hits.c.rank),
+            [hits.c.rank, Message.id],
+            per_page,
+            cursor=cursor,
+            page=page,
+            with_total=with_total,
+            scope="messages:relevance",
+            key=lambda row: (row.rank, row.Message.id)
+        )
+        messages = [row.Message for row in page_result["items"]]
+    else:
+        if search:
+            search_term = f"%{search}%"
+            query = query.filter(Message.subject.ilike(search_term) | Message.content.ilike(search_term))
+        page_result = paginate(
+            query,
+            [Message.created_at, Message.id],
+            per_page,
+            cursor=cursor,
+            page=page,
+            with_total=with_total,
+            scope="messages"
+        )
+        messages = page_result["items"]
 
     # Include prospect info for approved messages
     result = []
@@ -94,21 +163,28 @@ async def list_messages(
 
     return {
         "messages": result,
-        "total": total,
-        "page": page,
-        "per_page": per_page
+        "total": page_result["total"],
+        "page": page_result["page"],
+        "per_page": per_page,
+        "pages": page_result["pages"],
+        "next_cursor": page_result["next_cursor"]
     }
 
 
-@router.get("/prospect/{prospect_id}")
+@router.get("/prospect/{prospect_id}", response_model=List[MessageResponse])
 async def get_prospect_messages(prospect_id: int, db: Session = Depends(get_db)):
-    messages = db.query(Message).filter(Message.prospect_id == prospect_id).order_by(Message.created_at.desc()).all()
+    messages = (
+        db.query(Message)
+        .options(load_only(*MESSAGE_LIST_COLUMNS))
+        .filter(Message.prospect_id == prospect_id)
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .all()
+    )
     return messages
 
 
-@router.post("/generate")
-async def generate_messages(request: GenerateRequest, db: Session = Depends(get_db)):
-    """Generate AI-powered messages for a prospect"""
+def start_generation(request: GenerateRequest, db: Session) -> Tuple[Prospect, ICPConfig, GenerationPipeline]:
+    """Validate a generate request and mark the prospect as being researched"""
     # Get prospect
     prospect = db.query(Prospect).filter(Prospect.id == request.prospect_id).first()
     if not prospect:
@@ -127,75 +203,41 @@ async def generate_messages(request: GenerateRequest, db: Session = Depends(get_
     prospect.status = ProspectStatus.RESEARCHING
     db.commit()
 
-    try:
-        # Research the prospect
-        enrichment_service = EnrichmentService()
-        research_data = await enrichment_service.research_prospect(
-            prospect_data={
-                "name": prospect.full_name,
-                "title": prospect.title,
-                "company": prospect.company_name,
-                "linkedin_url": prospect.linkedin_url,
-                "twitter_url": prospect.twitter_url,
-            },
-            icp_context=icp_config.to_prompt_context()
-        )
-
-        # Update prospect with research
-        prospect.research_summary = research_data.get("summary", "")
-        prospect.research_data = research_data
-        prospect.personalization_hooks = research_data.get("personalization_hooks", [])
-        prospect.researched_at = datetime.utcnow()
+    concurrency = min(
+        request.max_concurrency or settings.MESSAGE_GENERATION_CONCURRENCY,
+        settings.MESSAGE_GENERATION_CONCURRENCY
+    )
+    return prospect, icp_config, GenerationPipeline(concurrency=concurrency)
 
-        # Update ICP score
-        icp_signals = research_data.get("icp_signals_found", {})
-        prospect.icp_score = icp_signals.get("confidence_score", 50)
-        prospect.icp_match_reasons = icp_signals.get("positive_signals", [])
 
-        # Generate messages
-        message_generator = MessageGenerator()
-        generated_messages = []
-
-        for channel in request.channels:
-            for msg_type in request.message_types:
-                message_content = await message_generator.generate(
-                    prospect_data={
-                        "name": prospect.full_name,
-                        "first_name": prospect.first_name,
-                        "title": prospect.title,
-                        "company": prospect.company_name,
-                    },
-                    research_data=research_data,
-                    icp_context=icp_config.to_prompt_context(),
-                    channel=channel.value,
-                    message_type=msg_type
-                )
+@router.post("/generate")
+async def generate_messages(request: GenerateRequest, db: Session = Depends(get_db)):
+    """Generate AI-powered messages for a prospect"""
+    prospect, icp_config, pipeline = start_generation(request, db)
 
-                message = Message(
-                    prospect_id=prospect.id,
-                    channel=channel,
-                    message_type=msg_type,
-                    subject=message_content.get("subject"),
-                    content=message_content.get("body", message_content.get("content", "")),
-                    hook=message_content.get("hook"),
-                    status=MessageStatus.READY_FOR_REVIEW,
-                    generation_context={
-                        "research": research_data,
-                        "icp": icp_config.name
-                    }
-                )
-                db.add(message)
-                generated_messages.append(message)
+    try:
+        result = await pipeline.run(
+            db,
+            prospect,
+            icp_context=icp_config.to_prompt_context(),
+            icp_name=icp_config.name,
+            channels=request.channels,
+            message_types=request.message_types,
+            refresh_research=request.refresh_research
+        )
+        failed = result["failed"]
 
         # Update prospect status
         prospect.status = ProspectStatus.READY_FOR_REVIEW
         db.commit()
 
         return {
-            "message": "Messages generated successfully",
+            "message": "Messages generated successfully" if not failed else "Messages partially generated",
             "research_summary": prospect.research_summary,
             "icp_score": prospect.icp_score,
-            "messages_generated": len(generated_messages)
+            "research_cached": result["research_cached"],
+            "messages_generated": len(result["messages"]),
+            "failed": failed
         }
 
     except Exception as e:
@@ -204,6 +246,91 @@ async def generate_messages(request: GenerateRequest, db: Session = Depends(get_
         raise HTTPException(status_code=500, detail=f"Generation failed: {str(e)}")
 
 
+@router.post("/generate/stream")
+async def generate_messages_stream(request: GenerateRequest, db: Session = Depends(get_db)):
+    """
+    Generate messages for a prospect, streaming progress as server-sent events.
+
+    Emits "research" once research is available, "delta" with each chunk of
+    message text, "message" or "error" as each channel/message type finishes,
+    and finally "done" with the saved message ids, or "failed".
+    """
+    prospect, icp_config, pipeline = start_generation(request, db)
+    prospect_id = prospect.id
+    icp_context = icp_config.to_prompt_context()
+    icp_name = icp_config.name
+
+    async def event_stream():
+        events: asyncio.Queue = asyncio.Queue()
+
+        async def generate():
+            # The request session is closed once streaming starts, so use our own
+            stream_db = SessionLocal()
+            prospect = stream_db.get(Prospect, prospect_id)
+            try:
+                result = await pipeline.run(
+                    stream_db,
+                    prospect,
+                    icp_context=icp_context,
+                    icp_name=icp_name,
+                    channels=request.channels,
+                    message_types=request.message_types,
+                    refresh_research=request.refresh_research,
+                    on_event=lambda event, data: events.put_nowait((event, data))
+                )
+                prospect.status = ProspectStatus.READY_FOR_REVIEW
+                stream_db.commit()
+                events.put_nowait(("done", {
+                    "research_summary": prospect.research_summary,
+                    "icp_score": prospect.icp_score,
+                    "research_cached": result["research_cached"],
+                    "messages_generated": len(result["messages"]),
+                    "message_ids": [message.id for message in result["messages"]],
+                    "failed": result["failed"]
+                }))
+            except BaseException as e:
+                # Also reached when the client disconnects and the task is cancelled
+                prospect.status = ProspectStatus.NEW
+                stream_db.commit()
+                if not isinstance(e, Exception):
+                    raise
+                events.put_nowait(("failed", {"error": f"Generation failed: {str(e)}"}))
+            finally:
+                stream_db.close()
+                events.put_nowait(None)
+
+        task = asyncio.create_task(generate())
+        try:
+            while True:
+                item = await events.get()
+                if item is None:
+                    return
+                event, data = item
+                yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.delete("/research-cache")
+async def clear_research_cache(prospect_id: Optional[int] = None, db: Session = Depends(get_db)):
+    """Invalidate cached research for one prospect, or all of it"""
+    research_cache = ResearchCache(db)
+    if prospect_id:
+        removed = research_cache.invalidate_prospect(prospect_id)
+    else:
+        removed = research_cache.invalidate_all()
+    db.commit()
+    return {"message": "Research cache cleared", "removed": removed}
+
+
 @router.put("/{message_id}")
 async def update_message(message_id: int, data: MessageUpdate, db: Session = Depends(get_db)):
     message = db.query(Message).filter(Message.id == message_id).first()
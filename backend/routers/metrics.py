@@ -0,0 +1,32 @@
+from fastapi import APIRouter
+
+from database import async_engine, engine, pool_metrics
+from services.llm import usage_metrics
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.get("/llm")
+async def get_llm_metrics():
+    """Token usage per LLM operation, including prompt-cache reads and writes"""
+    return usage_metrics.snapshot()
+
+
+@router.post("/llm/reset")
+async def reset_llm_metrics():
+    """Reset the token usage counters"""
+    usage_metrics.reset()
+    return {"success": True}
+
+
+@router.get("/db")
+async def get_db_metrics():
+    """Connection pool checkouts, wait times and overflow, across the sync and async pools"""
+    return pool_metrics.snapshot({"sync": engine.pool, "async": async_engine.pool})
+
+
+@router.post("/db/reset")
+async def reset_db_metrics():
+    """Reset the connection pool counters"""
+    pool_metrics.reset()
+    return {"success": True}
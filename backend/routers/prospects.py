@@ -1,18 +1,53 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only, undefer_group
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
-import csv
-import io
+import os
+import shutil
+import uuid
 
-from database import get_db
+from database import get_async_db, get_db
+from pagination import paginate_async
+from config import settings
 from models.prospect import Prospect, ProspectStatus
 from models.company import Company
 from models.icp import ICPConfig
-from services.icp_scorer import ICPScorer
+from models.import_job import ImportJob, ImportJobError
+from models.job import JobStatus
+from services.company_enrichment import normalize_company_name
+from services.import_runner import import_runner
+from services.search import search_index
 
 router = APIRouter(prefix="/api/prospects", tags=["prospects"], redirect_slashes=False)
+
+
+# Columns prospect_to_dict() reads, plus the sort columns, for list pages
+PROSPECT_LIST_COLUMNS = (
+    Prospect.id,
+    Prospect.first_name,
+    Prospect.last_name,
+    Prospect.full_name,
+    Prospect.email,
+    Prospect.phone,
+    Prospect.title,
+    Prospect.company_name,
+    Prospect.company_id,
+    Prospect.linkedin_url,
+    Prospect.twitter_url,
+    Prospect.status,
+    Prospect.source,
+    Prospect.icp_score,
+    Prospect.icp_match_reasons,
+    Prospect.research_summary,
+    Prospect.created_at,
+    Prospect.updated_at,
+)
+
+
 def prospect_to_dict(p):
     return {
         "id": p.id,
@@ -35,8 +70,6 @@ def prospect_to_dict(p):
     }
 
 
-
-
 # Schemas
 class ProspectCreate(BaseModel):
     first_name: Optional[str] = None
@@ -86,53 +119,106 @@ class ProspectResponse(BaseModel):
         from_attributes = True
 
 
+class ProspectDetailResponse(ProspectResponse):
+    research_data: Optional[dict] = None
+    linkedin_data: Optional[dict] = None
+    twitter_data: Optional[dict] = None
+    personalization_hooks: Optional[list] = None
+    pain_points_identified: Optional[list] = None
+    mutual_connections: Optional[list] = None
+    recent_activity: Optional[list] = None
+
+
 # Routes
+# Columns the prospect list can be sorted by, besides search relevance; all
+# NOT NULL, as cursors require
+SORT_COLUMNS = {
+    "created_at": Prospect.created_at,
+    "updated_at": Prospect.updated_at,
+    "icp_score": Prospect.icp_score,
+    "full_name": Prospect.full_name,
+}
+
+
 @router.get("", response_model=dict)
 async def list_prospects(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    with_total: Optional[bool] = None,
     status: Optional[ProspectStatus] = None,
     search: Optional[str] = None,
-    sort_by: str = "created_at",
+    sort_by: Optional[str] = None,
     sort_order: str = "desc",
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(Prospect)
+    """
+    List prospects. Follow next_cursor for the next page; the total is only
+    counted for the first page unless with_total is set. See paginate().
+
+    search matches word prefixes in names, emails, companies, titles and
+    research summaries through the text index, best matches first unless
+    sort_by is given.
+    """
+    # Only the listed columns; touching any other would need I/O the async session can't do lazily
+    query = select(Prospect).options(load_only(*PROSPECT_LIST_COLUMNS, raiseload=True))
 
     # Filters
     if status:
-        query = query.filter(Prospect.status == status)
-    if search:
+        query = query.where(Prospect.status == status)
+    hits = search_index.prospect_hits(search) if search else None
+    if hits is not None:
+        query = query.join(hits, hits.c.id == Prospect.id)
+    elif search:
         search_term = f"%{search}%"
-        query = query.filter(
+        query = query.where(
             (Prospect.full_name.ilike(search_term)) |
             (Prospect.email.ilike(search_term)) |
             (Prospect.company_name.ilike(search_term))
         )
 
-    # Sorting
-    sort_column = getattr(Prospect, sort_by, Prospect.created_at)
-    if sort_order == "desc":
-        query = query.order_by(sort_column.desc())
+    # Sorting, ties by id
+    if hits is not None and sort_by in (None, "relevance"):
+        result = await paginate_async(
+            db,
+            query.add_columns(hits.c.rank),
+            [hits.c.rank, Prospect.id],
+            per_page,
+            cursor=cursor,
+            page=page,
+            with_total=with_total,
+            scope="prospects:relevance",
+            key=lambda row: (row.rank, row.Prospect.id)
+        )
+        result["items"] = [row.Prospect for row in result["items"]]
     else:
-        query = query.order_by(sort_column.asc())
-
-    # Pagination
-    total = query.count()
-    prospects = query.offset((page - 1) * per_page).limit(per_page).all()
+        if sort_by not in SORT_COLUMNS:
+            sort_by = "created_at"
+        result = await paginate_async(
+            db,
+            query,
+            [SORT_COLUMNS[sort_by], Prospect.id],
+            per_page,
+            descending=sort_order == "desc",
+            cursor=cursor,
+            page=page,
+            with_total=with_total,
+            scope=f"prospects:{sort_by}:{sort_order == 'desc'}"
+        )
 
     return {
-        "prospects": [prospect_to_dict(p) for p in prospects],
-        "total": total,
-        "page": page,
+        "prospects": [prospect_to_dict(p) for p in result["items"]],
+        "total": result["total"],
+        "page": result["page"],
         "per_page": per_page,
-        "pages": (total + per_page - 1) // per_page
+        "pages": result["pages"],
+        "next_cursor": result["next_cursor"]
     }
 
 
-@router.get("/{prospect_id}", response_model=ProspectResponse)
+@router.get("/{prospect_id}", response_model=ProspectDetailResponse)
 async def get_prospect(prospect_id: int, db: Session = Depends(get_db)):
-    prospect = db.query(Prospect).filter(Prospect.id == prospect_id).first()
+    prospect = db.query(Prospect).options(undefer_group("details")).filter(Prospect.id == prospect_id).first()
     if not prospect:
         raise HTTPException(status_code=404, detail="Prospect not found")
     return prospect
@@ -143,9 +229,10 @@ async def create_prospect(data: ProspectCreate, db: Session = Depends(get_db)):
     # Create or find company
     company = None
     if data.company_name:
-        company = db.query(Company).filter(Company.name == data.company_name).first()
+        normalized_name = normalize_company_name(data.company_name)
+        company = db.query(Company).filter(Company.normalized_name == normalized_name).first()
         if not company:
-            company = Company(name=data.company_name)
+            company = Company(name=data.company_name, normalized_name=normalized_name)
             db.add(company)
             db.flush()
 
@@ -197,118 +284,97 @@ async def delete_prospect(prospect_id: int, db: Session = Depends(get_db)):
     return {"message": "Prospect deleted"}
 
 
+def import_job_to_dict(job: ImportJob) -> dict:
+    return {
+        "id": job.id,
+        "status": job.status.value,
+        "filename": job.filename,
+        "rows_parsed": job.rows_parsed or 0,
+        "rows_inserted": job.rows_inserted or 0,
+        "rows_skipped": job.rows_skipped or 0,
+        "rows_duplicate": job.rows_duplicate or 0,
+        "rows_scored": job.rows_scored or 0,
+        "rows_failed": job.rows_failed or 0,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def save_upload(file: UploadFile) -> str:
+    """Copy an upload to the import directory and return its path"""
+    os.makedirs(settings.IMPORT_UPLOAD_DIR, exist_ok=True)
+    path = os.path.join(settings.IMPORT_UPLOAD_DIR, f"{uuid.uuid4().hex}.csv")
+    with open(path, "wb") as destination:
+        shutil.copyfileobj(file.file, destination)
+    return path
+
+
 @router.post("/import/csv")
 async def import_csv(
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
-    """Import prospects from CSV file"""
+    """Start a background import of prospects from a CSV file"""
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="File must be a CSV")
 
-    content = await file.read()
-    decoded = content.decode('utf-8')
-    reader = csv.DictReader(io.StringIO(decoded))
-
     # Get active ICP for scoring
     icp_config = db.query(ICPConfig).filter(ICPConfig.is_default == True).first()
-    scorer = ICPScorer(icp_config) if icp_config else None
-
-    imported = 0
-    skipped = 0
-    prospects_created = []
-
-    # Column name mapping (handle various formats)
-    column_mappings = {
-        'first_name': ['first_name', 'firstname', 'first name', 'First Name'],
-        'last_name': ['last_name', 'lastname', 'last name', 'Last Name'],
-        'full_name': ['full_name', 'fullname', 'full name', 'Full Name', 'name', 'Name'],
-        'email': ['email', 'Email', 'email_address', 'Email Address'],
-        'phone': ['phone', 'Phone', 'phone_number', 'Phone Number'],
-        'title': ['title', 'Title', 'job_title', 'Job Title', 'position', 'Position'],
-        'company': ['company', 'Company', 'company_name', 'Company Name', 'organization'],
-        'linkedin_url': ['linkedin_url', 'linkedin', 'LinkedIn', 'LinkedIn URL', 'Personal Linkedin URL', 'Personal LinkedIn URL', 'profile url'],
-        'twitter_url': ['twitter_url', 'twitter', 'Twitter', 'Twitter URL'],
-    }
-
-    def get_value(row, field):
-        for possible_name in column_mappings.get(field, []):
-            if possible_name in row and row[possible_name]:
-                return row[possible_name].strip()
-        return None
-
-    for row in reader:
-        # Extract data
-        first_name = get_value(row, 'first_name') or ''
-        last_name = get_value(row, 'last_name') or ''
-        full_name = get_value(row, 'full_name') or f"{first_name} {last_name}".strip() or (get_value(row, 'linkedin_url') or '').split('/')[-1]
-        email = get_value(row, 'email')
-
-        linkedin_url = get_value(row, 'linkedin_url')
-        if not full_name and not email and not linkedin_url:
-            skipped += 1
-            continue
-
-        # Check for duplicates
-        if email:
-            existing = db.query(Prospect).filter(Prospect.email == email).first()
-            if existing:
-                skipped += 1
-                continue
-
-        # Create or find company
-        company_name = get_value(row, 'company')
-        company = None
-        if company_name:
-            company = db.query(Company).filter(Company.name == company_name).first()
-            if not company:
-                company = Company(name=company_name)
-                db.add(company)
-                db.flush()
-
-        # Create prospect
-        prospect = Prospect(
-            first_name=first_name or None,
-            last_name=last_name or None,
-            full_name=full_name,
-            email=email,
-            phone=get_value(row, 'phone'),
-            title=get_value(row, 'title'),
-            company_name=company_name,
-            company_id=company.id if company else None,
-            linkedin_url=get_value(row, 'linkedin_url'),
-            twitter_url=get_value(row, 'twitter_url'),
-            source="csv",
-            status=ProspectStatus.NEW
-        )
-        db.add(prospect)
-        db.flush()
-
-        # Score against ICP if available
-        if scorer:
-            score_result = scorer.score_prospect(
-                prospect_data={
-                    "title": prospect.title,
-                    "seniority": prospect.seniority,
-                },
-                company_data={
-                    "name": company_name,
-                    "industry": company.industry if company else None,
-                    "employee_count": company.employee_count if company else None,
-                },
-                research_data={}
-            )
-            prospect.icp_score = score_result.get("total_score", 0)
-            prospect.icp_match_reasons = score_result.get("match_reasons", [])
-
-        prospects_created.append(prospect)
-        imported += 1
 
+    job = ImportJob(
+        filename=file.filename,
+        file_path=await run_in_threadpool(save_upload, file),
+        icp_config_id=icp_config.id if icp_config else None,
+        status=JobStatus.PENDING
+    )
+    db.add(job)
     db.commit()
+    db.refresh(job)
+
+    import_runner.submit(job.id)
+    return import_job_to_dict(job)
+
 
+@router.get("/import/jobs")
+async def list_import_jobs(limit: int = Query(20, ge=1, le=100), db: Session = Depends(get_db)):
+    jobs = db.query(ImportJob).order_by(ImportJob.id.desc()).limit(limit).all()
+    return [import_job_to_dict(job) for job in jobs]
+
+
+@router.get("/import/jobs/{job_id}")
+async def get_import_job(
+    job_id: int,
+    errors_limit: int = Query(100, ge=0, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Import progress, with the first row errors"""
+    job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+
+    row_errors = db.query(ImportJobError).filter(
+        ImportJobError.job_id == job_id
+    ).order_by(ImportJobError.row_number).limit(errors_limit).all()
     return {
-        "message": f"Import complete",
-        "imported": imported,
-        "skipped": skipped,
-        "prospects": [{"id": p.id, "name": p.full_name, "icp_score": p.icp_score} for p in prospects_created[:10]]
+        **import_job_to_dict(job),
+        "row_errors": [{"row": error.row_number, "error": error.error} for error in row_errors]
     }
+
+
+@router.post("/import/jobs/{job_id}/cancel")
+async def cancel_import_job(job_id: int, db: Session = Depends(get_db)):
+    """Stop an import. Rows already committed stay imported."""
+    job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    if job.status not in (JobStatus.PENDING, JobStatus.RUNNING):
+        raise HTTPException(status_code=400, detail=f"Import job is already {job.status.value}")
+
+    job.status = JobStatus.CANCELLED
+    job.finished_at = datetime.utcnow()
+    db.commit()
+
+    import_runner.cancel(job_id)
+    return import_job_to_dict(job)
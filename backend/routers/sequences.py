@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime, timedelta
@@ -36,7 +36,8 @@ async def get_templates():
 
 @router.get("")
 async def list_sequences(db: Session = Depends(get_db)):
-    seqs = db.query(Sequence).order_by(Sequence.created_at.desc()).all()
+    # Steps of all sequences in one extra query, already in step order
+    seqs = db.query(Sequence).options(selectinload(Sequence.steps)).order_by(Sequence.created_at.desc()).all()
     result = []
     for seq in seqs:
         result.append({
@@ -52,7 +53,7 @@ async def list_sequences(db: Session = Depends(get_db)):
                     "name": step.name,
                     "delay_days": step.delay_days,
                 }
-                for step in sorted(seq.steps, key=lambda x: x.order)
+                for step in seq.steps
             ],
             "created_at": seq.created_at.isoformat() if seq.created_at else None,
         })
@@ -77,7 +78,7 @@ async def get_sequence(sequence_id: int, db: Session = Depends(get_db)):
                 "name": step.name,
                 "delay_days": step.delay_days,
             }
-            for step in sorted(seq.steps, key=lambda x: x.order)
+            for step in seq.steps
         ],
     }
 
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 from typing import Optional
 
 from database import get_db
+from pagination import paginate
 from models.prospect import Prospect, ProspectStatus
 from models.message import Message, MessageStatus
+from services.workflow_stats import mark_stats_stale, workflow_stats
 
 router = APIRouter(prefix="/api/workflow", tags=["workflow"])
 
@@ -14,21 +16,56 @@ async def get_review_queue(
     status: Optional[str] = "ready_for_review",
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    with_total: Optional[bool] = None,
     db: Session = Depends(get_db)
 ):
-    """Get prospects in the review queue"""
-    query = db.query(Prospect)
-
-    if status == "ready_for_review":
-        query = query.filter(Prospect.status == ProspectStatus.READY_FOR_REVIEW)
-    elif status == "approved":
-        query = query.filter(Prospect.status == ProspectStatus.APPROVED)
-
-    # Order by ICP score (highest first)
-    query = query.order_by(Prospect.icp_score.desc())
-
-    total = query.count()
-    prospects = query.offset((page - 1) * per_page).limit(per_page).all()
+    """
+    Get prospects in the review queue, highest ICP score first.
+
+    Follow next_cursor for the next page. Cursor pages are read straight off
+    the (status, icp_score, id) index, so each costs the size of the page
+    rather than a sort of the whole status. The first page's total comes
+    from the cached workflow stats; with_total counts it exactly instead.
+    """
+    query = db.query(Prospect).options(load_only(
+        Prospect.id,
+        Prospect.full_name,
+        Prospect.first_name,
+        Prospect.last_name,
+        Prospect.title,
+        Prospect.company_name,
+        Prospect.email,
+        Prospect.linkedin_url,
+        Prospect.icp_score,
+        Prospect.icp_match_reasons,
+        Prospect.research_summary,
+        Prospect.status
+    ))
+
+    queue_status = {
+        "ready_for_review": ProspectStatus.READY_FOR_REVIEW,
+        "approved": ProspectStatus.APPROVED,
+    }.get(status)
+    if queue_status:
+        query = query.filter(Prospect.status == queue_status)
+
+    # Order by ICP score (highest first), ties by newest
+    result = paginate(
+        query,
+        [Prospect.icp_score, Prospect.id],
+        per_page,
+        cursor=cursor,
+        page=page,
+        with_total=bool(with_total),
+        scope="queue"
+    )
+    prospects = result["items"]
+    total, pages = result["total"], result["pages"]
+    if total is None and cursor is None:
+        stats = workflow_stats.get(db)
+        total = stats[queue_status.value] if queue_status else stats["total_prospects"]
+        pages = (total + per_page - 1) // per_page
 
     return {
         "prospects": [
@@ -49,8 +86,10 @@ async def get_review_queue(
             for p in prospects
         ],
         "total": total,
-        "page": page,
-        "per_page": per_page
+        "page": result["page"],
+        "per_page": per_page,
+        "pages": pages,
+        "next_cursor": result["next_cursor"]
     }
 
 
@@ -71,6 +110,7 @@ async def workflow_action(
             Message.prospect_id == prospect_id,
             Message.status == MessageStatus.READY_FOR_REVIEW
         ).update({"status": MessageStatus.APPROVED})
+        mark_stats_stale(db)
 
         prospect.status = ProspectStatus.APPROVED
         db.commit()
@@ -82,6 +122,7 @@ async def workflow_action(
             Message.prospect_id == prospect_id,
             Message.status == MessageStatus.READY_FOR_REVIEW
         ).update({"status": MessageStatus.REJECTED})
+        mark_stats_stale(db)
 
         prospect.status = ProspectStatus.NOT_INTERESTED
         db.commit()
@@ -99,15 +140,9 @@ async def workflow_action(
 
 @router.get("/stats")
 async def get_workflow_stats(db: Session = Depends(get_db)):
-    """Get workflow statistics"""
-    return {
-        "total_prospects": db.query(Prospect).count(),
-        "new": db.query(Prospect).filter(Prospect.status == ProspectStatus.NEW).count(),
-        "researching": db.query(Prospect).filter(Prospect.status == ProspectStatus.RESEARCHING).count(),
-        "ready_for_review": db.query(Prospect).filter(Prospect.status == ProspectStatus.READY_FOR_REVIEW).count(),
-        "approved": db.query(Prospect).filter(Prospect.status == ProspectStatus.APPROVED).count(),
-        "contacted": db.query(Prospect).filter(Prospect.status == ProspectStatus.CONTACTED).count(),
-        "responded": db.query(Prospect).filter(Prospect.status == ProspectStatus.RESPONDED).count(),
-        "meeting_booked": db.query(Prospect).filter(Prospect.status == ProspectStatus.MEETING_BOOKED).count(),
-        "converted": db.query(Prospect).filter(Prospect.status == ProspectStatus.CONVERTED).count(),
-    }
+    """
+    Get workflow statistics: prospects and messages by status, and each
+    sequence's enrollments by status and by the step active prospects are on.
+    Served from a snapshot at most a few seconds old.
+    """
+    return workflow_stats.get(db)
@@ -0,0 +1,89 @@
+from typing import Optional, Sequence
+from alembic import command, op
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import Column, inspect
+from sqlalchemy.engine import Connection, Engine
+import os
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+
+def alembic_config(connection: Optional[Connection] = None) -> Config:
+    """Alembic config for the migrations directory, optionally run on an open connection"""
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def migrate(engine: Engine) -> Optional[str]:
+    """
+    Bring the schema up to the latest migration.
+
+    A database already at the head revision costs one read of its
+    alembic_version row. Returns the revision it was upgraded from
+    ("base" for a new or pre-migrations database), or None if it was
+    already current.
+    """
+    config = alembic_config()
+    head = ScriptDirectory.from_config(config).get_current_head()
+    with engine.connect() as connection:
+        current = MigrationContext.configure(connection).get_current_revision()
+    if current == head:
+        return None
+
+    with engine.begin() as connection:
+        command.upgrade(alembic_config(connection), "head")
+    return current or "base"
+
+
+# Helpers for migration scripts.
+#
+# Databases created before migrations existed hold whatever create_all() built
+# at the time, which may already include some of what the early revisions
+# add, so those revisions check before they add anything. Revisions spell out
+# their tables and columns rather than importing models, so the schema each
+# one produces stays fixed as the models change.
+
+def create_types(*types):
+    """Create named types (PostgreSQL enums) that tables share; a no-op elsewhere"""
+    for type_ in types:
+        type_.create(op.get_bind(), checkfirst=True)
+
+
+def drop_types(*types):
+    for type_ in types:
+        type_.drop(op.get_bind(), checkfirst=True)
+
+
+def has_table(table: str) -> bool:
+    return inspect(op.get_bind()).has_table(table)
+
+
+def has_column(table: str, column: str) -> bool:
+    return any(existing["name"] == column for existing in inspect(op.get_bind()).get_columns(table))
+
+
+def has_index(table: str, name: str) -> bool:
+    return any(existing["name"] == name for existing in inspect(op.get_bind()).get_indexes(table))
+
+
+def add_column_if_missing(table: str, column: Column):
+    if has_column(table, column.name):
+        return
+    if op.get_bind().dialect.name == "sqlite" and column.foreign_keys:
+        # SQLite can't add a constraint to an existing table (nor enforces it by default)
+        column = Column(column.name, column.type, nullable=column.nullable)
+    create_type = getattr(column.type, "create", None)
+    if create_type:
+        # e.g. a PostgreSQL enum; a no-op where enums are plain strings
+        create_type(op.get_bind(), checkfirst=True)
+    op.add_column(table, column)
+
+
+def create_index_if_missing(name: str, table: str, columns: Sequence[str], **kwargs):
+    if not has_index(table, name):
+        op.create_index(name, table, list(columns), **kwargs)
@@ -0,0 +1,339 @@
+from typing import AsyncIterator, Dict, List, Optional
+from collections import defaultdict
+from sqlalchemy.orm import Session, undefer
+import asyncio
+import httpx
+import json
+
+from config import settings
+from database import SessionLocal
+from models.job import GenerationJob, GenerationJobItem, JobStatus, JobItemStatus
+from models.message import MessageChannel
+from models.prospect import Prospect, ProspectStatus
+from services.enrichment import EnrichmentService
+from services.llm import usage_metrics
+from services.message_generator import MessageGenerator
+from services.pipeline import research_input, message_input, apply_research, build_message
+from services.research_cache import ResearchCache, research_cache_key
+from services.research_snapshots import ResearchSnapshots
+from services.structured_output import StructuredOutputError
+
+
+class MessageBatchClient:
+    """Minimal async client for the Message Batches API"""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
+        self.base_url = (base_url or settings.ANTHROPIC_BASE_URL).rstrip("/")
+        self.http = http_client or httpx.AsyncClient(timeout=settings.CLAUDE_TIMEOUT_SECONDS)
+        self.headers = {
+            "x-api-key": api_key or settings.ANTHROPIC_API_KEY or "",
+            "anthropic-version": "2023-06-01",
+        }
+
+    async def create(self, requests: List[dict]) -> dict:
+        response = await self.http.post(
+            f"{self.base_url}/v1/messages/batches",
+            json={"requests": requests},
+            headers=self.headers
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def retrieve(self, batch_id: str) -> dict:
+        response = await self.http.get(
+            f"{self.base_url}/v1/messages/batches/{batch_id}",
+            headers=self.headers
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def cancel(self, batch_id: str) -> dict:
+        response = await self.http.post(
+            f"{self.base_url}/v1/messages/batches/{batch_id}/cancel",
+            headers=self.headers
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def results(self, batch: dict) -> AsyncIterator[dict]:
+        """Stream the JSONL results of an ended batch"""
+        url = batch.get("results_url") or f"{self.base_url}/v1/messages/batches/{batch['id']}/results"
+        async with self.http.stream("GET", url, headers=self.headers) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line.strip():
+                    yield json.loads(line)
+
+    async def close(self):
+        await self.http.aclose()
+
+
+def result_text(result: dict) -> Optional[str]:
+    """Text of a succeeded batch result, or None if the request did not succeed"""
+    if result.get("result", {}).get("type") != "succeeded":
+        return None
+    for block in result["result"]["message"].get("content", []):
+        if block.get("type") == "text":
+            return block["text"]
+    return ""
+
+
+def record_usage(operation: str, result: dict):
+    if result.get("result", {}).get("type") == "succeeded":
+        usage_metrics.record(operation, result["result"]["message"].get("usage") or {})
+
+
+def result_error(result: dict) -> str:
+    outcome = result.get("result", {})
+    error = outcome.get("error") or {}
+    message = error.get("error", error).get("message") if isinstance(error, dict) else None
+    return f"Batch request {outcome.get('type', 'failed')}" + (f": {message}" if message else "")
+
+
+class BatchGenerator:
+    """
+    Runs a generation job through the Message Batches API.
+
+    Research and message prompts are built by EnrichmentService and
+    MessageGenerator and submitted as provider batches in two phases. The
+    submitted batch ids are checkpointed on the job, so a restart resumes
+    polling the same batches instead of re-submitting (and re-billing) them.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        batch_client: Optional[MessageBatchClient] = None,
+        poll_interval: Optional[float] = None,
+        max_requests: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.batch_client = batch_client
+        self.poll_interval = poll_interval or settings.BATCH_POLL_INTERVAL_SECONDS
+        self.max_requests = max_requests or settings.BATCH_MAX_REQUESTS
+        # Only prompt building and response parsing are used, never the live client
+        self.enrichment_service = EnrichmentService()
+        self.message_generator = MessageGenerator()
+
+    async def run(self, job_id: int, icp_context: dict, icp_name: str):
+        owns_client = self.batch_client is None
+        client = self.batch_client or MessageBatchClient()
+        db = self.session_factory()
+        try:
+            job = db.get(GenerationJob, job_id)
+            self._fail_deleted_prospects(db, job)
+            if (job.batch_state or {}).get("phase", "research") == "research":
+                await self._research_phase(db, client, job, icp_context)
+            await self._message_phase(db, client, job, icp_context, icp_name)
+
+        except asyncio.CancelledError:
+            # Stop provider-side work only when the job itself was cancelled,
+            # not when the process is shutting down and will resume later
+            db.rollback()
+            job = db.get(GenerationJob, job_id)
+            if job.status == JobStatus.CANCELLED:
+                for batch_id in (job.batch_state or {}).get("batch_ids", []):
+                    try:
+                        await client.cancel(batch_id)
+                    except httpx.HTTPError:
+                        pass
+            raise
+
+        finally:
+            db.close()
+            if owns_client:
+                await client.close()
+
+    def _pending_items(self, db: Session, job_id: int) -> list:
+        # Research is read for every prospect in the message phase
+        return db.query(GenerationJobItem, Prospect).options(undefer(Prospect.research_data)).join(
+            Prospect, Prospect.id == GenerationJobItem.prospect_id
+        ).filter(
+            GenerationJobItem.job_id == job_id,
+            GenerationJobItem.status == JobItemStatus.PENDING
+        ).order_by(GenerationJobItem.id).all()
+
+    def _set_state(self, db: Session, job: GenerationJob, phase: str, batch_ids: List[str]):
+        job.batch_state = {"phase": phase, "batch_ids": batch_ids}
+        db.commit()
+
+    async def _submit(self, client: MessageBatchClient, requests: List[dict]) -> List[str]:
+        batch_ids = []
+        for start in range(0, len(requests), self.max_requests):
+            batch = await client.create(requests[start:start + self.max_requests])
+            batch_ids.append(batch["id"])
+        return batch_ids
+
+    async def _wait(self, client: MessageBatchClient, batch_ids: List[str]) -> List[dict]:
+        batches = []
+        for batch_id in batch_ids:
+            while True:
+                batch = await client.retrieve(batch_id)
+                if batch["processing_status"] == "ended":
+                    break
+                await asyncio.sleep(self.poll_interval)
+            batches.append(batch)
+        return batches
+
+    def _fail_item(self, job: GenerationJob, item: GenerationJobItem, error: str):
+        item.status = JobItemStatus.FAILED
+        item.error = error
+        job.failed = (job.failed or 0) + 1
+
+    def _fail_deleted_prospects(self, db: Session, job: GenerationJob):
+        """Fail pending items whose prospect was deleted (prospect_id cleared), which no phase selects"""
+        for item in db.query(GenerationJobItem).filter(
+            GenerationJobItem.job_id == job.id,
+            GenerationJobItem.status == JobItemStatus.PENDING,
+            GenerationJobItem.prospect_id.is_(None)
+        ):
+            self._fail_item(job, item, "Prospect not found")
+        db.commit()
+
+    async def _research_phase(
+        self,
+        db: Session,
+        client: MessageBatchClient,
+        job: GenerationJob,
+        icp_context: dict
+    ):
+        research_cache = ResearchCache(db)
+        batch_ids = (job.batch_state or {}).get("batch_ids")
+        if not batch_ids:
+            # Prospects with cached research skip the batch entirely
+            requests = []
+            for item, prospect in self._pending_items(db, job.id):
+                prospect_data = research_input(prospect)
+                cached = research_cache.get(research_cache_key(prospect_data, icp_context))
+                if cached is not None:
+                    apply_research(prospect, cached)
+                    continue
+                requests.append({
+                    "custom_id": f"research-{item.id}",
+                    "params": self.enrichment_service.build_research_request(prospect_data, icp_context)
+                })
+            batch_ids = await self._submit(client, requests)
+            self._set_state(db, job, "research", batch_ids)
+
+        for batch in await self._wait(client, batch_ids):
+            async for result in client.results(batch):
+                record_usage("research_batch", result)
+                item_id = int(result["custom_id"].split("-")[1])
+                item = db.get(GenerationJobItem, item_id)
+                if item.status != JobItemStatus.PENDING:
+                    continue
+
+                text = result_text(result)
+                if text is None:
+                    self._fail_item(job, item, result_error(result))
+                    continue
+
+                try:
+                    research_data = self.enrichment_service.parse_research_response(text)
+                except StructuredOutputError as e:
+                    usage_metrics.record_parse("research_batch", "invalid")
+                    self._fail_item(job, item, f"Research failed: {e}")
+                    continue
+                usage_metrics.record_parse("research_batch", "valid")
+
+                prospect = db.get(Prospect, item.prospect_id) if item.prospect_id else None
+                if prospect is None:
+                    self._fail_item(job, item, "Prospect not found")
+                    continue
+                research_cache.put(
+                    research_cache_key(research_input(prospect), icp_context),
+                    research_data,
+                    prospect_id=prospect.id
+                )
+                apply_research(prospect, research_data)
+            db.commit()
+
+        self._set_state(db, job, "messages", [])
+
+    async def _message_phase(
+        self,
+        db: Session,
+        client: MessageBatchClient,
+        job: GenerationJob,
+        icp_context: dict,
+        icp_name: str
+    ):
+        combinations = [
+            (MessageChannel(channel), msg_type)
+            for channel in job.channels
+            for msg_type in job.message_types
+        ]
+
+        batch_ids = (job.batch_state or {}).get("batch_ids")
+        if not batch_ids:
+            requests = []
+            for item, prospect in self._pending_items(db, job.id):
+                for index, (channel, msg_type) in enumerate(combinations):
+                    requests.append({
+                        "custom_id": f"message-{item.id}-{index}",
+                        "params": self.message_generator.build_request(
+                            message_input(prospect),
+                            prospect.research_data or {},
+                            icp_context,
+                            channel.value,
+                            msg_type
+                        )
+                    })
+            batch_ids = await self._submit(client, requests)
+            self._set_state(db, job, "messages", batch_ids)
+
+        # Collect every combination per item before writing, so an item's
+        # messages and its checkpoint land in the same commit
+        outcomes: Dict[int, Dict[int, dict]] = defaultdict(dict)
+        for batch in await self._wait(client, batch_ids):
+            async for result in client.results(batch):
+                record_usage("message_batch", result)
+                _, item_id, index = result["custom_id"].split("-")
+                text = result_text(result)
+                if text is None:
+                    outcome = {"error": result_error(result)}
+                else:
+                    try:
+                        outcome = {"content": self.message_generator.parse_response(text)}
+                        usage_metrics.record_parse("message_batch", "valid")
+                    except StructuredOutputError as e:
+                        outcome = {"error": f"Message generation failed: {e}"}
+                        usage_metrics.record_parse("message_batch", "invalid")
+                outcomes[int(item_id)][int(index)] = outcome
+
+        # Prospects deleted while the batches ran
+        self._fail_deleted_prospects(db, job)
+        research_snapshots = ResearchSnapshots(db)
+        for position, (item, prospect) in enumerate(self._pending_items(db, job.id), start=1):
+            generated = 0
+            errors = []
+            research_snapshot = None
+            for index, (channel, msg_type) in enumerate(combinations):
+                outcome = outcomes[item.id].get(index, {"error": "Missing batch result"})
+                if "error" in outcome:
+                    errors.append(outcome["error"])
+                    continue
+                if research_snapshot is None:
+                    research_snapshot = research_snapshots.get_or_create(prospect.research_data or {})
+                db.add(build_message(
+                    prospect, channel, msg_type, outcome["content"], research_snapshot, icp_name
+                ))
+                generated += 1
+
+            if combinations and not generated:
+                self._fail_item(job, item, errors[0])
+            else:
+                item.status = JobItemStatus.COMPLETED
+                item.messages_generated = generated
+                item.error = "; ".join(errors) or None
+                prospect.status = ProspectStatus.READY_FOR_REVIEW
+                job.completed = (job.completed or 0) + 1
+
+            if position % 500 == 0:
+                db.commit()
+        db.commit()
@@ -0,0 +1,157 @@
+from typing import Optional
+from sqlalchemy import or_
+from datetime import datetime, timedelta
+import asyncio
+import re
+import weakref
+
+from config import settings
+from database import SessionLocal
+from models.company import Company
+from services.enrichment import EnrichmentService
+
+
+COMPANY_SUFFIXES = {
+    "inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation",
+    "co", "company", "gmbh", "plc", "sa", "ag", "bv", "pty",
+}
+
+
+def normalize_domain(value: Optional[str]) -> Optional[str]:
+    """Reduce a domain or website URL to a bare lowercase host"""
+    if not value:
+        return None
+    domain = value.strip().lower()
+    domain = re.sub(r"^[a-z]+://", "", domain)
+    domain = domain.split("/")[0].split("?")[0].split(":")[0]
+    if domain.startswith("www."):
+        domain = domain[4:]
+    return domain or None
+
+
+def normalize_company_name(name: Optional[str]) -> Optional[str]:
+    """Lowercase a company name and drop punctuation and legal suffixes"""
+    if not name:
+        return None
+    words = re.sub(r"[^a-z0-9]+", " ", name.lower()).split()
+    while len(words) > 1 and words[-1] in COMPANY_SUFFIXES:
+        words.pop()
+    return " ".join(words) or None
+
+
+def company_context(company: Optional[Company]) -> Optional[dict]:
+    """Stored enrichment of a company, in the shape used by prompts"""
+    if not company or not company.enriched_at:
+        return None
+    return {
+        "name": company.name,
+        "domain": company.domain,
+        "industry": company.industry,
+        "employee_range": company.employee_range,
+        "description": company.description,
+        "funding_stage": (company.funding_info or {}).get("stage"),
+        "tech_stack": company.tech_stack or [],
+        "recent_news": company.recent_news or [],
+    }
+
+
+class CompanyEnrichmentService:
+    """
+    Enriches each company once and shares the result with every prospect at it.
+
+    Results are written to the Company row in their own transaction, so they
+    survive even if the generation that triggered them fails. A company whose
+    normalized domain or name matches one that is already enriched copies that
+    enrichment instead of asking Claude again.
+    """
+
+    # Concurrent workers enriching the same company wait for the first one.
+    # Held weakly: a lock goes away once no worker is holding or awaiting it
+    _locks = weakref.WeakValueDictionary()  # str -> asyncio.Lock
+
+    def __init__(
+        self,
+        enrichment_service: Optional[EnrichmentService] = None,
+        session_factory=SessionLocal,
+        max_age_days: Optional[int] = None
+    ):
+        self.enrichment_service = enrichment_service or EnrichmentService()
+        self.session_factory = session_factory
+        self.max_age = timedelta(days=max_age_days or settings.COMPANY_ENRICHMENT_MAX_AGE_DAYS)
+
+    def is_fresh(self, company: Company) -> bool:
+        return bool(company.enriched_at) and datetime.utcnow() - company.enriched_at < self.max_age
+
+    async def ensure_enriched(self, company_id: int) -> bool:
+        """
+        Make sure a company has fresh enrichment.
+
+        Returns True if the company row was updated, so callers holding it in
+        another session know to refresh it.
+        """
+        db = self.session_factory()
+        try:
+            company = db.get(Company, company_id)
+            if not company or self.is_fresh(company):
+                return False
+
+            key = normalize_domain(company.domain) or normalize_company_name(company.name) or str(company.id)
+            lock = self._locks.setdefault(key, asyncio.Lock())
+            async with lock:
+                db.refresh(company)
+                if self.is_fresh(company):
+                    return True
+
+                company.normalized_name = normalize_company_name(company.name)
+                company.domain = normalize_domain(company.domain) or company.domain
+
+                sibling = self._find_enriched_sibling(db, company)
+                if sibling:
+                    self._copy_enrichment(sibling, company)
+                else:
+                    data = await self.enrichment_service.enrich_company(company.name, company.domain)
+                    if "error" in data:
+                        return False
+                    self._apply_enrichment(company, data)
+
+                db.commit()
+                return True
+        finally:
+            db.close()
+
+    def _find_enriched_sibling(self, db, company: Company) -> Optional[Company]:
+        matches = []
+        if company.domain:
+            matches.append(Company.domain == company.domain)
+        if company.normalized_name:
+            matches.append(Company.normalized_name == company.normalized_name)
+        if not matches:
+            return None
+
+        sibling = db.query(Company).filter(
+            Company.id != company.id,
+            Company.enriched_at.isnot(None),
+            or_(*matches)
+        ).order_by(Company.enriched_at.desc()).first()
+        return sibling if sibling and self.is_fresh(sibling) else None
+
+    def _copy_enrichment(self, source: Company, company: Company):
+        company.description = source.description
+        company.industry = company.industry or source.industry
+        company.employee_range = company.employee_range or source.employee_range
+        company.tech_stack = source.tech_stack
+        company.recent_news = source.recent_news
+        company.funding_info = source.funding_info
+        company.enriched_at = source.enriched_at
+
+    def _apply_enrichment(self, company: Company, data: dict):
+        company.description = data.get("description")
+        company.industry = company.industry or data.get("industry")
+        company.employee_range = company.employee_range or data.get("employee_count_estimate")
+        company.tech_stack = data.get("tech_stack_likely", [])
+        company.recent_news = data.get("recent_news", [])
+        company.funding_info = {
+            **(company.funding_info or {}),
+            "stage": data.get("funding_stage"),
+        }
+        company.enriched_at = datetime.utcnow()
@@ -1,35 +1,15 @@
-from anthropic import Anthropic
+from typing import Optional
+from anthropic import AsyncAnthropic
 from config import settings
+from services.llm import get_client, EPHEMERAL_CACHE
+from services.rate_limiter import TokenRateLimiter
+from services.structured_output import (
+    create_structured, parse_structured, ResearchResult, CompanyEnrichmentResult
+)
 import json
 
 
-class EnrichmentService:
-    """Service for researching and enriching prospect data using Claude"""
-
-    def __init__(self):
-        self.client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-        self.model = settings.CLAUDE_MODEL
-
-    async def research_prospect(self, prospect_data: dict, icp_context: dict) -> dict:
-        """
-        Research a prospect using Claude AI.
-        Returns structured data about the prospect including personalization hooks.
-        """
-        prompt = f"""You are a sales research assistant. Research the following prospect and provide insights for cold outbound messaging.
-
-PROSPECT INFORMATION:
-- Name: {prospect_data.get('name', 'Unknown')}
-- Title: {prospect_data.get('title', 'Unknown')}
-- Company: {prospect_data.get('company', 'Unknown')}
-- LinkedIn: {prospect_data.get('linkedin_url', 'Not provided')}
-- Twitter: {prospect_data.get('twitter_url', 'Not provided')}
-
-ICP CONTEXT (What we're selling):
-- Product: {icp_context.get('product', {}).get('name', 'Unknown')}
-- Description: {icp_context.get('product', {}).get('description', '')}
-- Target Industries: {', '.join(icp_context.get('target_company', {}).get('industries', []))}
-- Pain Points We Solve: {', '.join(icp_context.get('messaging', {}).get('pain_points', []))}
-- Value Props: {', '.join(icp_context.get('messaging', {}).get('value_props', []))}
+RESEARCH_SYSTEM_PROMPT = """You are a sales research assistant. You research prospects and provide insights for cold outbound messaging.
 
 Based on available public information, provide:
 
@@ -44,60 +24,96 @@ Based on available public information, provide:
 5. RECOMMENDED APPROACH: How should we approach this person? What angle is most likely to resonate?
 
 Respond in JSON format:
-{{
+{
     "summary": "...",
     "personalization_hooks": ["...", "..."],
     "likely_pain_points": ["...", "..."],
-    "icp_signals_found": {{
+    "icp_signals_found": {
         "positive_signals": ["...", "..."],
         "negative_signals": ["...", "..."],
-        "confidence_score": 0-100
-    }},
+        "confidence_score": 0
+    },
     "recommended_approach": "...",
     "talking_points": ["...", "..."],
     "questions_to_ask": ["...", "..."]
-}}"""
+}
+
+confidence_score is an integer from 0 to 100. Respond with only the JSON object."""
 
+
+class EnrichmentService:
+    """Service for researching and enriching prospect data using Claude"""
+
+    # Bump when the research prompt changes so cached research is not reused
+    PROMPT_VERSION = 4
+
+    def __init__(
+        self,
+        client: Optional[AsyncAnthropic] = None,
+        rate_limiter: Optional[TokenRateLimiter] = None
+    ):
+        self.client = client or get_client()
+        self.rate_limiter = rate_limiter
+        self.model = settings.CLAUDE_MODEL
+
+    async def research_prospect(self, prospect_data: dict, icp_context: dict) -> dict:
+        """
+        Research a prospect using Claude AI.
+        Returns structured data about the prospect including personalization hooks.
+        """
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=2000,
-                messages=[{"role": "user", "content": prompt}]
+            result = await create_structured(
+                self.client,
+                self.build_research_request(prospect_data, icp_context),
+                ResearchResult,
+                rate_limiter=self.rate_limiter,
+                operation="research"
             )
-
-            # Parse JSON response
-            content = response.content[0].text
-
-            # Try to extract JSON from response
-            try:
-                # Handle potential markdown code blocks
-                if "```json" in content:
-                    content = content.split("```json")[1].split("```")[0]
-                elif "```" in content:
-                    content = content.split("```")[1].split("```")[0]
-
-                result = json.loads(content)
-            except json.JSONDecodeError:
-                # If JSON parsing fails, create structured response from text
-                result = {
-                    "summary": content[:500],
-                    "personalization_hooks": [],
-                    "likely_pain_points": [],
-                    "icp_signals_found": {
-                        "positive_signals": [],
-                        "negative_signals": [],
-                        "confidence_score": 50
-                    },
-                    "recommended_approach": "",
-                    "talking_points": [],
-                    "questions_to_ask": []
-                }
-
-            return result
+            return result.model_dump()
 
         except Exception as e:
             raise Exception(f"Research failed: {str(e)}")
 
+    def build_research_request(self, prospect_data: dict, icp_context: dict) -> dict:
+        """Build the Messages API parameters for researching a prospect"""
+        company_info = prospect_data.get("company_info")
+        company_section = f"""
+COMPANY INFORMATION (already researched):
+{json.dumps(company_info, indent=2)}
+""" if company_info else ""
+
+        prompt = f"""Research the following prospect.
+
+PROSPECT INFORMATION:
+- Name: {prospect_data.get('name', 'Unknown')}
+- Title: {prospect_data.get('title', 'Unknown')}
+- Company: {prospect_data.get('company', 'Unknown')}
+- LinkedIn: {prospect_data.get('linkedin_url', 'Not provided')}
+- Twitter: {prospect_data.get('twitter_url', 'Not provided')}
+{company_section}"""
+
+        icp_block = f"""ICP CONTEXT (What we're selling):
+- Product: {icp_context.get('product', {}).get('name', 'Unknown')}
+- Description: {icp_context.get('product', {}).get('description', '')}
+- Target Industries: {', '.join(icp_context.get('target_company', {}).get('industries', []))}
+- Pain Points We Solve: {', '.join(icp_context.get('messaging', {}).get('pain_points', []))}
+- Value Props: {', '.join(icp_context.get('messaging', {}).get('value_props', []))}"""
+
+        return {
+            "model": self.model,
+            "max_tokens": 2000,
+            # Instructions and ICP are the same for every prospect: cache them as a prefix
+            "system": [
+                {"type": "text", "text": RESEARCH_SYSTEM_PROMPT},
+                {"type": "text", "text": icp_block, "cache_control": EPHEMERAL_CACHE}
+            ],
+            "messages": [{"role": "user", "content": prompt}]
+        }
+
+    def parse_research_response(self, content: str) -> dict:
+        """Parse and validate a research reply. Raises StructuredOutputError."""
+        return parse_structured(content, ResearchResult).model_dump()
+
     async def enrich_company(self, company_name: str, domain: str = None) -> dict:
         """Enrich company data using Claude"""
         prompt = f"""Research the company "{company_name}"{f' (website: {domain})' if domain else ''}.
@@ -112,22 +128,23 @@ Provide the following information in JSON format:
     "recent_news": ["news item 1", "news item 2"],
     "competitors": ["competitor1", "competitor2"],
     "key_challenges": ["challenge1", "challenge2"]
-}}"""
+}}
+
+Respond with only the JSON object."""
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=1000,
-                messages=[{"role": "user", "content": prompt}]
+            result = await create_structured(
+                self.client,
+                {
+                    "model": self.model,
+                    "max_tokens": 1000,
+                    "messages": [{"role": "user", "content": prompt}]
+                },
+                CompanyEnrichmentResult,
+                rate_limiter=self.rate_limiter,
+                operation="company_enrichment"
             )
-
-            content = response.content[0].text
-            try:
-                if "```json" in content:
-                    content = content.split("```json")[1].split("```")[0]
-                return json.loads(content)
-            except json.JSONDecodeError:
-                return {"description": content[:500]}
+            return result.model_dump()
 
         except Exception as e:
             return {"error": str(e)}
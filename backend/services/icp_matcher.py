@@ -0,0 +1,145 @@
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+from collections import deque
+from functools import lru_cache
+
+from models.icp import ICPConfig
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed list of lowercase keywords.
+
+    find() scans a text once and returns the indexes of every keyword that
+    occurs in it as a substring, including overlapping ones, which is the
+    same answer as testing `keyword in text` for each keyword.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = list(keywords)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[FrozenSet[int]] = [frozenset()]
+
+        outputs = [set()]
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append(set())
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            # Empty keywords end at the root and so match every text
+            outputs[state].add(index)
+
+        # Breadth-first failure links; each state inherits its fallback's output
+        queue = deque([0])
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                if state:
+                    fallback = self._fail[state]
+                    while fallback and char not in self._goto[fallback]:
+                        fallback = self._fail[fallback]
+                    self._fail[next_state] = self._goto[fallback].get(char, 0)
+                outputs[next_state] |= outputs[self._fail[next_state]]
+
+        self._output = [frozenset(output) for output in outputs]
+
+    def find(self, text: str) -> FrozenSet[int]:
+        found = set(self._output[0])
+        state = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return frozenset(found)
+
+
+class GroupedMatcher:
+    """A KeywordAutomaton over several named keyword lists, scanned in one pass"""
+
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        entries: List[Tuple[str, str]] = [
+            (group, keyword.lower())
+            for group, keywords in groups.items()
+            for keyword in keywords
+        ]
+        self._groups = [group for group, _ in entries]
+        self._automaton = KeywordAutomaton(keyword for _, keyword in entries)
+        self._empty = {group: 0 for group in groups}
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Number of keyword entries of each group found in an already lowercased text"""
+        counts = dict(self._empty)
+        for index in self._automaton.find(text):
+            counts[self._groups[index]] += 1
+        return counts
+
+
+class ICPMatcher:
+    """
+    Keyword matchers for one ICP configuration, compiled once.
+
+    Every text field a prospect is scored on (title, seniority, industry,
+    location, each signal and the trigger text) is scanned a single time,
+    instead of once per ICP keyword with the keywords re-lowercased each time.
+    """
+
+    def __init__(
+        self,
+        target_titles: Tuple[str, ...],
+        title_keywords: Tuple[str, ...],
+        target_seniority: Tuple[str, ...],
+        exclude_titles: Tuple[str, ...],
+        target_industries: Tuple[str, ...],
+        target_locations: Tuple[str, ...],
+        positive_signals: Tuple[str, ...],
+        negative_signals: Tuple[str, ...],
+        tech_stack_positive: Tuple[str, ...],
+        tech_stack_negative: Tuple[str, ...],
+        trigger_events: Tuple[str, ...],
+    ):
+        self.title = GroupedMatcher({
+            "target_titles": target_titles,
+            "title_keywords": title_keywords,
+            "target_seniority": target_seniority,
+            "exclude_titles": exclude_titles,
+        })
+        self.seniority = GroupedMatcher({"target_seniority": target_seniority})
+        self.industry = GroupedMatcher({"target_industries": target_industries})
+        self.location = GroupedMatcher({"target_locations": target_locations})
+        self.signals = GroupedMatcher({
+            "positive_signals": positive_signals,
+            "negative_signals": negative_signals,
+        })
+        self.triggers = GroupedMatcher({
+            "trigger_events": trigger_events,
+            "funding": ("funding", "raised"),
+            "hiring": ("hiring", "growing"),
+        })
+        # Tech stack entries are compared exactly, not as substrings
+        self.tech_stack_positive = frozenset(tech_stack_positive)
+        self.tech_stack_negative = frozenset(tech_stack_negative)
+
+    @classmethod
+    def for_config(cls, icp: ICPConfig) -> "ICPMatcher":
+        """Matcher for an ICP, shared by every scorer of the same keyword lists"""
+        return _compile(*(
+            tuple(getattr(icp, field) or ())
+            for field in (
+                "target_titles", "title_keywords", "target_seniority", "exclude_titles",
+                "target_industries", "target_locations", "positive_signals", "negative_signals",
+                "tech_stack_positive", "tech_stack_negative", "trigger_events",
+            )
+        ))
+
+
+@lru_cache(maxsize=32)
+def _compile(*keyword_lists: Tuple[str, ...]) -> ICPMatcher:
+    return ICPMatcher(*keyword_lists)
@@ -0,0 +1,352 @@
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Set
+from sqlalchemy import event, inspect, or_, select, update
+from sqlalchemy.orm import Session
+import hashlib
+import json
+import threading
+
+import numpy as np
+
+from config import settings
+from database import SessionLocal
+from models.company import Company
+from models.icp import ICPConfig, SCORING_FIELDS
+from models.prospect import Prospect
+from services.icp_scorer import ICPScorer
+
+# Attributes that feed a prospect's score, per model
+PROSPECT_SCORE_INPUTS = ("title", "seniority", "company_id", "research_data")
+COMPANY_SCORE_INPUTS = ("industry", "employee_count", "headquarters")
+
+
+def memoized_scores(values: Iterable[Hashable], score: Callable, dtype=np.int64) -> np.ndarray:
+    """Score each distinct value once and return the scores as an array"""
+    cache: Dict[Hashable, int] = {}
+    scores = []
+    for value in values:
+        if value not in cache:
+            cache[value] = score(value)
+        scores.append(cache[value])
+    return np.array(scores, dtype=dtype)
+
+
+def score_inputs_hash(*inputs) -> str:
+    """Fingerprint of the prospect and company values a score is computed from"""
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def score_inputs(prospect: Prospect) -> tuple:
+    """A prospect's score inputs as ICPRescorer.score() takes them"""
+    company = prospect.company
+    return (
+        prospect.title,
+        prospect.seniority,
+        prospect.company_id,
+        company.industry if company else None,
+        company.employee_count if company else None,
+        company.headquarters if company else None,
+        prospect.research_data,
+    )
+
+
+class ICPRescorer:
+    """
+    Recomputes stale stored ICP scores against one ICP.
+
+    Every prospect stores a fingerprint of its score inputs (its title,
+    seniority, company fields and stored research) and the scoring version of the ICP it was
+    scored against. Rows whose fingerprint and version both still match are
+    skipped; only the rest are scored and written back.
+
+    Prospects are streamed from the database with their company columns in
+    keyset-paginated batches, one row tuple per prospect and no ORM objects.
+    Within a batch the company fit and the weighted totals are computed on
+    NumPy arrays, and titles, industries and locations are scored once per
+    distinct value. Updates are written with one executemany UPDATE
+    per batch.
+
+    Scores are the same as ICPScorer.score_prospect() gives for the prospect,
+    its company and its research.
+    """
+
+    def __init__(self, db: Session, icp_config: ICPConfig, batch_size: Optional[int] = None):
+        self.db = db
+        self.icp = icp_config
+        self.scorer = ICPScorer(icp_config)
+        self.version = icp_config.scoring_version()
+        self.batch_size = batch_size or settings.RESCORE_BATCH_SIZE
+
+    def run(
+        self,
+        prospect_ids: Optional[Iterable[int]] = None,
+        company_ids: Optional[Iterable[int]] = None
+    ) -> dict:
+        """
+        Rescore stale prospects, committing each batch, and return the totals.
+        When prospect or company ids are given, only those prospects and the
+        prospects of those companies are checked.
+        """
+        scope = None
+        if prospect_ids is not None or company_ids is not None:
+            scope = or_(
+                Prospect.id.in_(list(prospect_ids or ())),
+                Prospect.company_id.in_(list(company_ids or ()))
+            )
+
+        result = {"scanned": 0, "updated": 0}
+        last_id = 0
+        while True:
+            query = (
+                select(
+                    Prospect.id,
+                    Prospect.icp_inputs_hash,
+                    Prospect.icp_scored_version,
+                    Prospect.title,
+                    Prospect.seniority,
+                    Prospect.company_id,
+                    Company.industry,
+                    Company.employee_count,
+                    Company.headquarters,
+                    Prospect.research_data,
+                )
+                .outerjoin(Company, Prospect.company_id == Company.id)
+                .where(Prospect.id > last_id)
+                .order_by(Prospect.id)
+                .limit(self.batch_size)
+            )
+            if scope is not None:
+                query = query.where(scope)
+            rows = self.db.execute(query).all()
+            if not rows:
+                return result
+
+            updates = self.score_batch(rows)
+            if updates:
+                self.db.execute(update(Prospect), updates)
+            self.db.commit()
+
+            result["scanned"] += len(rows)
+            result["updated"] += len(updates)
+            last_id = rows[-1][0]
+
+    def score_batch(self, rows: List[tuple]) -> List[dict]:
+        """Score the stale rows of a selected batch and return their updates"""
+        ids, stale = [], []
+        for prospect_id, inputs_hash, version, *inputs in rows:
+            if version != self.version or score_inputs_hash(*inputs) != inputs_hash:
+                ids.append(prospect_id)
+                stale.append(inputs)
+        return [{"id": prospect_id, **values} for prospect_id, values in zip(ids, self.score(stale))]
+
+    def score(self, inputs: List[tuple]) -> List[dict]:
+        """
+        Score (title, seniority, company_id, industry, employee_count,
+        headquarters, research_data) tuples, as score_inputs() builds them,
+        and return the score columns to store for each.
+        """
+        if not inputs:
+            return []
+
+        (
+            titles, seniorities, company_ids, industries, employee_counts, headquarters, research,
+        ) = zip(*inputs)
+        scorer = self.scorer
+
+        title_match = memoized_scores(
+            zip(titles, seniorities),
+            lambda value: scorer.score_title({"title": value[0], "seniority": value[1]})
+        )
+        company_fit = self.score_companies(company_ids, industries, employee_counts, headquarters)
+
+        breakdown = {
+            "title_match": title_match,
+            "company_fit": company_fit,
+            "signals": np.array([scorer.score_signals(data) for data in research], dtype=np.int64),
+            "trigger_events": np.array([scorer.score_triggers(data) for data in research], dtype=np.int64),
+        }
+        # np.rint rounds halves to even, like round() in score_prospect()
+        totals = np.rint(scorer.weighted_total(breakdown)).astype(np.int64)
+
+        scores = []
+        for i, values in enumerate(inputs):
+            match_reasons, concerns = scorer.explain(
+                {key: int(component[i]) for key, component in breakdown.items()},
+                {"title": titles[i]},
+                research[i]
+            )
+            scores.append({
+                "icp_score": int(totals[i]),
+                "icp_match_reasons": match_reasons,
+                "icp_concerns": concerns,
+                "icp_inputs_hash": score_inputs_hash(*values),
+                "icp_scored_version": self.version,
+            })
+        return scores
+
+    def score_companies(
+        self,
+        company_ids: tuple,
+        industries: tuple,
+        employee_counts: tuple,
+        headquarters: tuple
+    ) -> np.ndarray:
+        """Vectorized ICPScorer.score_company() over a batch of joined company columns"""
+        matcher = self.scorer.matcher
+        industry_match = memoized_scores(
+            industries,
+            lambda value: matcher.industry.count((value or "").lower())["target_industries"] > 0,
+            dtype=bool
+        )
+        location_match = memoized_scores(
+            headquarters,
+            lambda value: matcher.location.count((value or "").lower())["target_locations"] > 0,
+            dtype=bool
+        )
+        sizes = np.array([count or 0 for count in employee_counts], dtype=np.int64)
+        size_score = np.select(
+            [
+                sizes == 0,  # Unknown size
+                (self.icp.company_size_min <= sizes) & (sizes <= self.icp.company_size_max),
+                sizes < self.icp.company_size_min,
+                sizes > self.icp.company_size_max,
+            ],
+            [0, 20, -15, -10],
+            default=0
+        )
+
+        score = np.clip(50 + 25 * industry_match + size_score + 10 * location_match, 0, 100)
+        has_company = np.array([company_id is not None for company_id in company_ids])
+        return np.where(has_company, score, 40)
+
+
+class ScoreRefresher:
+    """
+    Rescores prospects in a background thread after their inputs change.
+
+    Requests are merged while a run is in progress, and runs happen one at a
+    time against the default ICP as it is when the run starts, so the last
+    change is always applied last.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._prospect_ids: Set[int] = set()
+        self._company_ids: Set[int] = set()
+        self._everything = False
+
+    def request(
+        self,
+        prospect_ids: Iterable[int] = (),
+        company_ids: Iterable[int] = (),
+        everything: bool = False
+    ):
+        """Schedule a rescore of some prospects, the prospects of some companies, or all"""
+        with self._lock:
+            self._prospect_ids.update(prospect_ids)
+            self._company_ids.update(company_ids)
+            self._everything = self._everything or everything
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._drain, name="icp-rescore", daemon=True)
+                self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None):
+        """Block until pending rescoring is done"""
+        thread = self._thread
+        if thread:
+            thread.join(timeout)
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                prospect_ids, company_ids, everything = self._prospect_ids, self._company_ids, self._everything
+                if not (prospect_ids or company_ids or everything):
+                    self._thread = None
+                    return
+                self._prospect_ids, self._company_ids, self._everything = set(), set(), False
+
+            # Checking everything is cheaper than an IN list this long
+            if len(prospect_ids) + len(company_ids) > settings.RESCORE_BATCH_SIZE:
+                everything = True
+            self.rescore(
+                None if everything else prospect_ids,
+                None if everything else company_ids
+            )
+
+    def rescore(self, prospect_ids: Optional[Set[int]] = None, company_ids: Optional[Set[int]] = None) -> dict:
+        """Rescore stale prospects against the default ICP in a session of its own"""
+        db = self.session_factory()
+        try:
+            icp_config = db.query(ICPConfig).filter(ICPConfig.is_default == True).first()
+            if not icp_config:
+                return {"scanned": 0, "updated": 0}
+            return ICPRescorer(db, icp_config).run(prospect_ids, company_ids)
+        except Exception:
+            # A failed run leaves rows stale; the next write retries them
+            db.rollback()
+            return {"scanned": 0, "updated": 0}
+        finally:
+            db.close()
+
+
+score_refresher = ScoreRefresher()
+
+
+def refresh_score(db: Session, prospect: Prospect):
+    """
+    Score a prospect against the default ICP right away, in the caller's
+    transaction, for callers that show the score before the background
+    rescore would run. The stored fingerprint makes that rescore a no-op.
+    """
+    icp_config = db.query(ICPConfig).filter(ICPConfig.is_default == True).first()
+    if not icp_config:
+        return
+    (values,) = ICPRescorer(db, icp_config).score([score_inputs(prospect)])
+    for attribute, value in values.items():
+        setattr(prospect, attribute, value)
+
+
+def mark_for_rescore(db: Session, prospect_ids: Iterable[int] = ()):
+    """
+    Rescore prospects once the session commits. For writes that bypass the
+    ORM unit of work (bulk inserts and updates), which the flush hook below
+    cannot see.
+    """
+    db.info.setdefault("rescore_prospect_ids", set()).update(prospect_ids)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_score_inputs(session: Session, flush_context):
+    """Remember prospects, companies and ICPs whose scoring inputs were written"""
+    prospect_ids = session.info.setdefault("rescore_prospect_ids", set())
+    company_ids = session.info.setdefault("rescore_company_ids", set())
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Prospect) and (obj in session.new or _changed(obj, PROSPECT_SCORE_INPUTS)):
+            prospect_ids.add(obj.id)
+        elif isinstance(obj, Company) and obj not in session.new and _changed(obj, COMPANY_SCORE_INPUTS):
+            company_ids.add(obj.id)
+        elif isinstance(obj, ICPConfig) and obj.is_default and (
+            obj in session.new or _changed(obj, SCORING_FIELDS + ("is_default",))
+        ):
+            session.info["rescore_everything"] = True
+
+
+def _changed(obj, attributes: Iterable[str]) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[attribute].history.has_changes() for attribute in attributes)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _request_rescore(session: Session):
+    prospect_ids = session.info.pop("rescore_prospect_ids", None)
+    company_ids = session.info.pop("rescore_company_ids", None)
+    everything = session.info.pop("rescore_everything", False)
+    if prospect_ids or company_ids or everything:
+        score_refresher.request(prospect_ids or (), company_ids or (), everything)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_rescore(session: Session):
+    for key in ("rescore_prospect_ids", "rescore_company_ids", "rescore_everything"):
+        session.info.pop(key, None)
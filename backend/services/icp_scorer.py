@@ -1,5 +1,6 @@
-from typing import Optional
+from typing import List, Optional, Tuple
 from models.icp import ICPConfig
+from services.icp_matcher import ICPMatcher
 
 
 class ICPScorer:
@@ -7,6 +8,8 @@ class ICPScorer:
 
     def __init__(self, icp_config: Optional[ICPConfig] = None):
         self.icp = icp_config
+        # Keyword lists are compiled once per ICP and shared across scorers
+        self.matcher = ICPMatcher.for_config(icp_config) if icp_config else None
 
     def score_prospect(
         self,
@@ -30,21 +33,47 @@ class ICPScorer:
             }
 
         breakdown = {
-            "title_match": self._score_title(prospect_data),
-            "company_fit": self._score_company(company_data),
-            "signals": self._score_signals(research_data),
-            "trigger_events": self._score_triggers(research_data)
+            "title_match": self.score_title(prospect_data),
+            "company_fit": self.score_company(company_data),
+            "signals": self.score_signals(research_data),
+            "trigger_events": self.score_triggers(research_data)
         }
 
-        # Apply weights
-        total_score = (
+        total_score = self.weighted_total(breakdown)
+        match_reasons, concerns = self.explain(breakdown, prospect_data, research_data)
+
+        # Determine recommendation
+        if total_score >= 80:
+            recommendation = "high_priority"
+        elif total_score >= 60:
+            recommendation = "medium_priority"
+        elif total_score >= 40:
+            recommendation = "low_priority"
+        else:
+            recommendation = "skip"
+
+        return {
+            "total_score": round(total_score),
+            "breakdown": breakdown,
+            "match_reasons": match_reasons,
+            "concerns": concerns,
+            "recommendation": recommendation
+        }
+
+    def weighted_total(self, breakdown: dict):
+        """
+        Apply the ICP weights to a score breakdown. Component scores may be
+        ints or NumPy arrays of scores (see ICPRescorer).
+        """
+        return (
             breakdown["title_match"] * (self.icp.weight_title_match / 100) +
             breakdown["company_fit"] * (self.icp.weight_company_fit / 100) +
             breakdown["signals"] * (self.icp.weight_signals / 100) +
             breakdown["trigger_events"] * (self.icp.weight_trigger_events / 100)
         )
 
-        # Collect reasons
+    def explain(self, breakdown: dict, prospect_data: dict, research_data: dict) -> Tuple[List[str], List[str]]:
+        """Match reasons and concerns for a score breakdown"""
         match_reasons = []
         concerns = []
 
@@ -63,64 +92,39 @@ class ICPScorer:
         elif breakdown["signals"] < 30 and research_data:
             concerns.append("Few positive signals found")
 
-        # Determine recommendation
-        if total_score >= 80:
-            recommendation = "high_priority"
-        elif total_score >= 60:
-            recommendation = "medium_priority"
-        elif total_score >= 40:
-            recommendation = "low_priority"
-        else:
-            recommendation = "skip"
+        return match_reasons, concerns
 
-        return {
-            "total_score": round(total_score),
-            "breakdown": breakdown,
-            "match_reasons": match_reasons,
-            "concerns": concerns,
-            "recommendation": recommendation
-        }
-
-    def _score_title(self, prospect_data: dict) -> int:
+    def score_title(self, prospect_data: dict) -> int:
         """Score prospect's title match (0-100)"""
         title = (prospect_data.get("title") or "").lower()
         if not title:
             return 30  # Default score for unknown
 
+        matches = self.matcher.title.count(title)
         score = 0
 
         # Check exact title matches
-        for target_title in self.icp.target_titles:
-            if target_title.lower() in title:
-                score = max(score, 100)
-                break
+        if matches["target_titles"]:
+            score = 100
 
         # Check keyword matches
-        keywords_matched = 0
-        for keyword in self.icp.title_keywords:
-            if keyword.lower() in title:
-                keywords_matched += 1
-
+        keywords_matched = matches["title_keywords"]
         if keywords_matched > 0:
             keyword_score = min(30 + (keywords_matched * 20), 80)
             score = max(score, keyword_score)
 
         # Check seniority
         seniority = (prospect_data.get("seniority") or "").lower()
-        for target_seniority in self.icp.target_seniority:
-            if target_seniority.lower() in title or target_seniority.lower() in seniority:
-                score = min(score + 15, 100)
-                break
+        if matches["target_seniority"] or self.matcher.seniority.count(seniority)["target_seniority"]:
+            score = min(score + 15, 100)
 
         # Check exclusions
-        for exclude in self.icp.exclude_titles:
-            if exclude.lower() in title:
-                score = 0
-                break
+        if matches["exclude_titles"]:
+            score = 0
 
         return score
 
-    def _score_company(self, company_data: dict) -> int:
+    def score_company(self, company_data: dict) -> int:
         """Score company fit (0-100)"""
         if not company_data:
             return 40
@@ -129,10 +133,8 @@ class ICPScorer:
 
         # Industry match
         industry = (company_data.get("industry") or "").lower()
-        for target_industry in self.icp.target_industries:
-            if target_industry.lower() in industry:
-                score += 25
-                break
+        if self.matcher.industry.count(industry)["target_industries"]:
+            score += 25
 
         # Company size
         employee_count = company_data.get("employee_count")
@@ -146,14 +148,12 @@ class ICPScorer:
 
         # Location match
         location = (company_data.get("location") or company_data.get("headquarters") or "").lower()
-        for target_location in self.icp.target_locations:
-            if target_location.lower() in location:
-                score += 10
-                break
+        if self.matcher.location.count(location)["target_locations"]:
+            score += 10
 
         return min(max(score, 0), 100)
 
-    def _score_signals(self, research_data: dict) -> int:
+    def score_signals(self, research_data: dict) -> int:
         """Score based on positive/negative signals (0-100)"""
         if not research_data:
             return 50
@@ -162,37 +162,29 @@ class ICPScorer:
         signals_found = research_data.get("icp_signals_found", {})
 
         # Add points for positive signals
-        positive = signals_found.get("positive_signals", [])
-        for signal in positive:
-            signal_lower = signal.lower()
-            for target_signal in self.icp.positive_signals:
-                if target_signal.lower() in signal_lower:
-                    score += 10
-                    break
+        for signal in signals_found.get("positive_signals", []):
+            if self.matcher.signals.count(signal.lower())["positive_signals"]:
+                score += 10
 
         # Tech stack positive signals
         tech_stack = research_data.get("tech_stack", [])
         for tech in tech_stack:
-            if tech in self.icp.tech_stack_positive:
+            if tech in self.matcher.tech_stack_positive:
                 score += 5
 
         # Subtract for negative signals
-        negative = signals_found.get("negative_signals", [])
-        for signal in negative:
-            signal_lower = signal.lower()
-            for bad_signal in self.icp.negative_signals:
-                if bad_signal.lower() in signal_lower:
-                    score -= 20
-                    break
+        for signal in signals_found.get("negative_signals", []):
+            if self.matcher.signals.count(signal.lower())["negative_signals"]:
+                score -= 20
 
         # Tech stack negative signals
         for tech in tech_stack:
-            if tech in self.icp.tech_stack_negative:
+            if tech in self.matcher.tech_stack_negative:
                 score -= 15
 
         return min(max(score, 0), 100)
 
-    def _score_triggers(self, research_data: dict) -> int:
+    def score_triggers(self, research_data: dict) -> int:
         """Score based on trigger events (0-100)"""
         if not research_data:
             return 40
@@ -201,19 +193,18 @@ class ICPScorer:
         recent_news = research_data.get("recent_news", [])
         hooks = research_data.get("personalization_hooks", [])
 
-        # Check for trigger events
+        # Check for trigger events, plus funding and hiring bonus words, in one pass
         all_text = " ".join(recent_news + hooks).lower()
+        matches = self.matcher.triggers.count(all_text)
 
-        for trigger in self.icp.trigger_events:
-            if trigger.lower() in all_text:
-                score += 15
+        score += 15 * matches["trigger_events"]
 
         # Bonus for recent funding
-        if "funding" in all_text or "raised" in all_text:
+        if matches["funding"]:
             score += 10
 
         # Bonus for hiring signals
-        if "hiring" in all_text or "growing" in all_text:
+        if matches["hiring"]:
             score += 5
 
         return min(score, 100)
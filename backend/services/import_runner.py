@@ -0,0 +1,154 @@
+from typing import Dict, Iterator, Optional
+from sqlalchemy import insert
+from itertools import islice
+from datetime import datetime
+import asyncio
+import os
+
+from config import settings
+from database import SessionLocal
+from models.icp import ICPConfig
+from models.import_job import ImportJob, ImportJobError
+from models.job import JobStatus
+from services.prospect_import import ProspectImporter, iter_csv, chunked
+
+
+class ImportJobRunner:
+    """
+    Runs CSV imports in the background.
+
+    Every chunk of rows is committed together with the job's counters and
+    row errors, so a job interrupted by a restart skips the rows it already
+    committed and continues from the next chunk.
+    """
+
+    def __init__(self, session_factory=SessionLocal, chunk_size: Optional[int] = None):
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    def submit(self, job_id: int):
+        """Start running a job unless it is already running in this process"""
+        task = self._tasks.get(job_id)
+        if task and not task.done():
+            return
+
+        task = asyncio.create_task(self._run_job(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    def cancel(self, job_id: int):
+        task = self._tasks.get(job_id)
+        if task:
+            task.cancel()
+
+    async def resume(self):
+        """Restart imports that were pending or running when the process stopped"""
+        db = self.session_factory()
+        try:
+            job_ids = [
+                job_id for (job_id,) in db.query(ImportJob.id).filter(
+                    ImportJob.status.in_([JobStatus.PENDING, JobStatus.RUNNING])
+                ).order_by(ImportJob.id)
+            ]
+        finally:
+            db.close()
+
+        for job_id in job_ids:
+            self.submit(job_id)
+
+    async def shutdown(self):
+        """Stop all imports. Interrupted jobs stay running and resume on next start."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_job(self, job_id: int):
+        db = self.session_factory()
+        try:
+            job = db.get(ImportJob, job_id)
+            if not job or job.status not in (JobStatus.PENDING, JobStatus.RUNNING):
+                return
+
+            if job.icp_config_id:
+                icp_config = db.get(ICPConfig, job.icp_config_id)
+            else:
+                icp_config = db.query(ICPConfig).filter(ICPConfig.is_default == True).first()
+
+            job.status = JobStatus.RUNNING
+            job.started_at = job.started_at or datetime.utcnow()
+            db.commit()
+
+            try:
+                with open(job.file_path, "rb") as file:
+                    # Rows already committed by an earlier run are skipped, not re-imported
+                    rows = islice(enumerate(iter_csv(file), start=2), job.rows_parsed or 0, None)
+                    chunks = chunked(rows, self.chunk_size)
+                    importer = ProspectImporter(db, icp_config)
+                    while await self._step(db, importer, job, chunks):
+                        pass
+                final_status, error = JobStatus.COMPLETED, None
+            except asyncio.CancelledError:
+                # Keep the file for resuming unless the job itself was cancelled
+                db.rollback()
+                if db.get(ImportJob, job_id).status == JobStatus.CANCELLED:
+                    self._remove_file(job)
+                raise
+            except Exception as e:
+                db.rollback()
+                final_status, error = JobStatus.FAILED, str(e)
+
+            job = db.get(ImportJob, job_id)
+            if job.status == JobStatus.RUNNING:
+                job.status = final_status
+                job.error = error
+                job.finished_at = datetime.utcnow()
+                db.commit()
+            if job.status != JobStatus.RUNNING:
+                self._remove_file(job)
+        finally:
+            db.close()
+
+    async def _step(self, db, importer: ProspectImporter, job: ImportJob, chunks: Iterator[list]) -> bool:
+        """Import the next chunk off the event loop. Returns False when the file is done."""
+        # A cancelled job still lets the chunk in flight finish, so the thread
+        # never touches the session after it is closed
+        future = asyncio.ensure_future(asyncio.to_thread(self._import_next_chunk, db, importer, job, chunks))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            await future
+            raise
+
+    def _import_next_chunk(self, db, importer: ProspectImporter, job: ImportJob, chunks: Iterator[list]) -> bool:
+        chunk = next(chunks, None)
+        if chunk is None:
+            return False
+
+        result = importer.import_chunk(chunk)
+        if result["error_details"]:
+            db.execute(insert(ImportJobError), [
+                {"job_id": job.id, "row_number": detail["row"], "error": detail["error"]}
+                for detail in result["error_details"]
+            ])
+
+        # Checkpoint the chunk's prospects and the job progress together
+        job.rows_parsed = (job.rows_parsed or 0) + result["parsed"]
+        job.rows_inserted = (job.rows_inserted or 0) + result["imported"]
+        job.rows_skipped = (job.rows_skipped or 0) + result["skipped"]
+        job.rows_duplicate = (job.rows_duplicate or 0) + result["duplicates"]
+        job.rows_scored = (job.rows_scored or 0) + result["scored"]
+        job.rows_failed = (job.rows_failed or 0) + result["errors"]
+        db.commit()
+
+        # Pick up a cancellation made through the API
+        db.refresh(job)
+        return job.status == JobStatus.RUNNING
+
+    def _remove_file(self, job: ImportJob):
+        if job.file_path and os.path.exists(job.file_path):
+            os.remove(job.file_path)
+
+
+import_runner = ImportJobRunner()
@@ -0,0 +1,233 @@
+from typing import Dict, List, Optional
+from datetime import datetime
+import asyncio
+
+from config import settings
+from database import SessionLocal
+from models.icp import ICPConfig
+from models.job import GenerationJob, GenerationJobItem, JobStatus, JobMode, JobItemStatus
+from models.message import MessageChannel
+from models.prospect import Prospect, ProspectStatus
+from services.batch_generator import BatchGenerator
+from services.enrichment import EnrichmentService
+from services.message_generator import MessageGenerator
+from services.pipeline import GenerationPipeline
+from services.rate_limiter import TokenRateLimiter
+
+
+class GenerationJobRunner:
+    """
+    Runs bulk research-and-generate jobs in the background.
+
+    All jobs share one worker budget and one tokens-per-minute limiter. Every
+    prospect is committed as its own checkpoint together with its messages, so
+    a job interrupted by a restart resumes with only the pending prospects.
+    Batch-mode jobs are handed to BatchGenerator instead of the worker pool.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        concurrency: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency or settings.JOB_WORKER_CONCURRENCY
+        self.tokens_per_minute = tokens_per_minute or settings.CLAUDE_TOKENS_PER_MINUTE
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._rate_limiter: Optional[TokenRateLimiter] = None
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so the primitives bind to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    @property
+    def rate_limiter(self) -> TokenRateLimiter:
+        if self._rate_limiter is None:
+            self._rate_limiter = TokenRateLimiter(self.tokens_per_minute)
+        return self._rate_limiter
+
+    def submit(self, job_id: int):
+        """Start running a job unless it is already running in this process"""
+        task = self._tasks.get(job_id)
+        if task and not task.done():
+            return
+
+        task = asyncio.create_task(self._run_job(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    def cancel(self, job_id: int):
+        task = self._tasks.get(job_id)
+        if task:
+            task.cancel()
+
+    async def resume(self):
+        """Restart jobs that were pending or running when the process stopped"""
+        db = self.session_factory()
+        try:
+            job_ids = [
+                job_id for (job_id,) in db.query(GenerationJob.id).filter(
+                    GenerationJob.status.in_([JobStatus.PENDING, JobStatus.RUNNING])
+                ).order_by(GenerationJob.id)
+            ]
+        finally:
+            db.close()
+
+        for job_id in job_ids:
+            self.submit(job_id)
+
+    async def shutdown(self):
+        """Stop all workers. Interrupted jobs stay running and resume on next start."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_job(self, job_id: int):
+        db = self.session_factory()
+        try:
+            job = db.get(GenerationJob, job_id)
+            if not job or job.status not in (JobStatus.PENDING, JobStatus.RUNNING):
+                return
+
+            if job.icp_config_id:
+                icp_config = db.get(ICPConfig, job.icp_config_id)
+            else:
+                icp_config = db.query(ICPConfig).filter(ICPConfig.is_default == True).first()
+            if not icp_config:
+                job.status = JobStatus.FAILED
+                job.error = "No ICP configuration found"
+                job.finished_at = datetime.utcnow()
+                db.commit()
+                return
+
+            icp_context = icp_config.to_prompt_context()
+            icp_name = icp_config.name
+            mode = job.mode
+            channels = [MessageChannel(channel) for channel in job.channels]
+            message_types = list(job.message_types)
+
+            job.status = JobStatus.RUNNING
+            job.started_at = job.started_at or datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
+
+        try:
+            if mode == JobMode.BATCH:
+                await BatchGenerator(self.session_factory).run(job_id, icp_context, icp_name)
+            else:
+                await self._run_workers(job_id, icp_context, icp_name, channels, message_types)
+            final_status, error = JobStatus.COMPLETED, None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            final_status, error = JobStatus.FAILED, str(e)
+
+        db = self.session_factory()
+        try:
+            job = db.get(GenerationJob, job_id)
+            if job.status == JobStatus.RUNNING:
+                job.status = final_status
+                job.error = error
+                job.finished_at = datetime.utcnow()
+                db.commit()
+        finally:
+            db.close()
+
+    async def _run_workers(
+        self,
+        job_id: int,
+        icp_context: dict,
+        icp_name: str,
+        channels: List[MessageChannel],
+        message_types: List[str]
+    ):
+        db = self.session_factory()
+        try:
+            pending_ids = [
+                item_id for (item_id,) in db.query(GenerationJobItem.id).filter(
+                    GenerationJobItem.job_id == job_id,
+                    GenerationJobItem.status == JobItemStatus.PENDING
+                ).order_by(GenerationJobItem.id)
+            ]
+        finally:
+            db.close()
+
+        queue = asyncio.Queue()
+        for item_id in pending_ids:
+            queue.put_nowait(item_id)
+
+        pipeline = GenerationPipeline(
+            enrichment_service=EnrichmentService(rate_limiter=self.rate_limiter),
+            message_generator=MessageGenerator(rate_limiter=self.rate_limiter)
+        )
+
+        async def worker():
+            while not queue.empty():
+                item_id = queue.get_nowait()
+                async with self.semaphore:
+                    await self._process_item(
+                        job_id, item_id, pipeline, icp_context, icp_name, channels, message_types
+                    )
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(pending_ids)))))
+
+    async def _process_item(
+        self,
+        job_id: int,
+        item_id: int,
+        pipeline: GenerationPipeline,
+        icp_context: dict,
+        icp_name: str,
+        channels: List[MessageChannel],
+        message_types: List[str]
+    ):
+        db = self.session_factory()
+        try:
+            item = db.get(GenerationJobItem, item_id)
+            # Deleting a prospect clears prospect_id on its items
+            prospect = db.get(Prospect, item.prospect_id) if item.prospect_id else None
+
+            try:
+                if not prospect:
+                    raise Exception("Prospect not found")
+
+                result = await pipeline.run(
+                    db,
+                    prospect,
+                    icp_context=icp_context,
+                    icp_name=icp_name,
+                    channels=channels,
+                    message_types=message_types
+                )
+                prospect.status = ProspectStatus.READY_FOR_REVIEW
+
+                item.status = JobItemStatus.COMPLETED
+                item.messages_generated = len(result["messages"])
+                item.error = "; ".join(f["error"] for f in result["failed"]) or None
+                counter = GenerationJob.completed
+
+            except Exception as e:
+                db.rollback()
+                item = db.get(GenerationJobItem, item_id)
+                item.status = JobItemStatus.FAILED
+                item.error = str(e)
+                counter = GenerationJob.failed
+
+            # Checkpoint the item, its messages and the job progress together
+            item.completed_at = datetime.utcnow()
+            db.query(GenerationJob).filter(GenerationJob.id == job_id).update(
+                {counter: counter + 1}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+
+job_runner = GenerationJobRunner()
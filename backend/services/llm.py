@@ -0,0 +1,149 @@
+from typing import Callable, Dict, Optional
+from collections import defaultdict
+from anthropic import AsyncAnthropic
+import httpx
+import json
+
+from config import settings
+from services.rate_limiter import TokenRateLimiter
+
+
+# Marks the end of a prompt prefix the provider may cache between calls
+EPHEMERAL_CACHE = {"type": "ephemeral"}
+
+_client: Optional[AsyncAnthropic] = None
+
+
+def get_client() -> AsyncAnthropic:
+    """
+    Return the process-wide async Claude client.
+
+    All services share one client so outbound calls reuse a single bounded
+    connection pool instead of opening a new one per request.
+    """
+    global _client
+    if _client is None:
+        _client = AsyncAnthropic(
+            api_key=settings.ANTHROPIC_API_KEY,
+            base_url=settings.ANTHROPIC_BASE_URL,
+            max_retries=settings.CLAUDE_MAX_RETRIES,
+            # Pool limits and timeouts live on the HTTP client; calls don't override them
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.CLAUDE_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.CLAUDE_MAX_KEEPALIVE_CONNECTIONS
+                ),
+                timeout=httpx.Timeout(
+                    settings.CLAUDE_TIMEOUT_SECONDS,
+                    connect=settings.CLAUDE_CONNECT_TIMEOUT_SECONDS
+                )
+            )
+        )
+    return _client
+
+
+async def close_client():
+    """Close the shared client and release its connections"""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+class UsageMetrics:
+    """Running token counters per operation, including prompt-cache reads and writes"""
+
+    FIELDS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
+    PARSE_OUTCOMES = ("valid", "repaired", "invalid")
+
+    def __init__(self):
+        self._operations: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(("calls",) + self.FIELDS, 0))
+        self._parsing: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(self.PARSE_OUTCOMES, 0))
+
+    def record(self, operation: str, usage):
+        """Add one call's usage; accepts an SDK usage object or a plain dict"""
+        counters = self._operations[operation]
+        counters["calls"] += 1
+        for field in self.FIELDS:
+            value = usage.get(field) if isinstance(usage, dict) else getattr(usage, field, None)
+            counters[field] += value or 0
+
+    def record_parse(self, operation: str, outcome: str):
+        """Count a structured reply as valid, repaired (valid after a retry) or invalid"""
+        self._parsing[operation][outcome] += 1
+
+    def snapshot(self) -> dict:
+        operations = {name: dict(counters) for name, counters in self._operations.items()}
+        totals = dict.fromkeys(("calls",) + self.FIELDS, 0)
+        for counters in operations.values():
+            for key, value in counters.items():
+                totals[key] += value
+
+        # Share of prompt tokens served from cache instead of billed as fresh input
+        prompt_tokens = (
+            totals["input_tokens"] + totals["cache_creation_input_tokens"] + totals["cache_read_input_tokens"]
+        )
+        totals["cache_hit_ratio"] = round(totals["cache_read_input_tokens"] / prompt_tokens, 4) if prompt_tokens else 0.0
+
+        parsing = {}
+        for name, outcomes in self._parsing.items():
+            replies = sum(outcomes.values())
+            parsing[name] = {
+                **outcomes,
+                "unusable_rate": round(outcomes["invalid"] / replies, 4) if replies else 0.0,
+                "repair_rate": round(outcomes["repaired"] / replies, 4) if replies else 0.0,
+            }
+        return {"operations": operations, "totals": totals, "parsing": parsing}
+
+    def reset(self):
+        self._operations.clear()
+        self._parsing.clear()
+
+
+usage_metrics = UsageMetrics()
+
+
+def estimate_tokens(params: dict) -> int:
+    """Rough upper bound on the tokens a call will consume (~4 chars per token)"""
+    prompt_chars = len(json.dumps(params.get("messages", []))) + len(json.dumps(params.get("system", "")))
+    return prompt_chars // 4 + params["max_tokens"]
+
+
+async def create_message(
+    client: AsyncAnthropic,
+    params: dict,
+    rate_limiter: Optional[TokenRateLimiter] = None,
+    operation: str = "other",
+    on_text: Optional[Callable[[str], None]] = None,
+    **kwargs
+):
+    """
+    Call the Messages API, honouring an optional tokens-per-minute limiter.
+    Token usage is recorded in usage_metrics under the given operation name.
+
+    When on_text is given the reply is streamed and on_text is called with
+    each text delta as it arrives; the complete message is still returned.
+    """
+    reservation = None
+    if rate_limiter:
+        reservation = await rate_limiter.acquire(estimate_tokens(params))
+
+    if on_text:
+        async with client.messages.stream(**params, **kwargs) as stream:
+            async for text in stream.text_stream:
+                on_text(text)
+            response = await stream.get_final_message()
+    else:
+        response = await client.messages.create(**params, **kwargs)
+
+    usage = response.usage
+    usage_metrics.record(operation, usage)
+    if reservation:
+        # Cache reads don't count against input rate limits; cache writes do
+        rate_limiter.settle(
+            reservation,
+            usage.input_tokens + (getattr(usage, "cache_creation_input_tokens", None) or 0) + usage.output_tokens
+        )
+
+    return response
@@ -1,13 +1,75 @@
-from anthropic import Anthropic
+from typing import Callable, Dict, List, Optional, Tuple
+from anthropic import AsyncAnthropic
+from pydantic import ValidationError
 from config import settings
+from services.llm import get_client, create_message, usage_metrics, EPHEMERAL_CACHE
+from services.rate_limiter import TokenRateLimiter
+from services.structured_output import (
+    create_structured, parse_structured, extract_json, response_text, GeneratedMessage
+)
+import asyncio
 import json
 
 
+SYSTEM_PROMPT = """You are an expert cold outbound copywriter writing personalized sales outreach.
+
+IMPORTANT RULES:
+1. Personalize using the research insights
+2. Lead with value, not features
+3. Keep it short and scannable
+4. Include ONE clear call-to-action
+5. Sound human, not robotic
+6. Don't be salesy or pushy
+7. Reference something specific about them or their company"""
+
+# Channel-specific guidelines
+CHANNEL_GUIDELINES = {
+    "email": {
+        "max_length": 150,
+        "include_subject": True,
+        "style": "Professional but conversational. Short paragraphs. Clear CTA."
+    },
+    "linkedin": {
+        "max_length": 300,
+        "include_subject": False,
+        "style": "Casual and friendly. Like messaging a colleague. No formal salutations."
+    },
+    "linkedin_inmail": {
+        "max_length": 200,
+        "include_subject": True,
+        "style": "Professional but personal. Reference their profile/activity."
+    },
+    "linkedin_connection": {
+        "max_length": 100,
+        "include_subject": False,
+        "style": "Very brief. Just explain why you're connecting."
+    },
+    "phone": {
+        "max_length": 100,
+        "include_subject": False,
+        "style": "Talking points and key questions to ask."
+    }
+}
+
+# Message type guidance
+TYPE_GUIDANCE = {
+    "initial": "First touch. Focus on providing value and sparking curiosity. Don't be pushy.",
+    "follow_up_1": "Gentle follow-up. Provide additional value or a different angle.",
+    "follow_up_2": "Try a different approach. Maybe share a relevant case study or insight.",
+    "breakup": "Final attempt. Create urgency but be respectful. Offer to reconnect later."
+}
+
+
 class MessageGenerator:
     """Service for generating personalized outreach messages using Claude"""
 
-    def __init__(self):
-        self.client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+    def __init__(
+        self,
+        client: Optional[AsyncAnthropic] = None,
+        rate_limiter: Optional[TokenRateLimiter] = None
+    ):
+        self.client = client or get_client()
+        self.rate_limiter = rate_limiter
         self.model = settings.CLAUDE_MODEL
 
     async def generate(
@@ -16,7 +78,8 @@ class MessageGenerator:
         research_data: dict,
         icp_context: dict,
         channel: str,
-        message_type: str = "initial"
+        message_type: str = "initial",
+        on_text: Optional[Callable[[str], None]] = None
     ) -> dict:
         """
         Generate a personalized outreach message.
@@ -27,64 +90,84 @@ class MessageGenerator:
             icp_context: ICP configuration for messaging guidance
             channel: 'email', 'linkedin', 'linkedin_inmail', 'phone'
             message_type: 'initial', 'follow_up_1', 'follow_up_2', 'breakup'
+            on_text: Optional callback streamed the raw reply text as it arrives
 
         Returns:
             dict with subject (if email), body/content, and hook used
         """
+        try:
+            result = await create_structured(
+                self.client,
+                self.build_request(prospect_data, research_data, icp_context, channel, message_type),
+                GeneratedMessage,
+                rate_limiter=self.rate_limiter,
+                operation="message",
+                on_text=on_text
+            )
+            return result.model_dump()
 
-        # Channel-specific guidelines
-        channel_guidelines = {
-            "email": {
-                "max_length": 150,
-                "include_subject": True,
-                "style": "Professional but conversational. Short paragraphs. Clear CTA."
-            },
-            "linkedin": {
-                "max_length": 300,
-                "include_subject": False,
-                "style": "Casual and friendly. Like messaging a colleague. No formal salutations."
-            },
-            "linkedin_inmail": {
-                "max_length": 200,
-                "include_subject": True,
-                "style": "Professional but personal. Reference their profile/activity."
-            },
-            "linkedin_connection": {
-                "max_length": 100,
-                "include_subject": False,
-                "style": "Very brief. Just explain why you're connecting."
-            },
-            "phone": {
-                "max_length": 100,
-                "include_subject": False,
-                "style": "Talking points and key questions to ask."
-            }
-        }
+        except Exception as e:
+            raise Exception(f"Message generation failed: {str(e)}")
 
-        # Message type guidance
-        type_guidance = {
-            "initial": "First touch. Focus on providing value and sparking curiosity. Don't be pushy.",
-            "follow_up_1": "Gentle follow-up. Provide additional value or a different angle.",
-            "follow_up_2": "Try a different approach. Maybe share a relevant case study or insight.",
-            "breakup": "Final attempt. Create urgency but be respectful. Offer to reconnect later."
-        }
+    def build_request(
+        self,
+        prospect_data: dict,
+        research_data: dict,
+        icp_context: dict,
+        channel: str,
+        message_type: str = "initial"
+    ) -> dict:
+        """
+        Build the Messages API parameters for one outreach message.
+        Takes the same arguments as generate().
 
-        channel_config = channel_guidelines.get(channel, channel_guidelines["email"])
-        messaging_config = icp_context.get("messaging", {})
+        Only the system prompt (rules and ICP messaging) is marked for provider
+        prompt caching, as it is the one prefix every call repeats. A prospect's
+        channels are generated concurrently, so a breakpoint after its prospect
+        block would be written by each of those calls and read by none.
+        """
+        channel_config = CHANNEL_GUIDELINES.get(channel, CHANNEL_GUIDELINES["email"])
 
-        # Build the prompt
-        prompt = f"""You are an expert cold outbound copywriter. Write a {channel} message for sales outreach.
+        channel_block = f"""Write a {channel} message for sales outreach to this prospect.
 
-PROSPECT:
-- Name: {prospect_data.get('name', 'there')}
-- First Name: {prospect_data.get('first_name', prospect_data.get('name', 'there').split()[0])}
-- Title: {prospect_data.get('title', 'Unknown')}
-- Company: {prospect_data.get('company', 'Unknown')}
+CHANNEL: {channel}
+MESSAGE TYPE: {message_type}
+GUIDANCE: {TYPE_GUIDANCE.get(message_type, '')}
 
-RESEARCH INSIGHTS:
-{json.dumps(research_data, indent=2) if research_data else 'No research available'}
+STYLE REQUIREMENTS:
+- Maximum {channel_config['max_length']} words
+- Style: {channel_config['style']}
+
+Respond in JSON format:
+{{
+    {'"subject": "The subject line",' if channel_config['include_subject'] else ""}
+    "content": "The message body",
+    "hook": "The personalization element used"
+}}
+
+Respond with only the JSON object."""
+
+        return {
+            "model": self.model,
+            "max_tokens": 1000,
+            "system": self.build_system(icp_context),
+            "messages": [{
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": self.build_prospect_block(prospect_data, research_data)},
+                    {"type": "text", "text": channel_block}
+                ]
+            }]
+        }
+
+    def build_system(self, icp_context: dict) -> list:
+        """
+        System prompt: the copywriting rules plus the ICP messaging block.
+        Both are identical for every prospect, so they form the cached prefix.
+        """
+        messaging_config = icp_context.get("messaging", {})
 
-WHAT WE'RE SELLING:
+        icp_block = f"""WHAT WE'RE SELLING:
 - Product: {icp_context.get('product', {}).get('name', 'our product')}
 - Company: {icp_context.get('product', {}).get('company', '')}
 - Description: {icp_context.get('product', {}).get('description', '')}
@@ -95,92 +178,190 @@ VALUE PROPOSITIONS:
 PAIN POINTS WE ADDRESS:
 {chr(10).join('- ' + pp for pp in messaging_config.get('pain_points', []))}
 
-CHANNEL: {channel}
-MESSAGE TYPE: {message_type}
-GUIDANCE: {type_guidance.get(message_type, '')}
-
-STYLE REQUIREMENTS:
-- Maximum {channel_config['max_length']} words
-- Style: {channel_config['style']}
-- Tone: {messaging_config.get('tone', 'professional')}
-- NEVER use these phrases: {', '.join(messaging_config.get('avoid', []))}
+TONE: {messaging_config.get('tone', 'professional')}
+NEVER use these phrases: {', '.join(messaging_config.get('avoid', []))}
 
 CUSTOM INSTRUCTIONS:
-{messaging_config.get('instructions', 'None')}
+{messaging_config.get('instructions', 'None')}"""
 
-IMPORTANT RULES:
-1. Personalize using the research insights
-2. Lead with value, not features
-3. Keep it short and scannable
-4. Include ONE clear call-to-action
-5. Sound human, not robotic
-6. Don't be salesy or pushy
-7. Reference something specific about them or their company
+        return [
+            {"type": "text", "text": SYSTEM_PROMPT},
+            {"type": "text", "text": icp_block, "cache_control": EPHEMERAL_CACHE}
+        ]
 
-Respond in JSON format:
-{{
-    {"'subject': '...'," if channel_config['include_subject'] else ""}
-    "content": "The message body",
-    "hook": "The personalization element used"
-}}"""
+    def build_prospect_block(self, prospect_data: dict, research_data: dict) -> str:
+        return f"""PROSPECT:
+- Name: {prospect_data.get('name', 'there')}
+- First Name: {prospect_data.get('first_name', prospect_data.get('name', 'there').split()[0])}
+- Title: {prospect_data.get('title', 'Unknown')}
+- Company: {prospect_data.get('company', 'Unknown')}
 
-        try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=1000,
-                messages=[{"role": "user", "content": prompt}]
-            )
+RESEARCH INSIGHTS:
+{json.dumps(research_data, indent=2) if research_data else 'No research available'}"""
+
+    def parse_response(self, content: str) -> dict:
+        """Parse and validate a generation reply. Raises StructuredOutputError."""
+        return parse_structured(content, GeneratedMessage).model_dump()
 
-            content = response.content[0].text
+    async def generate_many(
+        self,
+        prospect_data: dict,
+        research_data: dict,
+        icp_context: dict,
+        combinations: List[Tuple[str, str]],
+        return_exceptions: bool = False
+    ) -> List[dict]:
+        """
+        Generate several messages for one prospect in a single call.
+
+        The prospect, research and ICP context are sent once for all requested
+        (channel, message_type) combinations. Entries missing or invalid in the
+        reply are generated one by one with generate(). With return_exceptions,
+        a message whose fallback fails too is returned as its exception instead
+        of raising, as with asyncio.gather().
 
-            # Parse JSON response
+        Returns:
+            One message dict per combination, in the same order
+        """
+        results: Dict[int, dict] = {}
+        if len(combinations) > 1:
             try:
-                if "```json" in content:
-                    content = content.split("```json")[1].split("```")[0]
-                elif "```" in content:
-                    content = content.split("```")[1].split("```")[0]
+                response = await create_message(
+                    self.client,
+                    self.build_multi_request(prospect_data, research_data, icp_context, combinations),
+                    rate_limiter=self.rate_limiter,
+                    operation="message_multi"
+                )
+                results = self.parse_multi_response(response_text(response), combinations)
+                usage_metrics.record_parse(
+                    "message_multi", "valid" if len(results) == len(combinations) else "invalid"
+                )
+            except Exception:
+                # Everything falls back to one call per message below
+                pass
+
+        missing = [index for index in range(len(combinations)) if index not in results]
+        fallbacks = await asyncio.gather(*(
+            self.generate(prospect_data, research_data, icp_context, *combinations[index])
+            for index in missing
+        ), return_exceptions=return_exceptions)
+        results.update(zip(missing, fallbacks))
+        return [results[index] for index in range(len(combinations))]
 
-                result = json.loads(content)
+    def build_multi_request(
+        self,
+        prospect_data: dict,
+        research_data: dict,
+        icp_context: dict,
+        combinations: List[Tuple[str, str]]
+    ) -> dict:
+        """Build the Messages API parameters for several messages in one reply"""
+        requested = []
+        for index, (channel, message_type) in enumerate(combinations):
+            channel_config = CHANNEL_GUIDELINES.get(channel, CHANNEL_GUIDELINES["email"])
+            requested.append(f"""MESSAGE {index}:
+- Channel: {channel}
+- Message type: {message_type}
+- Guidance: {TYPE_GUIDANCE.get(message_type, '')}
+- Maximum {channel_config['max_length']} words
+- Style: {channel_config['style']}
+- Subject line: {'required' if channel_config['include_subject'] else 'none'}""")
 
-                # Normalize response
-                if "body" in result and "content" not in result:
-                    result["content"] = result.pop("body")
+        messages_block = f"""Write the following {len(combinations)} messages for sales outreach to this prospect, as one coherent sequence.
 
-                return result
+{chr(10).join(requested)}
 
-            except json.JSONDecodeError:
-                # Fallback if JSON parsing fails
-                return {
-                    "content": content,
-                    "hook": "Unable to parse hook"
-                }
+Respond in JSON format with exactly one entry per message:
+{{
+    "messages": [
+        {{
+            "index": 0,
+            "subject": "Subject line, or null when none is needed",
+            "content": "The message body",
+            "hook": "The personalization element used"
+        }}
+    ]
+}}
 
-        except Exception as e:
-            raise Exception(f"Message generation failed: {str(e)}")
+Respond with only the JSON object."""
+
+        return {
+            "model": self.model,
+            "max_tokens": min(1000 * len(combinations), 8000),
+            "system": self.build_system(icp_context),
+            "messages": [{
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": self.build_prospect_block(prospect_data, research_data)},
+                    {"type": "text", "text": messages_block}
+                ]
+            }]
+        }
+
+    def parse_multi_response(self, content: str, combinations: List[Tuple[str, str]]) -> Dict[int, dict]:
+        """
+        Parse a multi-message reply into {index: message}. Entries with an
+        unknown index or without content are left out so they can be retried.
+        """
+        try:
+            entries = json.loads(extract_json(content)).get("messages", [])
+        except (json.JSONDecodeError, AttributeError):
+            return {}
+
+        results = {}
+        for entry in entries if isinstance(entries, list) else []:
+            index = entry.get("index") if isinstance(entry, dict) else None
+            if not isinstance(index, int) or not 0 <= index < len(combinations) or index in results:
+                continue
+            try:
+                message = GeneratedMessage.model_validate(entry).model_dump()
+            except ValidationError:
+                continue
+
+            channel, _ = combinations[index]
+            if not CHANNEL_GUIDELINES.get(channel, CHANNEL_GUIDELINES["email"])["include_subject"]:
+                message["subject"] = None
+            results[index] = message
+        return results
 
     async def generate_sequence_messages(
         self,
         prospect_data: dict,
         research_data: dict,
         icp_context: dict,
-        sequence_steps: list
+        sequence_steps: list,
+        single_call: bool = True
     ) -> list:
-        """Generate messages for all steps in a sequence"""
-        messages = []
+        """
+        Generate messages for all steps in a sequence.
 
-        for step in sequence_steps:
-            if step["type"] in ["email", "linkedin", "linkedin_inmail", "linkedin_connection"]:
-                msg = await self.generate(
+        With single_call, every step is requested in one call (see
+        generate_many) instead of one call per step.
+        """
+        steps = [
+            step for step in sequence_steps
+            if step["type"] in ["email", "linkedin", "linkedin_inmail", "linkedin_connection"]
+        ]
+        combinations = [(step["type"], step.get("message_type", "initial")) for step in steps]
+
+        if single_call:
+            generated = await self.generate_many(prospect_data, research_data, icp_context, combinations)
+        else:
+            generated = []
+            for channel, message_type in combinations:
+                generated.append(await self.generate(
                     prospect_data=prospect_data,
                     research_data=research_data,
                     icp_context=icp_context,
-                    channel=step["type"],
-                    message_type=step.get("message_type", "initial")
-                )
-                messages.append({
-                    "step_order": step.get("order", 0),
-                    "channel": step["type"],
-                    **msg
-                })
+                    channel=channel,
+                    message_type=message_type
+                ))
 
-        return messages
+        return [
+            {
+                "step_order": step.get("order", 0),
+                "channel": step["type"],
+                **msg
+            }
+            for step, msg in zip(steps, generated)
+        ]
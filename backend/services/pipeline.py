@@ -0,0 +1,240 @@
+from typing import Callable, List, Optional
+from sqlalchemy.orm import Session
+from datetime import datetime
+import asyncio
+
+from config import settings
+from models.message import Message, MessageStatus, MessageChannel
+from models.prospect import Prospect
+from models.research_snapshot import ResearchSnapshot
+from services.enrichment import EnrichmentService
+from services.icp_rescorer import refresh_score
+from services.message_generator import MessageGenerator
+from services.research_cache import ResearchCache, research_cache_key
+from services.research_snapshots import ResearchSnapshots
+from services.company_enrichment import CompanyEnrichmentService, company_context
+
+
+def research_input(prospect: Prospect) -> dict:
+    """Prospect fields, plus stored company enrichment, sent to the research prompt"""
+    return {
+        "name": prospect.full_name,
+        "title": prospect.title,
+        "company": prospect.company_name,
+        "linkedin_url": prospect.linkedin_url,
+        "twitter_url": prospect.twitter_url,
+        "company_info": company_context(prospect.company) if prospect.company_id else None,
+    }
+
+
+def message_input(prospect: Prospect) -> dict:
+    """Prospect fields sent to the message prompt"""
+    return {
+        "name": prospect.full_name,
+        "first_name": prospect.first_name,
+        "title": prospect.title,
+        "company": prospect.company_name,
+    }
+
+
+def apply_research(prospect: Prospect, research_data: dict):
+    """Store research results. The prospect is rescored from them (see ICPRescorer) once the session commits"""
+    prospect.research_summary = research_data.get("summary", "")
+    prospect.research_data = research_data
+    prospect.personalization_hooks = research_data.get("personalization_hooks", [])
+    prospect.researched_at = datetime.utcnow()
+
+
+def build_message(
+    prospect: Prospect,
+    channel: MessageChannel,
+    message_type: str,
+    message_content: dict,
+    research_snapshot: ResearchSnapshot,
+    icp_name: str
+) -> Message:
+    """Build a reviewable Message row from a generation result"""
+    return Message(
+        prospect_id=prospect.id,
+        channel=channel,
+        message_type=message_type,
+        subject=message_content.get("subject"),
+        content=message_content.get("body", message_content.get("content", "")),
+        hook=message_content.get("hook"),
+        status=MessageStatus.READY_FOR_REVIEW,
+        research_snapshot=research_snapshot,
+        generation_context={
+            "icp": icp_name
+        }
+    )
+
+
+class GenerationPipeline:
+    """Researches a prospect and generates its outreach messages"""
+
+    def __init__(
+        self,
+        enrichment_service: Optional[EnrichmentService] = None,
+        message_generator: Optional[MessageGenerator] = None,
+        concurrency: Optional[int] = None,
+        single_call: Optional[bool] = None
+    ):
+        self.enrichment_service = enrichment_service or EnrichmentService()
+        self.message_generator = message_generator or MessageGenerator()
+        self.company_enrichment = CompanyEnrichmentService(self.enrichment_service)
+        self.concurrency = concurrency or settings.MESSAGE_GENERATION_CONCURRENCY
+        self.single_call = settings.MESSAGE_GENERATION_SINGLE_CALL if single_call is None else single_call
+
+    async def run(
+        self,
+        db: Session,
+        prospect: Prospect,
+        icp_context: dict,
+        icp_name: str,
+        channels: List[MessageChannel],
+        message_types: List[str],
+        refresh_research: bool = False,
+        on_event: Optional[Callable[[str, dict], None]] = None
+    ) -> dict:
+        """
+        Research the prospect, store the results and its new ICP score on it
+        and add the generated messages to the session. Committing is left to the caller.
+
+        The prospect's company is enriched first (once per company, see
+        CompanyEnrichmentService). Research is served from the research cache
+        when the prospect, company and ICP are unchanged, unless
+        refresh_research is set.
+
+        With single_call, every channel/message_type combination is requested
+        in one call (see MessageGenerator.generate_many), with one call each
+        only for those the reply misses. Otherwise, and always when streaming,
+        each combination is its own call, run concurrently up to the
+        concurrency cap.
+
+        If on_event is given it is called with progress events as they happen:
+        "research" once research is available, "delta" with each chunk of
+        message text as it streams in, and "message" or "error" as each
+        channel/message_type combination finishes.
+
+        Returns:
+            dict with research_data, research_cached, messages (added Message
+            rows) and failed (channel/message_type combinations that could not
+            be generated)
+        """
+        if prospect.company_id and await self.company_enrichment.ensure_enriched(prospect.company_id):
+            db.refresh(prospect.company)
+
+        research_cache = ResearchCache(db)
+        prospect_data = research_input(prospect)
+        cache_key = research_cache_key(prospect_data, icp_context)
+
+        research_data = None if refresh_research else research_cache.get(cache_key)
+        research_cached = research_data is not None
+        if not research_cached:
+            research_data = await self.enrichment_service.research_prospect(
+                prospect_data=prospect_data,
+                icp_context=icp_context
+            )
+        apply_research(prospect, research_data)
+        # The score is shown with the research, before any background rescore
+        refresh_score(db, prospect)
+        if on_event:
+            on_event("research", {
+                "research_summary": prospect.research_summary,
+                "icp_score": prospect.icp_score,
+                "research_cached": research_cached
+            })
+
+        # Generate messages concurrently, bounded by the concurrency cap
+        prospect_data = message_input(prospect)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def generate_one(channel: MessageChannel, msg_type: str) -> dict:
+            combination = {"channel": channel.value, "message_type": msg_type}
+            on_text = None
+            if on_event:
+                def on_text(text: str):
+                    on_event("delta", {**combination, "text": text})
+
+            async with semaphore:
+                try:
+                    message_content = await self.message_generator.generate(
+                        prospect_data=prospect_data,
+                        research_data=research_data,
+                        icp_context=icp_context,
+                        channel=channel.value,
+                        message_type=msg_type,
+                        on_text=on_text
+                    )
+                except Exception as e:
+                    if on_event:
+                        on_event("error", {**combination, "error": str(e)})
+                    raise
+
+            if on_event:
+                on_event("message", {
+                    **combination,
+                    "subject": message_content.get("subject"),
+                    "content": message_content.get("body", message_content.get("content", "")),
+                    "hook": message_content.get("hook")
+                })
+            return message_content
+
+        combinations = [
+            (channel, msg_type)
+            for channel in channels
+            for msg_type in message_types
+        ]
+        # Streamed text has to arrive per message, so streaming runs keep one call each
+        if self.single_call and not on_event:
+            results = await self.message_generator.generate_many(
+                prospect_data,
+                research_data,
+                icp_context,
+                [(channel.value, msg_type) for channel, msg_type in combinations],
+                return_exceptions=True
+            )
+        else:
+            results = await asyncio.gather(
+                *(generate_one(channel, msg_type) for channel, msg_type in combinations),
+                return_exceptions=True
+            )
+
+        messages = []
+        failed = []
+        # Shared by every message generated from this research
+        research_snapshot = None
+        for (channel, msg_type), message_content in zip(combinations, results):
+            if isinstance(message_content, BaseException):
+                if not isinstance(message_content, Exception):
+                    # Cancellation (or interpreter exit) is not a failed combination
+                    raise message_content
+                failed.append({
+                    "channel": channel.value,
+                    "message_type": msg_type,
+                    "error": str(message_content)
+                })
+                continue
+
+            if research_snapshot is None:
+                research_snapshot = ResearchSnapshots(db).get_or_create(research_data)
+
+            message = build_message(
+                prospect, channel, msg_type, message_content, research_snapshot, icp_name
+            )
+            db.add(message)
+            messages.append(message)
+
+        if combinations and not messages:
+            raise Exception(failed[0]["error"])
+
+        # Written last so no write transaction is held open across LLM calls
+        if not research_cached:
+            research_cache.put(cache_key, research_data, prospect_id=prospect.id)
+
+        return {
+            "research_data": research_data,
+            "research_cached": research_cached,
+            "messages": messages,
+            "failed": failed
+        }
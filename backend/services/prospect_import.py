@@ -0,0 +1,201 @@
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from itertools import islice
+import csv
+import io
+
+from models.company import Company
+from models.icp import ICPConfig
+from models.prospect import Prospect, ProspectStatus
+from services.company_enrichment import normalize_company_name
+from services.icp_rescorer import ICPRescorer, mark_for_rescore
+from services.workflow_stats import mark_stats_stale
+
+
+# Column name mapping (handle various formats)
+COLUMN_MAPPINGS = {
+    'first_name': ['first_name', 'firstname', 'first name', 'First Name'],
+    'last_name': ['last_name', 'lastname', 'last name', 'Last Name'],
+    'full_name': ['full_name', 'fullname', 'full name', 'Full Name', 'name', 'Name'],
+    'email': ['email', 'Email', 'email_address', 'Email Address'],
+    'phone': ['phone', 'Phone', 'phone_number', 'Phone Number'],
+    'title': ['title', 'Title', 'job_title', 'Job Title', 'position', 'Position'],
+    'company': ['company', 'Company', 'company_name', 'Company Name', 'organization'],
+    'linkedin_url': ['linkedin_url', 'linkedin', 'LinkedIn', 'LinkedIn URL', 'Personal Linkedin URL', 'Personal LinkedIn URL', 'profile url'],
+    'twitter_url': ['twitter_url', 'twitter', 'Twitter', 'Twitter URL'],
+}
+
+def get_value(row: dict, field: str) -> Optional[str]:
+    for possible_name in COLUMN_MAPPINGS.get(field, []):
+        if possible_name in row and row[possible_name]:
+            return row[possible_name].strip()
+    return None
+
+
+def parse_row(row: dict) -> Optional[dict]:
+    """Map a CSV row to prospect fields, or None if it does not identify anyone"""
+    first_name = get_value(row, 'first_name') or ''
+    last_name = get_value(row, 'last_name') or ''
+    linkedin_url = get_value(row, 'linkedin_url')
+    full_name = get_value(row, 'full_name') or f"{first_name} {last_name}".strip() or (linkedin_url or '').split('/')[-1]
+    email = get_value(row, 'email')
+
+    if not full_name and not email and not linkedin_url:
+        return None
+
+    return {
+        "first_name": first_name or None,
+        "last_name": last_name or None,
+        "full_name": full_name,
+        "email": email,
+        "phone": get_value(row, 'phone'),
+        "title": get_value(row, 'title'),
+        "company_name": get_value(row, 'company'),
+        "linkedin_url": linkedin_url,
+        "twitter_url": get_value(row, 'twitter_url'),
+    }
+
+
+def iter_csv(file: BinaryIO) -> Iterator[dict]:
+    """Stream rows from a binary CSV file without reading it into memory"""
+    return csv.DictReader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+
+
+def chunked(rows: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ProspectImporter:
+    """
+    Imports prospect rows in chunks using set-based lookups and bulk inserts.
+
+    Each chunk looks up duplicate emails and existing companies with one IN
+    query each, inserts new companies and prospects with one executemany
+    each, and is committed on its own. Memory stays flat and no transaction
+    spans the whole file, so import time grows linearly with the number of rows.
+    """
+
+    def __init__(self, db: Session, icp_config: Optional[ICPConfig] = None):
+        self.db = db
+        self.rescorer = ICPRescorer(db, icp_config) if icp_config else None
+        # Companies and emails seen so far, so later chunks skip the lookups
+        self.companies: Dict[str, dict] = {}
+        self.seen_emails = set()
+
+    def import_chunk(self, numbered_rows: List[Tuple[int, dict]]) -> dict:
+        """
+        Import (row number, CSV row) pairs into the session. Committing is
+        left to the caller, so it can checkpoint progress in the same commit.
+        """
+        error_details = []
+        parsed = []
+        for row_number, row in numbered_rows:
+            values = parse_row(row)
+            if values is None:
+                error_details.append({"row": row_number, "error": "Missing name, email and LinkedIn URL"})
+            else:
+                parsed.append(values)
+
+        # Duplicate emails, within the file and against existing prospects
+        emails = {values["email"] for values in parsed if values["email"]} - self.seen_emails
+        if emails:
+            self.seen_emails.update(
+                email for (email,) in self.db.query(Prospect.email).filter(Prospect.email.in_(emails))
+            )
+        candidates = []
+        for values in parsed:
+            if values["email"] in self.seen_emails:
+                continue
+            if values["email"]:
+                # A later row with the same email is a duplicate of this one
+                self.seen_emails.add(values["email"])
+            candidates.append(values)
+        duplicates = len(parsed) - len(candidates)
+
+        self._resolve_companies({
+            normalize_company_name(values["company_name"]): values["company_name"]
+            for values in candidates if values["company_name"]
+        })
+
+        rows = []
+        score_inputs = []
+        for values in candidates:
+            company = self.companies.get(normalize_company_name(values["company_name"])) if values["company_name"] else None
+            rows.append({
+                **values,
+                "company_id": company["id"] if company else None,
+                "source": "csv",
+                "status": ProspectStatus.NEW,
+                "research_data": {},
+            })
+            # In the order ICPRescorer.score() takes them
+            score_inputs.append((
+                values["title"],
+                None,
+                company["id"] if company else None,
+                company["industry"] if company else None,
+                company["employee_count"] if company else None,
+                company["headquarters"] if company else None,
+                {},
+            ))
+
+        # Score against ICP if available, as the rescorer does, so the stored
+        # fingerprint spares the rows a second scoring once committed
+        if self.rescorer:
+            for row, values in zip(rows, self.rescorer.score(score_inputs)):
+                row.update(values)
+
+        inserted = []
+        if rows:
+            inserted = self.db.execute(
+                insert(Prospect).returning(Prospect.id),
+                rows
+            ).all()
+            # Bulk inserts skip the flush hooks that track score inputs and counts
+            mark_for_rescore(self.db, (prospect_id for (prospect_id,) in inserted))
+            mark_stats_stale(self.db)
+
+        return {
+            "parsed": len(numbered_rows),
+            "imported": len(inserted),
+            "skipped": len(error_details) + duplicates,
+            "duplicates": duplicates,
+            "scored": len(inserted) if self.rescorer else 0,
+            "errors": len(error_details),
+            "error_details": error_details,
+        }
+
+    def _resolve_companies(self, names: Dict[str, str]):
+        """Load or create the companies for {normalized name: display name}"""
+        missing = [name for name in names if name not in self.companies]
+        if not missing:
+            return
+
+        existing = self.db.query(
+            Company.id, Company.normalized_name, Company.industry, Company.employee_count, Company.headquarters
+        ).filter(Company.normalized_name.in_(missing)).order_by(Company.id)
+        for company_id, normalized_name, industry, employee_count, headquarters in existing:
+            self.companies.setdefault(normalized_name, {
+                "id": company_id, "industry": industry, "employee_count": employee_count,
+                "headquarters": headquarters,
+            })
+
+        new_companies = [
+            {"name": names[name], "normalized_name": name}
+            for name in missing if name not in self.companies
+        ]
+        if new_companies:
+            created = self.db.execute(
+                insert(Company).returning(Company.id, Company.normalized_name),
+                new_companies
+            )
+            for company_id, normalized_name in created:
+                self.companies[normalized_name] = {
+                    "id": company_id, "industry": None, "employee_count": None, "headquarters": None
+                }
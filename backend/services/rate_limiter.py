@@ -0,0 +1,43 @@
+from collections import deque
+import asyncio
+import time
+
+
+class TokenRateLimiter:
+    """
+    Sliding-window tokens-per-minute limiter.
+
+    Callers reserve an estimated token count before an LLM call and settle the
+    reservation with the real usage once the response arrives.
+    """
+
+    def __init__(self, tokens_per_minute: int, window_seconds: float = 60.0):
+        self.limit = tokens_per_minute
+        self.window = window_seconds
+        self._reservations = deque()  # [timestamp, tokens]
+        self._lock = asyncio.Lock()
+
+    def _used(self, now: float) -> int:
+        while self._reservations and now - self._reservations[0][0] >= self.window:
+            self._reservations.popleft()
+        return sum(tokens for _, tokens in self._reservations)
+
+    async def acquire(self, tokens: int) -> list:
+        """Wait until `tokens` fit in the current window and reserve them"""
+        tokens = min(tokens, self.limit)
+
+        # Waiters queue on the lock so reservations are granted in FIFO order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if self._used(now) + tokens <= self.limit:
+                    reservation = [now, tokens]
+                    self._reservations.append(reservation)
+                    return reservation
+
+                wait = self._reservations[0][0] + self.window - now
+                await asyncio.sleep(max(wait, 0.05))
+
+    def settle(self, reservation: list, actual_tokens: int):
+        """Replace a reservation's estimate with the tokens actually used"""
+        reservation[1] = actual_tokens
@@ -0,0 +1,88 @@
+from typing import Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+import hashlib
+import json
+
+from config import settings
+from models.research_cache import ResearchCacheEntry
+from services.enrichment import EnrichmentService
+
+
+def research_cache_key(prospect_data: dict, icp_context: dict) -> str:
+    """Content hash of everything that shapes a research prompt"""
+    payload = json.dumps(
+        {
+            "prospect": prospect_data,
+            "icp": icp_context,
+            "model": settings.CLAUDE_MODEL,
+            "prompt_version": EnrichmentService.PROMPT_VERSION,
+        },
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResearchCache:
+    """
+    Content-addressed cache of prospect research.
+
+    Entries are keyed on the prospect fields and ICP context sent to the
+    research prompt, so any change to either misses the cache naturally.
+    Writes join the caller's transaction.
+    """
+
+    def __init__(self, db: Session, ttl_hours: Optional[int] = None):
+        self.db = db
+        self.ttl = timedelta(hours=ttl_hours or settings.RESEARCH_CACHE_TTL_HOURS)
+
+    def get(self, cache_key: str) -> Optional[dict]:
+        entry = self.db.query(ResearchCacheEntry).filter(
+            ResearchCacheEntry.cache_key == cache_key,
+            ResearchCacheEntry.expires_at > datetime.utcnow()
+        ).first()
+        if not entry:
+            return None
+
+        entry.hit_count = (entry.hit_count or 0) + 1
+        return entry.research_data
+
+    def put(self, cache_key: str, research_data: dict, prospect_id: Optional[int] = None):
+        now = datetime.utcnow()
+        values = {
+            "prospect_id": prospect_id,
+            "research_data": research_data,
+            "hit_count": 0,
+            "created_at": now,
+            "expires_at": now + self.ttl,
+        }
+
+        entry = self.db.query(ResearchCacheEntry).filter(
+            ResearchCacheEntry.cache_key == cache_key
+        ).first()
+        if entry:
+            for key, value in values.items():
+                setattr(entry, key, value)
+            return
+
+        # A concurrent writer may have stored the same key; theirs is as good as ours
+        try:
+            with self.db.begin_nested():
+                self.db.add(ResearchCacheEntry(cache_key=cache_key, **values))
+        except IntegrityError:
+            pass
+
+    def invalidate_prospect(self, prospect_id: int) -> int:
+        return self.db.query(ResearchCacheEntry).filter(
+            ResearchCacheEntry.prospect_id == prospect_id
+        ).delete(synchronize_session=False)
+
+    def invalidate_all(self) -> int:
+        return self.db.query(ResearchCacheEntry).delete(synchronize_session=False)
+
+    def purge_expired(self) -> int:
+        return self.db.query(ResearchCacheEntry).filter(
+            ResearchCacheEntry.expires_at <= datetime.utcnow()
+        ).delete(synchronize_session=False)
@@ -0,0 +1,43 @@
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+import hashlib
+import json
+
+from models.research_snapshot import ResearchSnapshot
+
+
+def research_snapshot_hash(research_data: dict) -> str:
+    """Content hash of a research result, independent of key order"""
+    payload = json.dumps(research_data or {}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResearchSnapshots:
+    """
+    Content-addressed store of the research messages were generated from.
+
+    Every message generated from the same research (all channels and message
+    types of a prospect, and later runs whose research came from the cache)
+    references one row instead of carrying its own copy. Writes join the
+    caller's transaction.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_or_create(self, research_data: dict) -> ResearchSnapshot:
+        content_hash = research_snapshot_hash(research_data)
+        snapshot = self.db.query(ResearchSnapshot).filter(
+            ResearchSnapshot.content_hash == content_hash
+        ).first()
+        if snapshot is None:
+            # A concurrent writer may have stored the same research; use theirs
+            try:
+                with self.db.begin_nested():
+                    snapshot = ResearchSnapshot(content_hash=content_hash, research_data=research_data or {})
+                    self.db.add(snapshot)
+            except IntegrityError:
+                snapshot = self.db.query(ResearchSnapshot).filter(
+                    ResearchSnapshot.content_hash == content_hash
+                ).one()
+        return snapshot
@@ -0,0 +1,115 @@
+from typing import Dict, List, Optional
+from sqlalchemy import func, literal_column, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import Subquery
+import re
+
+from models.message import Message
+from models.prospect import Prospect
+
+# Searched columns and their relative weight in the ranking
+PROSPECT_SEARCH_COLUMNS = {
+    "full_name": 10.0,
+    "email": 5.0,
+    "company_name": 5.0,
+    "title": 3.0,
+    "research_summary": 1.0,
+}
+MESSAGE_SEARCH_COLUMNS = {
+    "subject": 3.0,
+    "content": 1.0,
+}
+
+
+def search_terms(query: str) -> List[str]:
+    """Words of a search box query; each is matched as a prefix"""
+    return re.findall(r"\w+", query.lower())
+
+
+class SearchIndex:
+    """
+    Ranked, prefix-matching text search over prospects and messages, using
+    the database's own full-text index.
+
+    On SQLite each table gets an external-content FTS5 table kept in sync by
+    triggers, so Core bulk inserts and updates are indexed as well. On
+    PostgreSQL a GIN index over a weighted tsvector expression is used, which
+    the database maintains itself. Both are created by migration 0004. On
+    other databases, or if the index is not installed, callers fall back to
+    substring filters.
+    """
+
+    def __init__(self):
+        self.dialect: Optional[str] = None
+
+    @property
+    def available(self) -> bool:
+        return self.dialect is not None
+
+    def setup(self, engine: Engine):
+        """Use the indexes if they are installed. Safe to run on every startup."""
+        with engine.connect() as connection:
+            if engine.dialect.name == "sqlite":
+                installed = connection.execute(text(
+                    "SELECT count(*) FROM sqlite_master WHERE type = 'table' "
+                    "AND name IN ('prospects_fts', 'messages_fts')"
+                )).scalar()
+            elif engine.dialect.name == "postgresql":
+                installed = connection.execute(text(
+                    "SELECT count(*) FROM pg_indexes "
+                    "WHERE indexname IN ('ix_prospects_search', 'ix_messages_search')"
+                )).scalar()
+            else:
+                installed = 0
+        self.dialect = engine.dialect.name if installed == 2 else None
+
+    def prospect_hits(self, query: str) -> Optional[Subquery]:
+        """Subquery of (id, rank) for matching prospects, or None to fall back"""
+        return self._hits(Prospect.__table__, PROSPECT_SEARCH_COLUMNS, query)
+
+    def message_hits(self, query: str) -> Optional[Subquery]:
+        """Subquery of (id, rank) for matching messages, or None to fall back"""
+        return self._hits(Message.__table__, MESSAGE_SEARCH_COLUMNS, query)
+
+    def _hits(self, table, columns: Dict[str, float], query: str) -> Optional[Subquery]:
+        terms = search_terms(query)
+        if not self.available or not terms:
+            return None
+
+        if self.dialect == "sqlite":
+            fts = f"{table.name}_fts"
+            # Quoted so words are never read as FTS5 operators; * matches prefixes
+            match = " ".join(f'"{term}"*' for term in terms)
+            weights = ", ".join(str(weight) for weight in columns.values())
+            # bm25() is lower for better matches, so negate it: higher rank is better
+            return select(
+                literal_column("rowid").label("id"),
+                literal_column(f"-bm25({fts}, {weights})").label("rank")
+            ).select_from(text(fts)).where(text(f"{fts} MATCH :match").bindparams(match=match)).subquery()
+
+        vector = self._tsvector(table, columns)
+        tsquery = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{term}:*" for term in terms))
+        return select(
+            table.c.id.label("id"),
+            func.ts_rank(vector, tsquery).label("rank")
+        ).where(vector.op("@@")(tsquery)).subquery()
+
+    def _tsvector(self, table, columns: Dict[str, float]):
+        """Weighted tsvector over the searched columns, A for the heaviest; indexed by migration 0004"""
+        labels = {}
+        for label, weight in zip("ABCD", sorted(set(columns.values()), reverse=True)):
+            labels[weight] = label
+        parts = [
+            func.setweight(
+                func.to_tsvector(literal_column("'simple'"), func.coalesce(table.c[column], literal_column("''"))),
+                literal_column(f"'{labels.get(weight, 'D')}'")
+            )
+            for column, weight in columns.items()
+        ]
+        vector = parts[0]
+        for part in parts[1:]:
+            vector = vector.op("||")(part)
+        return vector
+
+
+search_index = SearchIndex()
@@ -0,0 +1,128 @@
+from typing import List, Optional, Type, TypeVar
+from anthropic import AsyncAnthropic
+from pydantic import AliasChoices, BaseModel, Field, ValidationError
+import json
+
+from config import settings
+from services.llm import create_message, usage_metrics
+from services.rate_limiter import TokenRateLimiter
+
+
+class StructuredOutputError(ValueError):
+    """A reply that is not valid JSON for the expected schema"""
+
+
+# Reply schemas
+
+class ICPSignals(BaseModel):
+    positive_signals: List[str] = []
+    negative_signals: List[str] = []
+    confidence_score: int = Field(50, ge=0, le=100)
+
+
+class ResearchResult(BaseModel):
+    summary: str = Field(min_length=1)
+    personalization_hooks: List[str] = []
+    likely_pain_points: List[str] = []
+    icp_signals_found: ICPSignals = Field(default_factory=ICPSignals)
+    recommended_approach: str = ""
+    talking_points: List[str] = []
+    questions_to_ask: List[str] = []
+
+
+class CompanyEnrichmentResult(BaseModel):
+    description: str = Field(min_length=1)
+    industry: Optional[str] = None
+    employee_count_estimate: Optional[str] = None
+    funding_stage: Optional[str] = None
+    tech_stack_likely: List[str] = []
+    recent_news: List[str] = []
+    competitors: List[str] = []
+    key_challenges: List[str] = []
+
+
+class GeneratedMessage(BaseModel):
+    subject: Optional[str] = None
+    content: str = Field(min_length=1, validation_alias=AliasChoices("content", "body"))
+    hook: Optional[str] = None
+
+
+T = TypeVar("T", bound=BaseModel)
+
+
+def extract_json(content: str) -> str:
+    """The JSON object in a reply, without markdown fences or surrounding prose"""
+    if "```json" in content:
+        content = content.split("```json")[1].split("```")[0]
+    elif "```" in content:
+        content = content.split("```")[1].split("```")[0]
+
+    start, end = content.find("{"), content.rfind("}")
+    return content[start:end + 1] if start != -1 and end > start else content
+
+
+def parse_structured(content: str, schema: Type[T]) -> T:
+    """Parse and validate a reply against a schema, raising StructuredOutputError"""
+    try:
+        data = json.loads(extract_json(content))
+    except json.JSONDecodeError as e:
+        raise StructuredOutputError(f"reply is not valid JSON ({e.msg})")
+
+    try:
+        return schema.model_validate(data)
+    except ValidationError as e:
+        problems = "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'reply'}: {error['msg']}"
+            for error in e.errors()
+        )
+        raise StructuredOutputError(f"reply does not match the expected format ({problems})")
+
+
+def response_text(response) -> str:
+    return "".join(block.text for block in response.content if getattr(block, "type", "text") == "text")
+
+
+async def create_structured(
+    client: AsyncAnthropic,
+    params: dict,
+    schema: Type[T],
+    rate_limiter: Optional[TokenRateLimiter] = None,
+    operation: str = "other",
+    max_repairs: Optional[int] = None,
+    **kwargs
+) -> T:
+    """
+    Call the Messages API and validate the reply against a schema.
+
+    An invalid reply is sent back to Claude with the validation errors, up to
+    max_repairs times. The outcome (valid, repaired or invalid) is recorded in
+    usage_metrics. Raises StructuredOutputError once the budget is spent.
+
+    Extra keyword arguments are passed to create_message; on_text only
+    applies to the first attempt.
+    """
+    max_repairs = settings.CLAUDE_MAX_REPAIRS if max_repairs is None else max_repairs
+    messages = list(params["messages"])
+
+    for attempt in range(max_repairs + 1):
+        response = await create_message(
+            client, {**params, "messages": messages}, rate_limiter=rate_limiter, operation=operation, **kwargs
+        )
+        kwargs.pop("on_text", None)
+        text = response_text(response)
+        try:
+            result = parse_structured(text, schema)
+        except StructuredOutputError as e:
+            error = e
+            messages = messages + [
+                {"role": "assistant", "content": text or "(empty reply)"},
+                {"role": "user", "content": f"Your reply could not be used: {e}. "
+                                            "Reply again with only the corrected JSON object and no other text."}
+            ]
+            continue
+
+        usage_metrics.record_parse(operation, "valid" if attempt == 0 else "repaired")
+        return result
+
+    usage_metrics.record_parse(operation, "invalid")
+    raise error
@@ -0,0 +1,144 @@
+from typing import Optional
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+import threading
+import time
+
+from config import settings
+from database import SessionLocal
+from models.message import Message, MessageStatus
+from models.prospect import Prospect, ProspectStatus
+from models.sequence import ProspectSequence, Sequence, SequenceStatus
+
+# Models whose rows are counted, and the attributes they are counted by
+COUNTED_ATTRIBUTES = {
+    Prospect: ("status",),
+    Message: ("status",),
+    ProspectSequence: ("status", "current_step", "sequence_id"),
+    Sequence: ("name",),
+}
+
+
+class WorkflowStats:
+    """
+    Pipeline counts for the dashboard, served from a short-lived snapshot.
+
+    A snapshot takes one GROUP BY query per counted table: prospects and
+    messages by status, and sequence enrollments by sequence, status and
+    current step. It is reused for WORKFLOW_STATS_TTL_SECONDS, or until a
+    commit changes what is counted (see the session hooks below).
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl_seconds = settings.WORKFLOW_STATS_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._lock = threading.Lock()
+        self._snapshot: Optional[dict] = None
+        self._taken_at = 0.0
+        # Bumped on every invalidation, so a snapshot computed across one is not kept
+        self._generation = 0
+
+    def get(self, db: Session) -> dict:
+        """The current counts, recomputed if the snapshot is stale"""
+        with self._lock:
+            if self._snapshot is not None and time.monotonic() - self._taken_at < self.ttl_seconds:
+                return self._snapshot
+            generation = self._generation
+
+        snapshot = self.compute(db)
+        with self._lock:
+            if generation == self._generation:
+                self._snapshot = snapshot
+                self._taken_at = time.monotonic()
+        return snapshot
+
+    def invalidate(self):
+        """Drop the snapshot so the next read recomputes it"""
+        with self._lock:
+            self._snapshot = None
+            self._generation += 1
+
+    def compute(self, db: Session) -> dict:
+        prospect_counts = {status.value: 0 for status in ProspectStatus}
+        for status, count in db.query(Prospect.status, func.count()).group_by(Prospect.status):
+            if status is not None:
+                prospect_counts[status.value] = count
+
+        message_counts = {status.value: 0 for status in MessageStatus}
+        for status, count in db.query(Message.status, func.count()).group_by(Message.status):
+            if status is not None:
+                message_counts[status.value] = count
+
+        sequences = {}
+        funnel = (
+            db.query(
+                Sequence.id,
+                Sequence.name,
+                ProspectSequence.status,
+                ProspectSequence.current_step,
+                func.count()
+            )
+            .join(ProspectSequence, ProspectSequence.sequence_id == Sequence.id)
+            .group_by(Sequence.id, Sequence.name, ProspectSequence.status, ProspectSequence.current_step)
+        )
+        for sequence_id, name, status, current_step, count in funnel:
+            sequence = sequences.setdefault(sequence_id, {
+                "id": sequence_id,
+                "name": name,
+                "enrolled": 0,
+                **{status.value: 0 for status in SequenceStatus},
+                "steps": {},
+            })
+            sequence["enrolled"] += count
+            if status is not None:
+                sequence[status.value] += count
+            # Prospects still working through the sequence, by the step they are on
+            if status == SequenceStatus.ACTIVE and current_step is not None:
+                sequence["steps"][current_step] = sequence["steps"].get(current_step, 0) + count
+
+        return {
+            "total_prospects": sum(prospect_counts.values()),
+            **prospect_counts,
+            "messages": {"total": sum(message_counts.values()), **message_counts},
+            "sequences": sorted(sequences.values(), key=lambda sequence: sequence["id"]),
+        }
+
+
+workflow_stats = WorkflowStats()
+
+
+def mark_stats_stale(db: Session):
+    """
+    Invalidate the stats once the session commits. For writes that bypass
+    the ORM unit of work (bulk inserts and updates), which the flush hook
+    below cannot see.
+    """
+    db.info["workflow_stats_stale"] = True
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_counted_changes(session: Session, flush_context):
+    """Note whether rows were added, removed or moved between counts"""
+    if session.info.get("workflow_stats_stale"):
+        return
+    for obj in list(session.new) + list(session.deleted):
+        if type(obj) in COUNTED_ATTRIBUTES:
+            session.info["workflow_stats_stale"] = True
+            return
+    for obj in session.dirty:
+        attributes = COUNTED_ATTRIBUTES.get(type(obj))
+        if attributes:
+            state = inspect(obj)
+            if any(state.attrs[attribute].history.has_changes() for attribute in attributes):
+                session.info["workflow_stats_stale"] = True
+                return
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_stats(session: Session):
+    if session.info.pop("workflow_stats_stale", False):
+        workflow_stats.invalidate()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_stats_changes(session: Session):
+    session.info.pop("workflow_stats_stale", None)
@@ -0,0 +1,75 @@
+import os
+import sys
+import tempfile
+
+# Settings are read on import, so point them at a scratch database first
+_database_dir = tempfile.mkdtemp(prefix="outbound-agent-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_database_dir, 'test.db')}"
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import event
+
+import models  # noqa: F401  Registers every table on Base.metadata
+from database import Base, SessionLocal, async_engine, engine
+from schema import migrate
+from services.icp_rescorer import score_refresher
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    migrate(engine)
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        score_refresher.wait()
+        with engine.begin() as connection:
+            for table in reversed(Base.metadata.sorted_tables):
+                connection.execute(table.delete())
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from main import app
+    # Not entered as a context manager, so startup (migrations, job resumption) is skipped
+    return TestClient(app)
+
+
+class StatementCounter:
+    """Collects the SQL statements, with their parameters, run on either engine while active"""
+
+    ENGINES = (engine, async_engine.sync_engine)
+
+    def __init__(self):
+        self.executions = []
+
+    @property
+    def statements(self):
+        return [statement for statement, parameters in self.executions]
+
+    def __enter__(self):
+        for target in self.ENGINES:
+            event.listen(target, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        for target in self.ENGINES:
+            event.remove(target, "before_cursor_execute", self._record)
+
+    def _record(self, connection, cursor, statement, parameters, context, executemany):
+        self.executions.append((statement, parameters))
+
+
+@pytest.fixture
+def count_statements():
+    return StatementCounter
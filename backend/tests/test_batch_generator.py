@@ -0,0 +1,249 @@
+import asyncio
+import json
+
+import httpx
+
+from models.job import GenerationJob, GenerationJobItem, JobMode, JobStatus, JobItemStatus
+from models.message import Message
+from models.prospect import Prospect, ProspectStatus
+from services.batch_generator import BatchGenerator, MessageBatchClient
+
+ICP_CONTEXT = {"product": {"name": "Widgets"}, "messaging": {}}
+
+RESEARCH_REPLY = {
+    "summary": "Runs sales at Acme.",
+    "personalization_hooks": ["Recent funding round"],
+    "icp_signals_found": {"positive_signals": ["Hiring SDRs"], "confidence_score": 80},
+}
+
+MESSAGE_REPLY = {"subject": "Quick question", "content": "Hi there", "hook": "Recent funding round"}
+
+
+def succeeded(custom_id: str, reply: dict) -> dict:
+    return {
+        "custom_id": custom_id,
+        "result": {
+            "type": "succeeded",
+            "message": {
+                "content": [{"type": "text", "text": json.dumps(reply)}],
+                "usage": {"input_tokens": 100, "output_tokens": 50},
+            },
+        },
+    }
+
+
+def errored(custom_id: str) -> dict:
+    return {
+        "custom_id": custom_id,
+        "result": {"type": "errored", "error": {"type": "error", "error": {"message": "overloaded"}}},
+    }
+
+
+class FakeBatchAPI:
+    """
+    In-memory Message Batches endpoint for httpx.MockTransport.
+
+    Each submitted request is answered by reply(custom_id), which returns a
+    result line. Batches end on their first poll unless hold is set.
+    """
+
+    def __init__(self, reply=None, hold: bool = False):
+        self.reply = reply or (lambda custom_id: succeeded(
+            custom_id, RESEARCH_REPLY if custom_id.startswith("research") else MESSAGE_REPLY
+        ))
+        self.hold = hold
+        self.batches = {}
+        self.created = []
+        self.cancelled = []
+
+    def add_batch(self, batch_id: str, results: list):
+        self.batches[batch_id] = results
+
+    def client(self) -> MessageBatchClient:
+        return MessageBatchClient(
+            base_url="http://batches.test",
+            api_key="test-key",
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(self.handle))
+        )
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        parts = request.url.path.strip("/").split("/")[3:]  # After v1/messages/batches
+        if request.method == "POST" and not parts:
+            batch_id = f"batch_{len(self.batches) + 1}"
+            requests = json.loads(request.content)["requests"]
+            self.created.append(requests)
+            self.add_batch(batch_id, [self.reply(entry["custom_id"]) for entry in requests])
+            return httpx.Response(200, json={"id": batch_id, "processing_status": "in_progress"})
+        if request.method == "POST" and parts[1:] == ["cancel"]:
+            self.cancelled.append(parts[0])
+            return httpx.Response(200, json={"id": parts[0], "processing_status": "canceling"})
+        if request.method == "GET" and len(parts) == 1:
+            status = "in_progress" if self.hold else "ended"
+            return httpx.Response(200, json={"id": parts[0], "processing_status": status})
+        if request.method == "GET" and parts[1:] == ["results"]:
+            lines = "\n".join(json.dumps(result) for result in self.batches[parts[0]])
+            return httpx.Response(200, text=lines)
+        return httpx.Response(404)
+
+
+def create_job(db, prospect_count: int, **job_fields) -> GenerationJob:
+    job = GenerationJob(
+        status=JobStatus.RUNNING,
+        mode=JobMode.BATCH,
+        channels=["email", "linkedin"],
+        message_types=["initial"],
+        total=prospect_count,
+        **job_fields
+    )
+    db.add(job)
+    for index in range(prospect_count):
+        prospect = Prospect(full_name=f"Prospect {index}", title="VP Sales", company_name="Acme")
+        db.add(prospect)
+        db.flush()
+        db.add(GenerationJobItem(job=job, prospect_id=prospect.id))
+    db.commit()
+    return job
+
+
+def run_batch(fake: FakeBatchAPI, job: GenerationJob):
+    async def run():
+        client = fake.client()
+        try:
+            await BatchGenerator(batch_client=client, poll_interval=0.01).run(job.id, ICP_CONTEXT, "Default")
+        finally:
+            await client.close()
+    asyncio.run(run())
+
+
+def test_runs_research_then_message_batches(db):
+    job = create_job(db, prospect_count=2)
+    items = sorted(job.items, key=lambda item: item.id)
+    fake = FakeBatchAPI()
+
+    run_batch(fake, job)
+
+    # One research batch, then one batch with every channel of every prospect
+    assert [len(requests) for requests in fake.created] == [2, 4]
+    db.expire_all()
+    assert job.batch_state["phase"] == "messages"
+    assert job.completed == 2
+    assert all(item.status == JobItemStatus.COMPLETED and item.messages_generated == 2 for item in items)
+    prospect = db.get(Prospect, items[0].prospect_id)
+    assert prospect.research_summary == RESEARCH_REPLY["summary"]
+    assert prospect.status == ProspectStatus.READY_FOR_REVIEW
+    messages = db.query(Message).all()
+    assert len(messages) == 4
+    # Both prospects got the same research, so their messages share one snapshot
+    assert len({message.research_snapshot_id for message in messages}) == 1
+
+
+def test_failed_result_marks_item_failed(db):
+    job = create_job(db, prospect_count=2)
+    failing, passing = sorted(job.items, key=lambda item: item.id)
+    fake = FakeBatchAPI(reply=lambda custom_id: (
+        errored(custom_id) if custom_id == f"research-{failing.id}"
+        else succeeded(custom_id, RESEARCH_REPLY if custom_id.startswith("research") else MESSAGE_REPLY)
+    ))
+
+    run_batch(fake, job)
+
+    db.expire_all()
+    assert failing.status == JobItemStatus.FAILED
+    assert failing.error == "Batch request errored: overloaded"
+    assert passing.status == JobItemStatus.COMPLETED
+    assert (job.completed, job.failed) == (1, 1)
+    # The failed item is left out of the message batch
+    assert all(request["custom_id"].startswith(f"message-{passing.id}-") for request in fake.created[1])
+    assert db.query(Message).filter(Message.prospect_id == failing.prospect_id).count() == 0
+
+
+def test_resumes_submitted_batch_from_batch_state(db):
+    job = create_job(db, prospect_count=1)
+    item = job.items[0]
+    db.get(Prospect, item.prospect_id).research_data = RESEARCH_REPLY
+    job.batch_state = {"phase": "messages", "batch_ids": ["batch_submitted"]}
+    db.commit()
+    fake = FakeBatchAPI()
+    fake.add_batch("batch_submitted", [
+        succeeded(f"message-{item.id}-0", MESSAGE_REPLY),
+        errored(f"message-{item.id}-1"),
+    ])
+
+    run_batch(fake, job)
+
+    # Polled the checkpointed batch instead of submitting new ones
+    assert fake.created == []
+    db.expire_all()
+    assert item.status == JobItemStatus.COMPLETED
+    assert item.messages_generated == 1
+    assert item.error == "Batch request errored: overloaded"
+    assert db.query(Message).count() == 1
+
+
+def test_cancelled_job_cancels_provider_batches(db):
+    job = create_job(db, prospect_count=1)
+    fake = FakeBatchAPI(hold=True)
+
+    async def run_and_cancel():
+        client = fake.client()
+        task = asyncio.create_task(
+            BatchGenerator(batch_client=client, poll_interval=0.01).run(job.id, ICP_CONTEXT, "Default")
+        )
+        while not fake.created:
+            await asyncio.sleep(0.01)
+        job.status = JobStatus.CANCELLED
+        db.commit()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        await client.close()
+
+    asyncio.run(run_and_cancel())
+
+    assert fake.cancelled == ["batch_1"]
+
+
+def test_shutdown_leaves_provider_batches_running(db):
+    job = create_job(db, prospect_count=1)
+    fake = FakeBatchAPI(hold=True)
+
+    async def run_and_stop():
+        client = fake.client()
+        task = asyncio.create_task(
+            BatchGenerator(batch_client=client, poll_interval=0.01).run(job.id, ICP_CONTEXT, "Default")
+        )
+        while not fake.created:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        await client.close()
+
+    asyncio.run(run_and_stop())
+
+    # The job is still running, so a restart resumes polling the same batch
+    assert fake.cancelled == []
+    db.expire_all()
+    assert job.batch_state == {"phase": "research", "batch_ids": ["batch_1"]}
+
+
+def test_items_of_deleted_prospects_fail(db):
+    job = create_job(db, prospect_count=2)
+    deleted, kept = sorted(job.items, key=lambda item: item.id)
+    # What deleting the prospect leaves behind (ON DELETE SET NULL)
+    deleted.prospect_id = None
+    db.commit()
+    fake = FakeBatchAPI()
+
+    run_batch(fake, job)
+
+    assert [len(requests) for requests in fake.created] == [1, 2]
+    db.expire_all()
+    assert deleted.status == JobItemStatus.FAILED
+    assert deleted.error == "Prospect not found"
+    assert kept.status == JobItemStatus.COMPLETED
+    assert (job.completed, job.failed) == (1, 1)
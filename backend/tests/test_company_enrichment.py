@@ -0,0 +1,34 @@
+import asyncio
+
+from models.company import Company
+from services.company_enrichment import CompanyEnrichmentService
+
+ENRICHMENT = {"description": "Widgets", "industry": "Software", "funding_stage": "Series A"}
+
+
+class FakeEnrichmentService:
+    def __init__(self):
+        self.calls = 0
+
+    async def enrich_company(self, company_name: str, domain: str = None) -> dict:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return ENRICHMENT
+
+
+def test_concurrent_workers_enrich_once_and_release_the_lock(db):
+    company = Company(name="Acme, Inc.", domain="https://www.acme.com/")
+    db.add(company)
+    db.commit()
+    fake = FakeEnrichmentService()
+    service = CompanyEnrichmentService(fake)
+
+    async def enrich_concurrently():
+        return await asyncio.gather(*(service.ensure_enriched(company.id) for _ in range(5)))
+
+    assert asyncio.run(enrich_concurrently()) == [True] * 5
+    assert fake.calls == 1
+    # Nothing is waiting on the company any more, so its lock is gone
+    assert len(CompanyEnrichmentService._locks) == 0
+    db.refresh(company)
+    assert company.industry == "Software"
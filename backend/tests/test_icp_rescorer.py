@@ -0,0 +1,105 @@
+from models.company import Company
+from models.icp import ICPConfig
+from models.prospect import Prospect
+from services.icp_rescorer import ICPRescorer, refresh_score, score_refresher
+from services.icp_scorer import ICPScorer
+from services.pipeline import apply_research
+from services.prospect_import import ProspectImporter
+
+RESEARCH = {
+    "summary": "Runs sales at Acme.",
+    "icp_signals_found": {"positive_signals": ["Hiring SDRs"], "confidence_score": 91},
+}
+
+
+def create_icp(db) -> ICPConfig:
+    icp = ICPConfig(
+        name="Default",
+        is_default=True,
+        target_industries=["Software"],
+        target_titles=["VP Sales"],
+        title_keywords=["sales"],
+    )
+    db.add(icp)
+    db.commit()
+    score_refresher.wait()
+    return icp
+
+
+def test_rescore_matches_scorer_for_unresearched_prospects(db):
+    icp = create_icp(db)
+    company = Company(name="Acme", industry="Software", employee_count=200)
+    prospect = Prospect(full_name="Ada", title="VP Sales", company=company, icp_score=0)
+    db.add(prospect)
+    db.commit()
+    score_refresher.wait()
+
+    db.refresh(prospect)
+    expected = ICPScorer(icp).score_prospect(
+        {"title": "VP Sales", "seniority": None},
+        {"industry": "Software", "employee_count": 200},
+        {}
+    )
+    assert prospect.icp_score == expected["total_score"]
+    assert prospect.icp_scored_version == icp.scoring_version()
+
+
+def test_rescore_scores_researched_prospects_from_their_research(db):
+    icp = create_icp(db)
+    prospect = Prospect(full_name="Ada", title="Intern")
+    db.add(prospect)
+    db.commit()
+    score_refresher.wait()
+
+    apply_research(prospect, RESEARCH)
+    prospect.title = "VP Sales"
+    db.commit()
+    score_refresher.wait()
+    # An ICP change rescores researched prospects too
+    icp.title_keywords = ["sales", "revenue"]
+    db.commit()
+    score_refresher.wait()
+    assert ICPRescorer(db, icp).run()["updated"] == 0
+
+    db.refresh(prospect)
+    expected = ICPScorer(icp).score_prospect({"title": "VP Sales", "seniority": None}, {}, RESEARCH)
+    assert prospect.icp_score == expected["total_score"]
+    assert prospect.icp_match_reasons == expected["match_reasons"]
+    assert prospect.icp_scored_version == icp.scoring_version()
+
+
+def test_refresh_score_scores_now_and_spares_the_rescore(db):
+    icp = create_icp(db)
+    prospect = Prospect(full_name="Ada", title="VP Sales")
+    db.add(prospect)
+    db.commit()
+    score_refresher.wait()
+
+    apply_research(prospect, RESEARCH)
+    refresh_score(db, prospect)
+    expected = ICPScorer(icp).score_prospect({"title": "VP Sales", "seniority": None}, {}, RESEARCH)
+    assert prospect.icp_score == expected["total_score"]
+    db.commit()
+    score_refresher.wait()
+    assert ICPRescorer(db, icp).run()["updated"] == 0
+
+
+def test_imported_prospects_are_scored_once(db):
+    icp = create_icp(db)
+    db.add(Company(name="Acme", normalized_name="acme", industry="Software", employee_count=200, headquarters="Berlin"))
+    icp.target_locations = ["Berlin"]
+    db.commit()
+    score_refresher.wait()
+
+    result = ProspectImporter(db, icp).import_chunk([(2, {"name": "Ada", "title": "VP Sales", "company": "Acme"})])
+    db.commit()
+    assert result["scored"] == 1
+    assert ICPRescorer(db, icp).run()["updated"] == 0
+
+    prospect = db.query(Prospect).filter(Prospect.full_name == "Ada").one()
+    expected = ICPScorer(icp).score_prospect(
+        {"title": "VP Sales", "seniority": None},
+        {"industry": "Software", "employee_count": 200, "headquarters": "Berlin"},
+        {}
+    )
+    assert prospect.icp_score == expected["total_score"]
@@ -0,0 +1,162 @@
+import pytest
+
+from models.icp import ICPConfig
+from services.icp_scorer import ICPScorer
+
+# Overlapping keywords ("sales" in "sales ops", "vp" in "svp", "he"/"she"/"hers"),
+# mixed case, duplicates and non-ASCII, which the compiled matcher must treat
+# exactly as one substring test per keyword
+ICP = ICPConfig(
+    name="Overlaps",
+    target_titles=["VP Sales", "Head of Sales", "Sales"],
+    title_keywords=["sales", "Sales Ops", "ops", "revenue", "he", "she", "hers", "sales"],
+    target_seniority=["VP", "Director", "C-Level"],
+    exclude_titles=["Intern", "assistant to"],
+    target_industries=["Software", "SaaS", "Fintech"],
+    target_locations=["United States", "US", "Zürich"],
+    company_size_min=50,
+    company_size_max=1000,
+    positive_signals=["hiring", "hiring sdrs", "Series B", "series"],
+    negative_signals=["layoffs", "lay", "Bankrupt"],
+    tech_stack_positive=["Salesforce", "HubSpot"],
+    tech_stack_negative=["Pipedrive"],
+    trigger_events=["funding", "new VP", "expansion", "new"],
+    weight_title_match=25,
+    weight_company_fit=25,
+    weight_signals=30,
+    weight_trigger_events=20,
+)
+
+
+class ReferenceScorer:
+    """ICPScorer as it was before matching was compiled: one substring test per keyword"""
+
+    def __init__(self, icp: ICPConfig):
+        self.icp = icp
+
+    def breakdown(self, prospect_data: dict, company_data: dict, research_data: dict) -> dict:
+        return {
+            "title_match": self.title(prospect_data),
+            "company_fit": self.company(company_data),
+            "signals": self.signals(research_data),
+            "trigger_events": self.triggers(research_data),
+        }
+
+    def title(self, prospect_data: dict) -> int:
+        title = (prospect_data.get("title") or "").lower()
+        if not title:
+            return 30
+        score = 0
+        if any(target.lower() in title for target in self.icp.target_titles):
+            score = 100
+        keywords_matched = sum(keyword.lower() in title for keyword in self.icp.title_keywords)
+        if keywords_matched > 0:
+            score = max(score, min(30 + keywords_matched * 20, 80))
+        seniority = (prospect_data.get("seniority") or "").lower()
+        if any(target.lower() in title or target.lower() in seniority for target in self.icp.target_seniority):
+            score = min(score + 15, 100)
+        if any(exclude.lower() in title for exclude in self.icp.exclude_titles):
+            score = 0
+        return score
+
+    def company(self, company_data: dict) -> int:
+        if not company_data:
+            return 40
+        score = 50
+        industry = (company_data.get("industry") or "").lower()
+        if any(target.lower() in industry for target in self.icp.target_industries):
+            score += 25
+        employee_count = company_data.get("employee_count")
+        if employee_count:
+            if self.icp.company_size_min <= employee_count <= self.icp.company_size_max:
+                score += 20
+            elif employee_count < self.icp.company_size_min:
+                score -= 15
+            else:
+                score -= 10
+        location = (company_data.get("location") or company_data.get("headquarters") or "").lower()
+        if any(target.lower() in location for target in self.icp.target_locations):
+            score += 10
+        return min(max(score, 0), 100)
+
+    def signals(self, research_data: dict) -> int:
+        if not research_data:
+            return 50
+        score = 50
+        found = research_data.get("icp_signals_found", {})
+        for signal in found.get("positive_signals", []):
+            if any(target.lower() in signal.lower() for target in self.icp.positive_signals):
+                score += 10
+        tech_stack = research_data.get("tech_stack", [])
+        score += 5 * sum(tech in self.icp.tech_stack_positive for tech in tech_stack)
+        for signal in found.get("negative_signals", []):
+            if any(bad.lower() in signal.lower() for bad in self.icp.negative_signals):
+                score -= 20
+        score -= 15 * sum(tech in self.icp.tech_stack_negative for tech in tech_stack)
+        return min(max(score, 0), 100)
+
+    def triggers(self, research_data: dict) -> int:
+        if not research_data:
+            return 40
+        score = 40
+        text = " ".join(research_data.get("recent_news", []) + research_data.get("personalization_hooks", [])).lower()
+        score += 15 * sum(trigger.lower() in text for trigger in self.icp.trigger_events)
+        if "funding" in text or "raised" in text:
+            score += 10
+        if "hiring" in text or "growing" in text:
+            score += 5
+        return min(score, 100)
+
+
+PROSPECTS = [
+    {"title": "VP Sales"},
+    {"title": "SVP, SALES OPERATIONS"},
+    {"title": "Head of Sales Ops", "seniority": "Director"},
+    {"title": "Sales Operations Intern"},
+    {"title": "Executive Assistant to the CEO", "seniority": "c-level"},
+    {"title": "She/Her - Revenue Lead"},
+    {"title": "ushers"},
+    {"title": "Software Engineer", "seniority": "IC"},
+    {"title": "", "seniority": "VP"},
+    {"title": None},
+]
+
+COMPANIES = [
+    {},
+    {"industry": "Enterprise SOFTWARE", "employee_count": 200, "location": "Zürich, Switzerland"},
+    {"industry": "saas", "employee_count": 20, "headquarters": "Austin, US"},
+    {"industry": "Retail", "employee_count": 50000, "location": "United Kingdom"},
+    {"industry": None, "employee_count": None, "location": None},
+]
+
+RESEARCH = [
+    {},
+    {
+        "icp_signals_found": {
+            "positive_signals": ["Hiring SDRs across EMEA", "Closed a SERIES B"],
+            "negative_signals": ["Recent layoffs", "Delayed roadmap"],
+        },
+        "tech_stack": ["Salesforce", "HubSpot", "Pipedrive", "salesforce"],
+        "recent_news": ["Raised new funding for expansion", "Named a new VP of Sales"],
+        "personalization_hooks": ["Growing the team"],
+    },
+    {
+        "icp_signals_found": {"positive_signals": ["Bankruptcy rumours"], "negative_signals": ["BANKRUPT"]},
+        "recent_news": [],
+        "personalization_hooks": ["Spoke at SaaStr"],
+    },
+]
+
+
+@pytest.mark.parametrize("prospect_data", PROSPECTS)
+@pytest.mark.parametrize("company_data", COMPANIES)
+@pytest.mark.parametrize("research_data", RESEARCH)
+def test_compiled_matching_scores_like_substring_tests(prospect_data, company_data, research_data):
+    result = ICPScorer(ICP).score_prospect(prospect_data, company_data, research_data)
+
+    expected = ReferenceScorer(ICP).breakdown(prospect_data, company_data, research_data)
+    assert result["breakdown"] == expected
+    weights = (ICP.weight_title_match, ICP.weight_company_fit, ICP.weight_signals, ICP.weight_trigger_events)
+    assert result["total_score"] == round(sum(
+        score * weight / 100 for score, weight in zip(expected.values(), weights)
+    ))
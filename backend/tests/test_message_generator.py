@@ -0,0 +1,162 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from models.message import MessageChannel
+from models.prospect import Prospect
+from services.message_generator import MessageGenerator
+from services.pipeline import GenerationPipeline
+
+COMBINATIONS = [("email", "initial"), ("linkedin", "initial"), ("email", "follow_up_1")]
+
+EMAIL = {"index": 0, "subject": "Quick question", "content": "Hi Ada", "hook": "Series B"}
+LINKEDIN = {"index": 1, "subject": "Dropped", "content": "Hey Ada", "hook": "Series B"}
+FOLLOW_UP = {"index": 2, "subject": "Following up", "content": "Any thoughts?", "hook": None}
+
+
+def reply(*entries) -> str:
+    return json.dumps({"messages": list(entries)})
+
+
+class FakeMessages:
+    """Stands in for client.messages, answering every call with the next reply"""
+
+    def __init__(self, *replies: str):
+        self.replies = list(replies)
+        self.calls = []
+
+    async def create(self, **params):
+        self.calls.append(params)
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=self.replies.pop(0))],
+            usage=SimpleNamespace(input_tokens=100, output_tokens=50)
+        )
+
+
+def generator(*replies: str) -> MessageGenerator:
+    return MessageGenerator(client=SimpleNamespace(messages=FakeMessages(*replies)))
+
+
+def test_parses_every_entry():
+    results = generator().parse_multi_response(reply(EMAIL, LINKEDIN, FOLLOW_UP), COMBINATIONS)
+
+    assert results == {
+        0: {"subject": "Quick question", "content": "Hi Ada", "hook": "Series B"},
+        # LinkedIn messages have no subject line
+        1: {"subject": None, "content": "Hey Ada", "hook": "Series B"},
+        2: {"subject": "Following up", "content": "Any thoughts?", "hook": None},
+    }
+
+
+def test_accepts_fenced_json_and_body_alias():
+    content = "Here you go:\n```json\n" + reply({"index": 0, "body": "Hi Ada"}) + "\n```"
+
+    assert generator().parse_multi_response(content, COMBINATIONS) == {
+        0: {"subject": None, "content": "Hi Ada", "hook": None}
+    }
+
+
+@pytest.mark.parametrize("entries, expected", [
+    # Missing entry
+    ([EMAIL, FOLLOW_UP], {0, 2}),
+    # No content, empty content, not an object
+    ([EMAIL, {"index": 1, "hook": "x"}, FOLLOW_UP], {0, 2}),
+    ([EMAIL, {**LINKEDIN, "content": ""}, FOLLOW_UP], {0, 2}),
+    ([EMAIL, "Hey Ada", FOLLOW_UP], {0, 2}),
+    # Index missing, not an int, out of range, or repeated (the first one wins)
+    ([EMAIL, {**LINKEDIN, "index": None}, FOLLOW_UP], {0, 2}),
+    ([EMAIL, {**LINKEDIN, "index": "1"}, FOLLOW_UP], {0, 2}),
+    ([EMAIL, {**LINKEDIN, "index": 3}, {**LINKEDIN, "index": -1}], {0}),
+    ([EMAIL, {**EMAIL, "content": "Duplicate"}], {0}),
+])
+def test_leaves_out_unusable_entries(entries, expected):
+    results = generator().parse_multi_response(reply(*entries), COMBINATIONS)
+
+    assert set(results) == expected
+    assert results[0]["content"] == "Hi Ada"
+
+
+@pytest.mark.parametrize("content", ["", "not json", "[1, 2]", json.dumps({"messages": "none"})])
+def test_unparseable_reply_yields_nothing(content):
+    assert generator().parse_multi_response(content, COMBINATIONS) == {}
+
+
+def test_generate_many_falls_back_per_missing_entry():
+    fallback = json.dumps({"content": "Hey Ada, LinkedIn version"})
+    message_generator = generator(reply(EMAIL, {"index": 1}, FOLLOW_UP), fallback)
+
+    results = asyncio.run(message_generator.generate_many({"name": "Ada"}, {}, {}, COMBINATIONS))
+
+    assert [result["content"] for result in results] == ["Hi Ada", "Hey Ada, LinkedIn version", "Any thoughts?"]
+    calls = message_generator.client.messages.calls
+    assert len(calls) == 2
+    # The fallback asks for the missing LinkedIn message alone
+    assert "CHANNEL: linkedin" in calls[1]["messages"][0]["content"][1]["text"]
+
+
+def test_generate_many_returns_fallback_failures_when_asked():
+    message_generator = generator(reply(EMAIL, FOLLOW_UP), "still not json", "nor this")
+
+    results = asyncio.run(message_generator.generate_many(
+        {"name": "Ada"}, {}, {}, COMBINATIONS, return_exceptions=True
+    ))
+
+    assert results[0]["content"] == "Hi Ada"
+    assert isinstance(results[1], Exception)
+    assert results[2]["content"] == "Any thoughts?"
+
+
+class FakeEnrichmentService:
+    async def research_prospect(self, prospect_data: dict, icp_context: dict) -> dict:
+        return {"summary": "Runs sales at Acme.", "personalization_hooks": ["Series B"]}
+
+
+def run_pipeline(db, message_generator: MessageGenerator, **options) -> dict:
+    prospect = Prospect(full_name="Ada Lovelace", title="VP Sales", company_name="Acme")
+    db.add(prospect)
+    db.commit()
+    pipeline = GenerationPipeline(FakeEnrichmentService(), message_generator, **options)
+    result = asyncio.run(pipeline.run(
+        db,
+        prospect,
+        icp_context={},
+        icp_name="Default",
+        channels=[MessageChannel.EMAIL, MessageChannel.LINKEDIN],
+        message_types=["initial", "follow_up_1"]
+    ))
+    db.commit()
+    return result
+
+
+def test_pipeline_generates_all_messages_in_one_call(db):
+    entries = [{"index": index, "content": f"Message {index}"} for index in range(4)]
+    message_generator = generator(reply(*entries))
+
+    result = run_pipeline(db, message_generator)
+
+    assert len(message_generator.client.messages.calls) == 1
+    assert [message.content for message in result["messages"]] == [f"Message {index}" for index in range(4)]
+    assert result["failed"] == []
+
+
+def test_pipeline_reports_combinations_the_fallback_cannot_recover(db):
+    entries = [{"index": index, "content": f"Message {index}"} for index in range(3)]
+    message_generator = generator(reply(*entries), "not json", "still not json")
+
+    result = run_pipeline(db, message_generator)
+
+    assert len(result["messages"]) == 3
+    assert [(failure["channel"], failure["message_type"]) for failure in result["failed"]] == [
+        ("linkedin", "follow_up_1")
+    ]
+
+
+def test_pipeline_can_keep_one_call_per_message(db):
+    message_generator = generator(*(json.dumps({"content": f"Message {index}"}) for index in range(4)))
+
+    result = run_pipeline(db, message_generator, single_call=False)
+
+    assert len(message_generator.client.messages.calls) == 4
+    assert len(result["messages"]) == 4
@@ -0,0 +1,55 @@
+import pytest
+
+from models.message import Message, MessageChannel, MessageStatus
+from models.prospect import Prospect
+from models.sequence import Sequence, SequenceStep, StepType
+from services.icp_rescorer import score_refresher
+
+
+def seed(db, prospect_count: int) -> int:
+    prospects = [Prospect(full_name=f"Prospect {index}") for index in range(prospect_count)]
+    for prospect in prospects:
+        for channel in (MessageChannel.EMAIL, MessageChannel.LINKEDIN):
+            db.add(Message(
+                prospect=prospect,
+                channel=channel,
+                message_type="initial",
+                content="Hi there",
+                status=MessageStatus.READY_FOR_REVIEW
+            ))
+    for index in range(prospect_count):
+        sequence = Sequence(name=f"Sequence {index}")
+        for order in range(1, 4):
+            sequence.steps.append(SequenceStep(order=order, step_type=StepType.COLD_EMAIL, name=f"Step {order}"))
+        db.add(sequence)
+    db.add_all(prospects)
+    db.commit()
+    # Background rescoring of the new prospects would be counted too
+    score_refresher.wait()
+    return prospects[0].id
+
+
+@pytest.mark.parametrize("prospect_count", [3, 30])
+def test_list_statements_do_not_grow_with_rows(db, client, count_statements, prospect_count):
+    prospect_id = seed(db, prospect_count)
+
+    with count_statements() as counter:
+        response = client.get("/api/messages/", params={"per_page": 100})
+    assert response.status_code == 200
+    assert len(response.json()["messages"]) == 2 * prospect_count
+    assert all("prospect" in message for message in response.json()["messages"])
+    # The page with its prospects, and the first page's total
+    assert len(counter.statements) == 2
+
+    with count_statements() as counter:
+        response = client.get(f"/api/messages/prospect/{prospect_id}")
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert len(counter.statements) == 1
+
+    with count_statements() as counter:
+        response = client.get("/api/sequences")
+    assert response.status_code == 200
+    assert [len(sequence["steps"]) for sequence in response.json()] == [3] * prospect_count
+    # The sequences, and the steps of all of them
+    assert len(counter.statements) == 2
@@ -0,0 +1,92 @@
+import pytest
+
+from database import engine
+from models.message import Message, MessageChannel, MessageStatus
+from models.prospect import Prospect, ProspectStatus
+from pagination import paginate
+from services.icp_rescorer import score_refresher
+
+
+def query_plan(statement: str, parameters) -> str:
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return "\n".join(row[-1] for row in cursor.fetchall())
+    finally:
+        connection.close()
+
+
+def page_plan(counter) -> str:
+    """Plan of the page query: the one statement ordered for the keyset"""
+    [(statement, parameters)] = [
+        (statement, parameters) for statement, parameters in counter.executions if "ORDER BY" in statement
+    ]
+    return query_plan(statement, parameters)
+
+
+@pytest.fixture
+def seeded(db):
+    for index in range(20):
+        prospect = Prospect(
+            full_name=f"Prospect {index}",
+            icp_score=index * 5,
+            status=ProspectStatus.READY_FOR_REVIEW if index % 2 else ProspectStatus.NEW
+        )
+        db.add(prospect)
+        db.add(Message(
+            prospect=prospect,
+            channel=MessageChannel.EMAIL,
+            message_type="initial",
+            content="Hi there",
+            status=MessageStatus.READY_FOR_REVIEW
+        ))
+    db.commit()
+    score_refresher.wait()
+
+
+@pytest.mark.parametrize("path, params, index", [
+    ("/api/workflow/queue", {}, "ix_prospects_status_icp_score"),
+    ("/api/messages/", {}, "ix_messages_created_at"),
+    ("/api/prospects", {}, "ix_prospects_created_at"),
+    ("/api/prospects", {"sort_by": "updated_at"}, "ix_prospects_updated_at"),
+])
+def test_list_pages_read_their_index_in_order(seeded, client, count_statements, path, params, index):
+    with count_statements() as counter:
+        response = client.get(path, params={"per_page": 5, **params})
+    assert response.status_code == 200
+
+    plan = page_plan(counter)
+    assert f"USING INDEX {index}" in plan or f"USING COVERING INDEX {index}" in plan, plan
+    # Rows come off the index in page order instead of being sorted
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def follow_cursors(client, path: str, params: dict) -> list:
+    """Ids of every prospect on every page, following next_cursor from the first"""
+    ids = []
+    cursor = None
+    while True:
+        response = client.get(path, params={"per_page": 3, **params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        ids += [prospect["id"] for prospect in response.json()["prospects"]]
+        cursor = response.json()["next_cursor"]
+        if not cursor:
+            return ids
+
+
+def test_queue_cursor_pages_cover_every_prospect(seeded, db, client):
+    ids = follow_cursors(client, "/api/workflow/queue", {})
+    in_review = db.query(Prospect.id).filter(Prospect.status == ProspectStatus.READY_FOR_REVIEW)
+    assert sorted(ids) == sorted(prospect_id for (prospect_id,) in in_review)
+
+
+def test_paginate_rejects_nullable_columns(db):
+    with pytest.raises(ValueError):
+        paginate(db.query(Prospect), [Prospect.researched_at, Prospect.id], 5)
+
+
+@pytest.mark.parametrize("sort_by", ["created_at", "updated_at", "icp_score", "full_name"])
+def test_prospect_cursor_pages_cover_every_prospect(seeded, db, client, sort_by):
+    ids = follow_cursors(client, "/api/prospects", {"sort_by": sort_by})
+    assert sorted(ids) == sorted(prospect_id for (prospect_id,) in db.query(Prospect.id))
@@ -30,6 +30,47 @@ api.interceptors.response.use(
   }
 )
 
+// POST to an endpoint that replies with server-sent events, calling
+// onEvent(event, data) for each one. EventSource only supports GET.
+export async function streamEvents(path, data, onEvent, signal) {
+  const token = localStorage.getItem('token')
+  const response = await fetch(`${API_BASE_URL}${path}`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+    },
+    body: JSON.stringify(data),
+    signal,
+  })
+  if (!response.ok) {
+    const body = await response.json().catch(() => ({}))
+    throw new Error(body.detail || `Request failed with status ${response.status}`)
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  while (true) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+
+    let boundary
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const chunk = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+      let event = 'message'
+      let payload = ''
+      for (const line of chunk.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7)
+        else if (line.startsWith('data: ')) payload += line.slice(6)
+      }
+      if (payload) onEvent(event, JSON.parse(payload))
+    }
+  }
+}
+
 // Auth API
 export const auth = {
   login: (email, password) =>
@@ -54,6 +95,8 @@ export const prospects = {
       headers: { 'Content-Type': 'multipart/form-data' },
     })
   },
+  getImportJob: (id) => api.get(`/prospects/import/jobs/${id}`),
+  cancelImportJob: (id) => api.post(`/prospects/import/jobs/${id}/cancel`),
 }
 
 // Messages API
@@ -61,6 +104,7 @@ export const messages = {
   list: (params) => api.get('/messages', { params }),
   getForProspect: (prospectId) => api.get(`/messages/prospect/${prospectId}`),
   generate: (data) => api.post('/messages/generate', data),
+  generateStream: (data, onEvent, signal) => streamEvents('/messages/generate/stream', data, onEvent, signal),
   update: (id, data) => api.put(`/messages/${id}`, data),
   approve: (id) => api.post(`/messages/${id}/approve`),
   reject: (id) => api.post(`/messages/${id}/reject`),
@@ -68,6 +112,15 @@ export const messages = {
   markSent: (id) => api.post(`/messages/${id}/mark-sent`),
 }
 
+// Bulk generation jobs API
+export const jobs = {
+  list: () => api.get('/jobs'),
+  get: (id) => api.get(`/jobs/${id}`),
+  generate: (data) => api.post('/jobs/generate', data),
+  cancel: (id) => api.post(`/jobs/${id}/cancel`),
+  eventsUrl: (id) => `${API_BASE_URL}/jobs/${id}/events`,
+}
+
 // ICP API
 export const icp = {
   list: () => api.get('/icp'),
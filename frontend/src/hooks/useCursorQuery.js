@@ -0,0 +1,48 @@
+import { useCallback, useEffect, useState } from 'react'
+import { useQuery } from '@tanstack/react-query'
+
+// Page through a cursor-paginated list endpoint. Keeps the cursors of the
+// pages visited so far (for Previous) and the total reported with the first
+// page, and starts over whenever the rest of the query key changes.
+export default function useCursorQuery({ queryKey, fetchPage }) {
+  const listKey = JSON.stringify(queryKey)
+  const [state, setState] = useState({ listKey, cursors: [null], total: null })
+
+  const current = state.listKey === listKey ? state : { listKey, cursors: [null], total: null }
+  if (current !== state) {
+    setState(current)
+  }
+
+  const cursor = current.cursors[current.cursors.length - 1]
+  const query = useQuery({
+    queryKey: [...queryKey, cursor],
+    queryFn: () => fetchPage(cursor),
+  })
+
+  const total = query.data?.total ?? current.total
+  useEffect(() => {
+    if (query.data?.total != null) {
+      setState(prev => (prev.listKey === listKey ? { ...prev, total: query.data.total } : prev))
+    }
+  }, [query.data, listKey])
+
+  const nextCursor = query.data?.next_cursor
+  const next = useCallback(() => {
+    if (nextCursor) {
+      setState(prev => ({ ...prev, cursors: [...prev.cursors, nextCursor] }))
+    }
+  }, [nextCursor])
+  const previous = useCallback(() => {
+    setState(prev => (prev.cursors.length > 1 ? { ...prev, cursors: prev.cursors.slice(0, -1) } : prev))
+  }, [])
+
+  return {
+    ...query,
+    total,
+    page: current.cursors.length,
+    hasNext: Boolean(nextCursor),
+    hasPrevious: current.cursors.length > 1,
+    next,
+    previous,
+  }
+}
@@ -0,0 +1,76 @@
+import { useCallback, useEffect, useRef, useState } from 'react'
+import { messages } from '../api/client'
+
+const draftKey = ({ channel, message_type }) => `${channel}:${message_type}`
+
+// Extract the message body from a partial JSON reply so drafts render as they stream
+function partialContent(text) {
+  const match = text.match(/"content"\s*:\s*"((?:[^"\\]|\\.)*)/)
+  if (!match) return ''
+  try {
+    return JSON.parse(`"${match[1].replace(/\\$/, '')}"`)
+  } catch {
+    return match[1]
+  }
+}
+
+export default function useGenerationStream({ onDone } = {}) {
+  const [status, setStatus] = useState('idle')
+  const [research, setResearch] = useState(null)
+  const [drafts, setDrafts] = useState({})
+  const [error, setError] = useState(null)
+  const controllerRef = useRef(null)
+  const onDoneRef = useRef(onDone)
+  onDoneRef.current = onDone
+
+  const handleEvent = useCallback((event, data) => {
+    if (event === 'research') {
+      setResearch(data)
+      setStatus('generating')
+    } else if (event === 'delta') {
+      setDrafts(prev => {
+        const current = prev[draftKey(data)] || { ...data, text: '' }
+        const text = current.text + data.text
+        return { ...prev, [draftKey(data)]: { ...current, text, content: partialContent(text) } }
+      })
+    } else if (event === 'message') {
+      setDrafts(prev => ({ ...prev, [draftKey(data)]: { ...prev[draftKey(data)], ...data, done: true } }))
+    } else if (event === 'error') {
+      setDrafts(prev => ({ ...prev, [draftKey(data)]: { ...prev[draftKey(data)], ...data, failed: true } }))
+    } else if (event === 'done') {
+      setStatus('done')
+      onDoneRef.current?.(data)
+    } else if (event === 'failed') {
+      setStatus('failed')
+      setError(data.error)
+    }
+  }, [])
+
+  const start = useCallback(async (data) => {
+    controllerRef.current?.abort()
+    const controller = new AbortController()
+    controllerRef.current = controller
+
+    setStatus('researching')
+    setResearch(null)
+    setDrafts({})
+    setError(null)
+    try {
+      await messages.generateStream(data, handleEvent, controller.signal)
+    } catch (err) {
+      if (err.name !== 'AbortError') {
+        setStatus('failed')
+        setError(err.message)
+      }
+    }
+  }, [handleEvent])
+
+  const cancel = useCallback(() => {
+    controllerRef.current?.abort()
+    setStatus('idle')
+  }, [])
+
+  useEffect(() => () => controllerRef.current?.abort(), [])
+
+  return { status, research, drafts: Object.values(drafts), error, start, cancel }
+}
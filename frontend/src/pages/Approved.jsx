@@ -1,5 +1,5 @@
 import React, { useState } from 'react'
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
+import { useMutation, useQueryClient } from '@tanstack/react-query'
 import { Link, useSearchParams } from 'react-router-dom'
 import {
   Copy, Check, ExternalLink, Mail, Linkedin, MessageSquare,
@@ -7,6 +7,7 @@ import {
   CheckCircle, TrendingUp
 } from 'lucide-react'
 import { messages } from '../api/client'
+import useCursorQuery from '../hooks/useCursorQuery'
 import clsx from 'clsx'
 
 function ChannelBadge({ channel }) {
@@ -203,15 +204,14 @@ export default function Approved() {
   const queryClient = useQueryClient()
   const [searchParams, setSearchParams] = useSearchParams()
 
-  const page = parseInt(searchParams.get('page') || '1')
   const channel = searchParams.get('channel') || ''
 
-  const { data, isLoading, error } = useQuery({
-    queryKey: ['approvedMessages', page, channel],
-    queryFn: () => messages.list({
+  const { data, isLoading, error, total, page, hasNext, hasPrevious, next: nextPage, previous: previousPage } = useCursorQuery({
+    queryKey: ['approvedMessages', channel],
+    fetchPage: (cursor) => messages.list({
       status: 'approved',
       channel: channel || undefined,
-      page,
+      cursor: cursor || undefined,
       per_page: 10,
     }).then(res => res.data),
   })
@@ -239,7 +239,7 @@ export default function Approved() {
         <div>
           <h1 className="text-2xl font-bold text-gray-900">Approved Messages</h1>
           <p className="text-gray-500 mt-1">
-            {data?.total || 0} messages ready to send
+            {total || 0} messages ready to send
           </p>
         </div>
         {data?.messages?.length > 0 && (
@@ -289,7 +289,7 @@ export default function Approved() {
             </div>
             <div>
               <p className="text-sm text-gray-500">Ready to Send</p>
-              <p className="text-xl font-bold text-gray-900">{data?.total || 0}</p>
+              <p className="text-xl font-bold text-gray-900">{total || 0}</p>
             </div>
           </div>
         </div>
@@ -301,7 +301,7 @@ export default function Approved() {
           <Filter className="h-5 w-5 text-gray-400" />
           <select
             value={channel}
-            onChange={(e) => setSearchParams({ channel: e.target.value, page: '1' })}
+            onChange={(e) => setSearchParams({ channel: e.target.value })}
             className="px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500"
           >
             <option value="">All Channels</option>
@@ -339,22 +339,22 @@ export default function Approved() {
           ))}
 
           {/* Pagination */}
-          {data.pages > 1 && (
+          {(hasPrevious || hasNext) && (
             <div className="flex items-center justify-between pt-4">
               <p className="text-sm text-gray-500">
-                Page {page} of {data.pages}
+                Page {page}{total != null && ` of ${Math.ceil(total / 10)}`}
               </p>
               <div className="flex gap-2">
                 <button
-                  onClick={() => setSearchParams({ channel, page: String(page - 1) })}
-                  disabled={page === 1}
+                  onClick={previousPage}
+                  disabled={!hasPrevious}
                   className="p-2 border rounded-lg disabled:opacity-50 disabled:cursor-not-allowed hover:bg-gray-50"
                 >
                   <ChevronLeft className="h-4 w-4" />
                 </button>
                 <button
-                  onClick={() => setSearchParams({ channel, page: String(page + 1) })}
-                  disabled={page === data.pages}
+                  onClick={nextPage}
+                  disabled={!hasNext}
                   className="p-2 border rounded-lg disabled:opacity-50 disabled:cursor-not-allowed hover:bg-gray-50"
                 >
                   <ChevronRight className="h-4 w-4" />
@@ -1,5 +1,5 @@
-import React, { useState, useCallback } from 'react'
-import { useMutation, useQueryClient } from '@tanstack/react-query'
+import React, { useState, useCallback, useEffect } from 'react'
+import { useMutation, useQuery, useQueryClient } from '@tanstack/react-query'
 import { useNavigate } from 'react-router-dom'
 import {
   Upload, FileSpreadsheet, AlertCircle, CheckCircle, X,
@@ -202,7 +202,7 @@ function ImportResult({ result, onReset }) {
           <div className="bg-red-50 rounded-lg p-4 max-h-40 overflow-y-auto">
             {result.error_details.map((error, i) => (
               <p key={i} className="text-sm text-red-700">
-                Row {error.row}: {error.message}
+                Row {error.row}: {error.error}
               </p>
             ))}
           </div>
@@ -233,16 +233,38 @@ export default function Import() {
   const [file, setFile] = useState(null)
   const [preview, setPreview] = useState(null)
   const [isDragging, setIsDragging] = useState(false)
-  const [importResult, setImportResult] = useState(null)
+  const [importJobId, setImportJobId] = useState(null)
 
   const importMutation = useMutation({
     mutationFn: (file) => prospects.importCSV(file),
-    onSuccess: (response) => {
-      setImportResult(response.data)
-      queryClient.invalidateQueries(['prospects'])
-    },
+    onSuccess: (response) => setImportJobId(response.data.id),
+  })
+
+  // Imports run in the background; poll the job until it finishes
+  const { data: importJob } = useQuery({
+    queryKey: ['importJob', importJobId],
+    queryFn: () => prospects.getImportJob(importJobId).then(res => res.data),
+    enabled: !!importJobId,
+    refetchInterval: (query) => (
+      ['pending', 'running'].includes(query.state.data?.status ?? 'pending') ? 1000 : false
+    ),
   })
 
+  const importRunning = importMutation.isPending || (importJob ? ['pending', 'running'].includes(importJob.status) : !!importJobId)
+  const importFailed = importJob?.status === 'failed'
+  const importResult = importJob && !importRunning && !importFailed ? {
+    imported: importJob.rows_inserted,
+    duplicates: importJob.rows_duplicate,
+    errors: importJob.rows_failed,
+    error_details: importJob.row_errors,
+  } : null
+
+  useEffect(() => {
+    if (importResult) {
+      queryClient.invalidateQueries(['prospects'])
+    }
+  }, [!!importResult])
+
   const parseCSVPreview = useCallback((file) => {
     const reader = new FileReader()
     reader.onload = (e) => {
@@ -281,7 +303,7 @@ export default function Import() {
   const handleFileSelect = useCallback((selectedFile) => {
     setFile(selectedFile)
     parseCSVPreview(selectedFile)
-    setImportResult(null)
+    setImportJobId(null)
   }, [parseCSVPreview])
 
   const handleRemoveFile = () => {
@@ -298,7 +320,7 @@ export default function Import() {
   const handleReset = () => {
     setFile(null)
     setPreview(null)
-    setImportResult(null)
+    setImportJobId(null)
     importMutation.reset()
   }
 
@@ -360,13 +382,13 @@ export default function Import() {
                 preview={preview}
               />
 
-              {importMutation.isError && (
+              {(importMutation.isError || importFailed) && (
                 <div className="flex items-center gap-3 p-4 bg-red-50 border border-red-200 rounded-lg">
                   <AlertCircle className="h-5 w-5 text-red-500 flex-shrink-0" />
                   <div>
                     <p className="font-medium text-red-800">Import Failed</p>
                     <p className="text-sm text-red-700">
-                      {importMutation.error?.response?.data?.detail || 'An error occurred during import'}
+                      {importMutation.error?.response?.data?.detail || importJob?.error || 'An error occurred during import'}
                     </p>
                   </div>
                 </div>
@@ -381,13 +403,15 @@ export default function Import() {
                 </button>
                 <button
                   onClick={handleImport}
-                  disabled={importMutation.isPending}
+                  disabled={importRunning}
                   className="inline-flex items-center gap-2 px-6 py-2 bg-blue-600 text-white rounded-lg hover:bg-blue-700 disabled:opacity-50 transition-colors"
                 >
-                  {importMutation.isPending ? (
+                  {importRunning ? (
                     <>
                       <Loader2 className="h-4 w-4 animate-spin" />
-                      Importing...
+                      {importJob?.rows_parsed
+                        ? `Importing... ${importJob.rows_parsed.toLocaleString()} rows processed`
+                        : 'Importing...'}
                     </>
                   ) : (
                     <>
@@ -445,7 +469,7 @@ export default function Import() {
               </li>
               <li className="flex items-start gap-2">
                 <CheckCircle className="h-4 w-4 text-blue-600 flex-shrink-0 mt-0.5" />
-                <span>Maximum 1,000 prospects per import</span>
+                <span>Large exports (100,000+ rows) are imported in chunks</span>
               </li>
             </ul>
           </div>
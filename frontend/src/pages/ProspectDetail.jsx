@@ -408,7 +408,6 @@ function MessageHistory({ prospectId }) {
 export default function ProspectDetail() {
   const { id } = useParams()
   const navigate = useNavigate()
-  const queryClient = useQueryClient()
 
   const { data: prospect, isLoading, error, refetch } = useQuery({
     queryKey: ['prospect', id],
@@ -421,13 +420,6 @@ export default function ProspectDetail() {
     enabled: !!id,
   })
 
-  const generateMessageMutation = useMutation({
-    mutationFn: (data) => messages.generate(data),
-    onSuccess: () => {
-      queryClient.invalidateQueries(['messages', id])
-    },
-  })
-
   if (isLoading) {
     return (
       <div className="flex items-center justify-center h-64">
@@ -590,14 +582,10 @@ export default function ProspectDetail() {
             <div className="flex items-center justify-between mb-4">
               <h2 className="text-lg font-semibold text-gray-900">Messages</h2>
               <button
-                onClick={() => generateMessageMutation.mutate({
-                  prospect_id: parseInt(id),
-                  channel: 'email'
-                })}
-                disabled={generateMessageMutation.isPending}
-                className="px-3 py-1.5 text-sm bg-blue-600 text-white rounded-lg hover:bg-blue-700 disabled:opacity-50"
+                onClick={() => navigate(`/review?generate=${id}`)}
+                className="px-3 py-1.5 text-sm bg-blue-600 text-white rounded-lg hover:bg-blue-700"
               >
-                {generateMessageMutation.isPending ? 'Generating...' : 'Generate Message'}
+                Generate Message
               </button>
             </div>
             <MessageHistory prospectId={id} />
@@ -2,7 +2,8 @@ import React, { useState } from "react"
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query"
 import { Link } from "react-router-dom"
 import { Search, Linkedin, Mail, Sparkles, Trash2, CheckSquare, Square, CheckCircle, XCircle, FlaskConical, ListChecks } from "lucide-react"
-import { prospects, messages, sequences } from "../api/client"
+import { prospects, messages, sequences, jobs } from "../api/client"
+import useCursorQuery from "../hooks/useCursorQuery"
 import clsx from "clsx"
 
 const statusColors = {
@@ -18,15 +19,14 @@ const statusColors = {
 export default function Prospects() {
   const [search, setSearch] = useState("")
   const [statusFilter, setStatusFilter] = useState("")
-  const [page, setPage] = useState(1)
   const [selectedIds, setSelectedIds] = useState(new Set())
   const [showSequenceModal, setShowSequenceModal] = useState(false)
   const queryClient = useQueryClient()
 
-  const { data, isLoading, error } = useQuery({
-    queryKey: ["prospects", page, search, statusFilter],
-    queryFn: () => prospects.list({
-      page,
+  const { data, isLoading, error, total, page, hasNext, hasPrevious, next: nextPage, previous: previousPage } = useCursorQuery({
+    queryKey: ["prospects", search, statusFilter],
+    fetchPage: (cursor) => prospects.list({
+      cursor: cursor || undefined,
       per_page: 25,
       search: search || undefined,
       status: statusFilter || undefined,
@@ -68,18 +68,7 @@ export default function Prospects() {
   })
 
   const bulkGenerateMutation = useMutation({
-    mutationFn: async (ids) => {
-      const results = []
-      for (const id of ids) {
-        try {
-          await messages.generate({ prospect_id: id })
-          results.push({ id, success: true })
-        } catch (e) {
-          results.push({ id, success: false, error: e.message })
-        }
-      }
-      return results
-    },
+    mutationFn: (ids) => jobs.generate({ prospect_ids: ids }),
     onSuccess: () => {
       queryClient.invalidateQueries(["prospects"])
       setSelectedIds(new Set())
@@ -180,9 +169,9 @@ export default function Prospects() {
         <div className="p-4 flex gap-4">
           <div className="flex-1 relative">
             <Search className="absolute left-3 top-1/2 transform -translate-y-1/2 h-4 w-4 text-gray-400" />
-            <input type="text" placeholder="Search by name, email, or title..." value={search} onChange={(e) => { setSearch(e.target.value); setPage(1) }} className="w-full pl-10 pr-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500" />
+            <input type="text" placeholder="Search by name, email, or title..." value={search} onChange={(e) => setSearch(e.target.value)} className="w-full pl-10 pr-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500" />
           </div>
-          <select value={statusFilter} onChange={(e) => { setStatusFilter(e.target.value); setPage(1) }} className="px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500">
+          <select value={statusFilter} onChange={(e) => setStatusFilter(e.target.value)} className="px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500">
             <option value="">All Statuses</option>
             <option value="new">New</option>
             <option value="researching">Researching</option>
@@ -254,10 +243,10 @@ export default function Prospects() {
               </tbody>
             </table>
             <div className="px-6 py-4 border-t border-gray-200 flex items-center justify-between">
-              <div className="text-sm text-gray-500">Showing {(page - 1) * 25 + 1} to {Math.min(page * 25, data.total)} of {data.total} prospects</div>
+              <div className="text-sm text-gray-500">Showing {(page - 1) * 25 + 1} to {(page - 1) * 25 + data.prospects.length}{total != null && ` of ${total}`} prospects</div>
               <div className="flex gap-2">
-                <button onClick={() => setPage(p => Math.max(1, p - 1))} disabled={page === 1} className="px-3 py-1 border border-gray-300 rounded text-sm disabled:opacity-50">Previous</button>
-                <button onClick={() => setPage(p => p + 1)} disabled={page * 25 >= data.total} className="px-3 py-1 border border-gray-300 rounded text-sm disabled:opacity-50">Next</button>
+                <button onClick={previousPage} disabled={!hasPrevious} className="px-3 py-1 border border-gray-300 rounded text-sm disabled:opacity-50">Previous</button>
+                <button onClick={nextPage} disabled={!hasNext} className="px-3 py-1 border border-gray-300 rounded text-sm disabled:opacity-50">Next</button>
               </div>
             </div>
           </>
@@ -1,11 +1,13 @@
-import React, { useState } from 'react'
+import React, { useEffect, useState } from 'react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { Link, useSearchParams } from 'react-router-dom'
 import {
   CheckCircle, XCircle, RefreshCw, Edit2, Save, X, ChevronLeft, ChevronRight,
-  Mail, MessageSquare, Linkedin, User, Building2, AlertCircle, Filter
+  Mail, MessageSquare, Linkedin, User, Building2, AlertCircle, Filter, Sparkles
 } from 'lucide-react'
 import { messages, workflow } from '../api/client'
+import useCursorQuery from '../hooks/useCursorQuery'
+import useGenerationStream from '../hooks/useGenerationStream'
 import clsx from 'clsx'
 
 function ChannelBadge({ channel }) {
@@ -199,20 +201,86 @@ function MessageCard({ message, onApprove, onReject, onRegenerate, isProcessing
   )
 }
 
+function GenerationPanel({ status, research, drafts, error, onCancel }) {
+  const active = status === 'researching' || status === 'generating'
+  return (
+    <div className="bg-white rounded-lg shadow-sm border border-blue-200 p-6 mb-6">
+      <div className="flex items-center justify-between mb-4">
+        <div className="flex items-center gap-2">
+          <Sparkles className={clsx('h-5 w-5 text-blue-600', active && 'animate-pulse')} />
+          <h2 className="text-lg font-semibold text-gray-900">
+            {status === 'researching' && 'Researching prospect...'}
+            {status === 'generating' && 'Writing drafts...'}
+            {status === 'done' && 'Drafts ready for review'}
+            {status === 'failed' && 'Generation failed'}
+          </h2>
+        </div>
+        {active && (
+          <button onClick={onCancel} className="text-sm text-gray-500 hover:text-gray-700">
+            Cancel
+          </button>
+        )}
+      </div>
+
+      {error && <p className="text-sm text-red-600 mb-4">{error}</p>}
+
+      {research && (
+        <div className="mb-4 text-sm text-gray-600">
+          <p>{research.research_summary}</p>
+          <p className="mt-1 text-gray-500">
+            ICP score: {research.icp_score}{research.research_cached && ' (cached research)'}
+          </p>
+        </div>
+      )}
+
+      <div className="space-y-3">
+        {drafts.map((draft) => (
+          <div key={`${draft.channel}:${draft.message_type}`} className="border border-gray-200 rounded-lg p-4">
+            <div className="flex items-center gap-2 mb-2">
+              <ChannelBadge channel={draft.channel} />
+              <span className="text-xs text-gray-500">{draft.message_type}</span>
+              {draft.failed && <span className="text-xs text-red-600">{draft.error}</span>}
+            </div>
+            {draft.subject && <p className="font-medium text-gray-900 mb-1">{draft.subject}</p>}
+            <p className="text-sm text-gray-700 whitespace-pre-wrap">
+              {draft.content}
+              {!draft.done && !draft.failed && <span className="animate-pulse">▍</span>}
+            </p>
+          </div>
+        ))}
+      </div>
+    </div>
+  )
+}
+
 export default function ReviewQueue() {
   const queryClient = useQueryClient()
   const [searchParams, setSearchParams] = useSearchParams()
   const [processingIds, setProcessingIds] = useState(new Set())
 
-  const page = parseInt(searchParams.get('page') || '1')
   const channel = searchParams.get('channel') || ''
+  const generateFor = searchParams.get('generate')
 
-  const { data, isLoading, error } = useQuery({
-    queryKey: ['reviewQueue', page, channel],
-    queryFn: () => messages.list({
+  // Drafts for ?generate=<prospect id> stream in above the queue as they are written
+  const generation = useGenerationStream({
+    onDone: () => {
+      queryClient.invalidateQueries(['reviewQueue'])
+      queryClient.invalidateQueries(['workflowStats'])
+    },
+  })
+
+  useEffect(() => {
+    if (generateFor) {
+      generation.start({ prospect_id: parseInt(generateFor) })
+    }
+  }, [generateFor, generation.start])
+
+  const { data, isLoading, error, total, page, hasNext, hasPrevious, next: nextPage, previous: previousPage } = useCursorQuery({
+    queryKey: ['reviewQueue', channel],
+    fetchPage: (cursor) => messages.list({
       status: 'pending',
       channel: channel || undefined,
-      page,
+      cursor: cursor || undefined,
       per_page: 10,
     }).then(res => res.data),
   })
@@ -285,7 +353,7 @@ export default function ReviewQueue() {
         <div>
           <h1 className="text-2xl font-bold text-gray-900">Review Queue</h1>
           <p className="text-gray-500 mt-1">
-            {data?.total || 0} messages pending review
+            {total || 0} messages pending review
           </p>
         </div>
         {data?.messages?.length > 0 && (
@@ -299,6 +367,16 @@ export default function ReviewQueue() {
         )}
       </div>
 
+      {generation.status !== 'idle' && (
+        <GenerationPanel
+          status={generation.status}
+          research={generation.research}
+          drafts={generation.drafts}
+          error={generation.error}
+          onCancel={generation.cancel}
+        />
+      )}
+
       {/* Stats */}
       {stats && (
         <div className="grid grid-cols-2 sm:grid-cols-4 gap-4 mb-6">
@@ -327,7 +405,7 @@ export default function ReviewQueue() {
           <Filter className="h-5 w-5 text-gray-400" />
           <select
             value={channel}
-            onChange={(e) => setSearchParams({ channel: e.target.value, page: '1' })}
+            onChange={(e) => setSearchParams({ channel: e.target.value })}
             className="px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500"
           >
             <option value="">All Channels</option>
@@ -368,22 +446,22 @@ export default function ReviewQueue() {
           ))}
 
           {/* Pagination */}
-          {data.pages > 1 && (
+          {(hasPrevious || hasNext) && (
             <div className="flex items-center justify-between pt-4">
               <p className="text-sm text-gray-500">
-                Page {page} of {data.pages}
+                Page {page}{total != null && ` of ${Math.ceil(total / 10)}`}
               </p>
               <div className="flex gap-2">
                 <button
-                  onClick={() => setSearchParams({ channel, page: String(page - 1) })}
-                  disabled={page === 1}
+                  onClick={previousPage}
+                  disabled={!hasPrevious}
                   className="p-2 border rounded-lg disabled:opacity-50 disabled:cursor-not-allowed hover:bg-gray-50"
                 >
                   <ChevronLeft className="h-4 w-4" />
                 </button>
                 <button
-                  onClick={() => setSearchParams({ channel, page: String(page + 1) })}
-                  disabled={page === data.pages}
+                  onClick={nextPage}
+                  disabled={!hasNext}
                   className="p-2 border rounded-lg disabled:opacity-50 disabled:cursor-not-allowed hover:bg-gray-50"
                 >
                   <ChevronRight className="h-4 w-4" />